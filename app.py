@@ -1,22 +1,37 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from flask import Flask, render_template, request, jsonify, send_file, url_for, redirect, flash, session
+from flask import (Flask, Response, render_template, request, jsonify, send_file, url_for, redirect, flash, session,
+                   stream_with_context)
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
+import json
 import uuid
-import threading
 import time
-from datetime import datetime
 from dotenv import load_dotenv
 from google_maps_scraper import GoogleMapsScraper
+from exporters import DEFAULT_FORMAT, EXPORTERS, get_exporter, output_filename
+from rate_limiter import get_login_limiter, get_rate_limiter
+from password_hasher import HasherBusy
+from job_queue import LEASE_EXPIRED_ERROR, WorkerPool, get_job_queue
+from job_store import SearchJob, get_job_store
 from database import Database
+from cache import TTLCache, get_search_result_cache
+from gazetteer import ILCELER_ETAGS, ILCELER_JSON, all_locations, build_coordinates, get_iller, location_name
+from snapshot_store import DeltaMarker, get_snapshot_store
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'your-secret-key-here')
 
 load_dotenv()
 
+# Railway gibi ters proxy arkasında istemci adresi güvenilen son proxy'nin
+# X-Forwarded-For değerinden alınır (TRUSTED_PROXIES, 0 = proxy yok)
+trusted_proxies = int(os.getenv('TRUSTED_PROXIES', 1))
+if trusted_proxies:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=trusted_proxies, x_proto=trusted_proxies)
+
 # Flask-Login setup
 login_manager = LoginManager()
 login_manager.init_app(app)
@@ -26,6 +41,14 @@ login_manager.login_message = 'Bu sayfaya erişmek için giriş yapmalısınız.
 # Database setup
 db = Database()
 
+# Oturum yüklemede kullanıcı sorgusunu atlamak için kısa süreli önbellek.
+# Admin değişikliklerinde ilgili kayıt hemen düşürülür; diğer gunicorn
+# worker'ları değişikliği en geç USER_CACHE_TTL saniye sonra görür.
+user_cache = TTLCache(ttl_seconds=float(os.getenv('USER_CACHE_TTL', 30)))
+
+# Başarısız giriş sınırı (LOGIN_MAX_ATTEMPTS deneme / LOGIN_WINDOW_SECONDS)
+login_limiter = get_login_limiter()
+
 class User(UserMixin):
     def __init__(self, user_data):
         self.id = str(user_data['id'])
@@ -36,33 +59,15 @@ class User(UserMixin):
 
 @login_manager.user_loader
 def load_user(user_id):
-    # Kullanıcıyı veritabanından yükle
-    conn = db.db_path
-    import sqlite3
-    conn = sqlite3.connect(db.db_path)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT id, username, is_admin, expiry_date
-        FROM users WHERE id = ? AND is_active = 1
-    ''', (int(user_id),))
-    
-    user_row = cursor.fetchone()
-    conn.close()
-    
-    if user_row:
-        user_id, username, is_admin, expiry_date = user_row
-        expiry = datetime.strptime(expiry_date, '%Y-%m-%d').date()
-        days_left = (expiry - datetime.now().date()).days
-        
-        if days_left > 0:  # Sadece süresi dolmamış kullanıcıları yükle
-            return User({
-                'id': user_id,
-                'username': username,
-                'is_admin': bool(is_admin),
-                'expiry_date': expiry_date,
-                'days_left': days_left
-            })
+    # Kullanıcıyı önbellekten, yoksa veritabanından yükle
+    user_data = user_cache.get(user_id)
+    if user_data is None:
+        user_data = db.get_user(int(user_id))
+        if user_data:
+            user_cache.set(user_id, user_data)
+    
+    if user_data and user_data['days_left'] > 0:  # Sadece süresi dolmamış kullanıcıları yükle
+        return User(user_data)
     
     return None
 
@@ -71,131 +76,81 @@ UPLOAD_FOLDER = 'downloads'
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 
-# Aktif işlemler için dictionary
-active_jobs = {}
-
-class SearchJob:
-    def __init__(self, job_id, location, business_type, radius_km):
-        self.job_id = job_id
-        self.location = location
-        self.business_type = business_type
-        self.radius_km = radius_km
-        self.status = 'pending'  # pending, running, completed, error
-        self.progress = 0
-        self.result_count = 0
-        self.filename = None
-        self.error_message = None
-        self.start_time = time.time()
-
-def get_iller():
-    """Türkiye'nin illerini döndürür"""
-    return [
-        "Adana", "Adıyaman", "Afyonkarahisar", "Ağrı", "Amasya", "Ankara", "Antalya",
-        "Artvin", "Aydın", "Balıkesir", "Bilecik", "Bingöl", "Bitlis", "Bolu", "Burdur",
-        "Bursa", "Çanakkale", "Çankırı", "Çorum", "Denizli", "Diyarbakır", "Edirne",
-        "Elazığ", "Erzincan", "Erzurum", "Eskişehir", "Gaziantep", "Giresun", "Gümüşhane",
-        "Hakkari", "Hatay", "Isparta", "Mersin", "İstanbul", "İzmir", "Kars", "Kastamonu",
-        "Kayseri", "Kırklareli", "Kırşehir", "Kocaeli", "Konya", "Kütahya", "Malatya",
-        "Manisa", "Kahramanmaraş", "Mardin", "Muğla", "Muş", "Nevşehir", "Niğde", "Ordu",
-        "Rize", "Sakarya", "Samsun", "Siirt", "Sinop", "Sivas", "Tekirdağ", "Tokat",
-        "Trabzon", "Tunceli", "Şanlıurfa", "Uşak", "Van", "Yozgat", "Zonguldak", "Aksaray",
-        "Bayburt", "Karaman", "Kırıkkale", "Batman", "Şırnak", "Bartın", "Ardahan",
-        "Iğdır", "Yalova", "Karabük", "Kilis", "Osmaniye", "Düzce"
-    ]
-
-def get_ilceler(il):
-    """Seçilen ile göre ilçeleri döndürür"""
-    ilceler = {
-        "Adana": ["Aladağ", "Ceyhan", "Çukurova", "Feke", "İmamoğlu", "Karaisalı", "Karataş", "Kozan", "Pozantı", "Saimbeyli", "Sarıçam", "Seyhan", "Tufanbeyli", "Yumurtalık", "Yüreğir"],
-        "Adıyaman": ["Besni", "Çelikhan", "Gerger", "Gölbaşı", "Kahta", "Merkez", "Samsat", "Sincik", "Tut"],
-        "Afyonkarahisar": ["Başmakçı", "Bayat", "Bolvadin", "Çay", "Çobanlar", "Dazkırı", "Dinar", "Emirdağ", "Evciler", "Hocalar", "İhsaniye", "İscehisar", "Kızılören", "Merkez", "Sandıklı", "Sinanpaşa", "Sultandağı", "Şuhut"],
-        "Ağrı": ["Diyadin", "Doğubayazıt", "Eleşkirt", "Hamur", "Merkez", "Patnos", "Taşlıçay", "Tutak"],
-        "Amasya": ["Göynücek", "Gümüşhacıköy", "Hamamözü", "Merkez", "Merzifon", "Suluova", "Taşova"],
-        "Ankara": ["Akyurt", "Altındağ", "Ayaş", "Bala", "Beypazarı", "Çamlıdere", "Çankaya", "Çubuk", "Elmadağ", "Etimesgut", "Evren", "Gölbaşı", "Güdül", "Haymana", "Kalecik", "Kazan", "Keçiören", "Kızılcahamam", "Mamak", "Nallıhan", "Polatlı", "Pursaklar", "Sincan", "Şereflikoçhisar", "Yenimahalle"],
-        "Antalya": ["Akseki", "Aksu", "Alanya", "Demre", "Döşemealtı", "Elmalı", "Finike", "Gazipaşa", "Gündoğmuş", "İbradı", "Kaş", "Kemer", "Kepez", "Konyaaltı", "Korkuteli", "Kumluca", "Manavgat", "Muratpaşa", "Serik"],
-        "Artvin": ["Ardanuç", "Arhavi", "Borçka", "Hopa", "Merkez", "Murgul", "Şavşat", "Yusufeli"],
-        "Aydın": ["Bozdoğan", "Buharkent", "Çine", "Didim", "Efeler", "Germencik", "İncirliova", "Karacasu", "Karpuzlu", "Koçarlı", "Köşk", "Kuşadası", "Kuyucak", "Nazilli", "Söke", "Sultanhisar", "Yenipazar"],
-        "Balıkesir": ["Altıeylül", "Ayvalık", "Balya", "Bandırma", "Bigadiç", "Burhaniye", "Dursunbey", "Edremit", "Erdek", "Gömeç", "Gönen", "Havran", "İvrindi", "Karesi", "Kepsut", "Manyas", "Marmara", "Savaştepe", "Sındırgı", "Susurluk"],
-        "Bilecik": ["Bozüyük", "Gölpazarı", "İnhisar", "Merkez", "Osmaneli", "Pazaryeri", "Söğüt", "Yenipazar"],
-        "Bingöl": ["Adaklı", "Genç", "Karlıova", "Kiğı", "Merkez", "Solhan", "Yayladere", "Yedisu"],
-        "Bitlis": ["Adilcevaz", "Ahlat", "Güroymak", "Hizan", "Merkez", "Mutki", "Tatvan"],
-        "Bolu": ["Dörtdivan", "Gerede", "Göynük", "Kıbrıscık", "Mengen", "Merkez", "Mudurnu", "Seben", "Yeniçağa"],
-        "Burdur": ["Ağlasun", "Altınyayla", "Bucak", "Çavdır", "Çeltikçi", "Gölhisar", "Karamanlı", "Kemer", "Merkez", "Tefenni", "Yeşilova"],
-        "Bursa": ["Büyükorhan", "Gemlik", "Gürsu", "Harmancık", "İnegöl", "İznik", "Karacabey", "Keles", "Kestel", "Mudanya", "Mustafakemalpaşa", "Nilüfer", "Orhaneli", "Orhangazi", "Osmangazi", "Yenişehir", "Yıldırım"],
-        "Çanakkale": ["Ayvacık", "Bayramiç", "Biga", "Bozcaada", "Çan", "Eceabat", "Ezine", "Gelibolu", "Gökçeada", "Lapseki", "Merkez", "Yenice"],
-        "Çankırı": ["Atkaracalar", "Bayramören", "Çerkeş", "Eldivan", "Ilgaz", "Kızılırmak", "Korgun", "Kurşunlu", "Merkez", "Orta", "Şabanözü", "Yapraklı"],
-        "Çorum": ["Alaca", "Bayat", "Boğazkale", "Dodurga", "İskilip", "Kargı", "Laçin", "Mecitözü", "Merkez", "Oğuzlar", "Ortaköy", "Osmancık", "Sungurlu", "Uğurludağ"],
-        "Denizli": ["Acıpayam", "Babadağ", "Baklan", "Bekilli", "Beyağaç", "Bozkurt", "Buldan", "Çal", "Çameli", "Çardak", "Çivril", "Güney", "Honaz", "Kale", "Merkezefendi", "Pamukkale", "Sarayköy", "Serinhisar", "Tavas"],
-        "Diyarbakır": ["Bağlar", "Bismil", "Çermik", "Çınar", "Çüngüş", "Dicle", "Eğil", "Ergani", "Hani", "Hazro", "Kayapınar", "Kocaköy", "Kulp", "Lice", "Silvan", "Sur", "Yenişehir"],
-        "Edirne": ["Enez", "Havsa", "İpsala", "Keşan", "Lalapaşa", "Meriç", "Merkez", "Süloğlu", "Uzunköprü"],
-        "Elazığ": ["Ağın", "Alacakaya", "Arıcak", "Baskil", "Karakoçan", "Keban", "Kovancılar", "Maden", "Merkez", "Palu", "Sivrice"],
-        "Erzincan": ["Çayırlı", "İliç", "Kemah", "Kemaliye", "Merkez", "Otlukbeli", "Refahiye", "Tercan", "Üzümlü"],
-        "Erzurum": ["Aşkale", "Aziziye", "Çat", "Hınıs", "Horasan", "İspir", "Karaçoban", "Karayazı", "Köprüköy", "Narman", "Oltu", "Olur", "Palandöken", "Pasinler", "Pazaryolu", "Şenkaya", "Tekman", "Tortum", "Uzundere", "Yakutiye"],
-        "Eskişehir": ["Alpu", "Beylikova", "Çifteler", "Günyüzü", "Han", "İnönü", "Mahmudiye", "Mihalgazi", "Mihalıççık", "Odunpazarı", "Sarıcakaya", "Seyitgazi", "Sivrihisar", "Tepebaşı"],
-        "Gaziantep": ["Araban", "İslahiye", "Karkamış", "Nizip", "Nurdağı", "Oğuzeli", "Şahinbey", "Şehitkamil", "Yavuzeli"],
-        "Giresun": ["Alucra", "Bulancak", "Çamoluk", "Çanakçı", "Dereli", "Doğankent", "Espiye", "Eynesil", "Görele", "Güce", "Keşap", "Merkez", "Piraziz", "Şebinkarahisar", "Tirebolu", "Yağlıdere"],
-        "Gümüşhane": ["Kelkit", "Köse", "Kürtün", "Merkez", "Şiran", "Torul"],
-        "Hakkari": ["Çukurca", "Merkez", "Şemdinli", "Yüksekova"],
-        "Hatay": ["Altınözü", "Antakya", "Arsuz", "Belen", "Defne", "Dörtyol", "Erzin", "Hassa", "İskenderun", "Kırıkhan", "Kumlu", "Payas", "Reyhanlı", "Samandağ", "Yayladağı"],
-        "Isparta": ["Aksu", "Atabey", "Eğirdir", "Gelendost", "Gönen", "Keçiborlu", "Merkez", "Senirkent", "Sütçüler", "Şarkikaraağaç", "Uluborlu", "Yalvaç", "Yenişarbademli"],
-        "Mersin": ["Akdeniz", "Anamur", "Aydıncık", "Bozyazı", "Çamlıyayla", "Erdemli", "Gülnar", "Mezitli", "Mut", "Silifke", "Tarsus", "Toroslar", "Yenişehir"],
-        "İstanbul": ["Adalar", "Arnavutköy", "Ataşehir", "Avcılar", "Bağcılar", "Bahçelievler", "Bakırköy", "Başakşehir", "Bayrampaşa", "Beşiktaş", "Beykoz", "Beylikdüzü", "Beyoğlu", "Büyükçekmece", "Çatalca", "Çekmeköy", "Esenler", "Esenyurt", "Eyüpsultan", "Fatih", "Gaziosmanpaşa", "Güngören", "Kadıköy", "Kağıthane", "Kartal", "Küçükçekmece", "Maltepe", "Pendik", "Sancaktepe", "Sarıyer", "Silivri", "Sultanbeyli", "Sultangazi", "Şile", "Şişli", "Tuzla", "Ümraniye", "Üsküdar", "Zeytinburnu"],
-        "İzmir": ["Aliağa", "Balçova", "Bayındır", "Bayraklı", "Bergama", "Beydağ", "Bornova", "Buca", "Çeşme", "Çiğli", "Dikili", "Foça", "Gaziemir", "Güzelbahçe", "Karabağlar", "Karaburun", "Karşıyaka", "Kemalpaşa", "Kınık", "Kiraz", "Konak", "Menderes", "Menemen", "Narlıdere", "Ödemiş", "Seferihisar", "Selçuk", "Tire", "Torbalı", "Urla"],
-        "Kars": ["Akyaka", "Arpaçay", "Digor", "Kağızman", "Merkez", "Sarıkamış", "Selim", "Susuz"],
-        "Kastamonu": ["Abana", "Ağlı", "Araç", "Azdavay", "Bozkurt", "Cide", "Çatalzeytin", "Daday", "Devrekani", "Doğanyurt", "Hanönü", "İhsangazi", "İnebolu", "Küre", "Merkez", "Pınarbaşı", "Seydiler", "Şenpazar", "Taşköprü", "Tosya"],
-        "Kayseri": ["Akkışla", "Bünyan", "Develi", "Felahiye", "Hacılar", "İncesu", "Kocasinan", "Melikgazi", "Özvatan", "Pınarbaşı", "Sarıoğlan", "Sarız", "Talas", "Tomarza", "Yahyalı", "Yeşilhisar"],
-        "Kırklareli": ["Babaeski", "Demirköy", "Kofçaz", "Lüleburgaz", "Merkez", "Pehlivanköy", "Pınarhisar", "Vize"],
-        "Kırşehir": ["Akçakent", "Akpınar", "Boztepe", "Çiçekdağı", "Kaman", "Merkez", "Mucur"],
-        "Kocaeli": ["Başiskele", "Çayırova", "Darıca", "Derince", "Dilovası", "Gebze", "Gölcük", "İzmit", "Kandıra", "Karamürsel", "Kartepe", "Körfez"],
-        "Konya": ["Ahırlı", "Akören", "Akşehir", "Altınekin", "Beyşehir", "Bozkır", "Cihanbeyli", "Çeltik", "Çumra", "Derbent", "Derebucak", "Doğanhisar", "Emirgazi", "Ereğli", "Güneysinir", "Hadim", "Halkapınar", "Hüyük", "Ilgın", "Kadınhanı", "Karapınar", "Karatay", "Kulu", "Meram", "Sarayönü", "Selçuklu", "Seydişehir", "Taşkent", "Tuzlukçu", "Yalıhüyük", "Yunak"],
-        "Kütahya": ["Altıntaş", "Aslanapa", "Çavdarhisar", "Domaniç", "Dumlupınar", "Emet", "Gediz", "Hisarcık", "Merkez", "Pazarlar", "Simav", "Şaphane", "Tavşanlı"],
-        "Malatya": ["Akçadağ", "Arapgir", "Arguvan", "Battalgazi", "Darende", "Doğanşehir", "Doğanyol", "Hekimhan", "Kale", "Kuluncak", "Pütürge", "Yazihan", "Yeşilyurt"],
-        "Manisa": ["Ahmetli", "Akhisar", "Alaşehir", "Demirci", "Gölmarmara", "Gördes", "Kırkağaç", "Köprübaşı", "Kula", "Salihli", "Sarıgöl", "Saruhanlı", "Selendi", "Soma", "Şehzadeler", "Turgutlu", "Yunusemre"],
-        "Mardin": ["Artuklu", "Dargeçit", "Derik", "Kızıltepe", "Mazıdağı", "Midyat", "Nusaybin", "Ömerli", "Savur", "Yeşilli"],
-        "Muğla": ["Bodrum", "Dalaman", "Datça", "Fethiye", "Kavaklıdere", "Köyceğiz", "Marmaris", "Menteşe", "Milas", "Ortaca", "Seydikemer", "Ula", "Yatağan"],
-        "Muş": ["Bulanık", "Hasköy", "Korkut", "Malazgirt", "Merkez", "Varto"],
-        "Nevşehir": ["Acıgöl", "Avanos", "Derinkuyu", "Gülşehir", "Hacıbektaş", "Kozaklı", "Merkez", "Ürgüp"],
-        "Niğde": ["Altunhisar", "Bor", "Çamardı", "Çiftlik", "Merkez", "Ulukışla"],
-        "Ordu": ["Akkuş", "Altınordu", "Aybastı", "Çamaş", "Çatalpınar", "Çaybaşı", "Fatsa", "Gölköy", "Gülyalı", "Gürgentepe", "İkizce", "Kabadüz", "Kabataş", "Korgan", "Kumru", "Mesudiye", "Perşembe", "Ulubey", "Ünye"],
-        "Rize": ["Ardeşen", "Çamlıhemşin", "Çayeli", "Derepazarı", "Fındıklı", "Güneysu", "Hemşin", "İkizdere", "İyidere", "Kalkandere", "Merkez", "Pazar"],
-        "Sakarya": ["Adapazarı", "Akyazı", "Arifiye", "Erenler", "Ferizli", "Geyve", "Hendek", "Karapürçek", "Karasu", "Kaynarca", "Kocaali", "Pamukova", "Sapanca", "Serdivan", "Söğütlü", "Taraklı"],
-        "Samsun": ["19 Mayıs", "Alaçam", "Asarcık", "Atakum", "Ayvacık", "Bafra", "Canik", "Çarşamba", "Havza", "İlkadım", "Kavak", "Ladik", "Ondokuzmayıs", "Salıpazarı", "Tekkeköy", "Terme", "Vezirköprü", "Yakakent"],
-        "Siirt": ["Baykan", "Eruh", "Kurtalan", "Merkez", "Pervari", "Şirvan", "Tillo"],
-        "Sinop": ["Ayancık", "Boyabat", "Dikmen", "Durağan", "Erfelek", "Gerze", "Merkez", "Saraydüzü", "Türkeli"],
-        "Sivas": ["Akıncılar", "Altınyayla", "Divriği", "Doğanşar", "Gemerek", "Gölova", "Gürün", "Hafik", "İmranlı", "Kangal", "Koyulhisar", "Merkez", "Suşehri", "Şarkışla", "Ulaş", "Yıldızeli", "Zara"],
-        "Tekirdağ": ["Çerkezköy", "Çorlu", "Ergene", "Hayrabolu", "Kapaklı", "Malkara", "Marmaraereğlisi", "Muratlı", "Saray", "Süleymanpaşa", "Şarköy"],
-        "Tokat": ["Almus", "Artova", "Başçiftlik", "Erbaa", "Merkez", "Niksar", "Pazar", "Reşadiye", "Sulusaray", "Turhal", "Yeşilyurt", "Zile"],
-        "Trabzon": ["Akçaabat", "Araklı", "Arsin", "Beşikdüzü", "Çaykara", "Çarşıbaşı", "Dernekpazarı", "Düzköy", "Hayrat", "Köprübaşı", "Maçka", "Of", "Ortahisar", "Sürmene", "Şalpazarı", "Tonya", "Vakfıkebir", "Yomra"],
-        "Tunceli": ["Çemişgezek", "Hozat", "Mazgirt", "Merkez", "Nazımiye", "Ovacık", "Pertek", "Pülümür"],
-        "Şanlıurfa": ["Akçakale", "Birecik", "Bozova", "Ceylanpınar", "Eyyübiye", "Halfeti", "Haliliye", "Harran", "Hilvan", "Karaköprü", "Siverek", "Suruç", "Viranşehir"],
-        "Uşak": ["Banaz", "Eşme", "Karahallı", "Merkez", "Sivaslı", "Ulubey"],
-        "Van": ["Bahçesaray", "Başkale", "Çaldıran", "Çatak", "Edremit", "Erciş", "Gevaş", "Gürpınar", "İpekyolu", "Muradiye", "Özalp", "Saray", "Tuşba"],
-        "Yozgat": ["Akdağmadeni", "Aydıncık", "Boğazlıyan", "Çandır", "Çayıralan", "Çekerek", "Kadışehri", "Merkez", "Saraykent", "Sarıkaya", "Sorgun", "Şefaatli", "Yenifakılı", "Yerköy"],
-        "Zonguldak": ["Alaplı", "Çaycuma", "Devrek", "Gökçebey", "Kilimli", "Kozlu", "Merkez"],
-        "Aksaray": ["Ağaçören", "Eskil", "Gülağaç", "Güzelyurt", "Merkez", "Ortaköy", "Sarıyahşi"],
-        "Bayburt": ["Aydıntepe", "Demirözü", "Merkez"],
-        "Karaman": ["Ayrancı", "Başyayla", "Ermenek", "Kazımkarabekir", "Merkez", "Sarıveliler"],
-        "Kırıkkale": ["Bahşılı", "Balışeyh", "Çelebi", "Delice", "Karakeçili", "Keskin", "Merkez", "Sulakyurt", "Yahşihan"],
-        "Batman": ["Beşiri", "Gercüş", "Hasankeyf", "Kozluk", "Merkez", "Sason"],
-        "Şırnak": ["Beytüşşebap", "Cizre", "Güçlükonak", "İdil", "Merkez", "Silopi", "Uludere"],
-        "Bartın": ["Amasra", "Kurucaşile", "Merkez", "Ulus"],
-        "Ardahan": ["Çıldır", "Damal", "Göle", "Hanak", "Merkez", "Posof"],
-        "Iğdır": ["Aralık", "Karakoyunlu", "Merkez", "Tuzluca"],
-        "Yalova": ["Altınova", "Armutlu", "Çınarcık", "Çiftlikköy", "Merkez", "Termal"],
-        "Karabük": ["Eflani", "Eskipazar", "Merkez", "Ovacık", "Safranbolu", "Yenice"],
-        "Kilis": ["Elbeyli", "Merkez", "Musabeyli", "Polateli"],
-        "Osmaniye": ["Bahçe", "Düziçi", "Hasanbeyli", "Kadirli", "Merkez", "Sumbas", "Toprakkale"],
-        "Düzce": ["Akçakoca", "Cumayeri", "Çilimli", "Gölyaka", "Gümüşova", "Kaynaşlı", "Merkez", "Yığılca"]
+# İş durumları tüm worker'ların paylaştığı depoda tutulur
+job_store = get_job_store()
+
+def job_payload(job, user_id=None):
+    """İşi kuyruğa yazılacak parametrelere dönüştür"""
+    return {
+        'user_id': user_id,
+        'location': job.location,
+        'business_type': job.business_type,
+        'radius_km': job.radius_km,
+        'format': job.output_format,
+        'gzip': job.compress,
+        'delta': job.delta
     }
-    return ilceler.get(il, [])
 
-def perform_search_background(job_id):
-    """Arka planda arama işlemini gerçekleştir"""
-    job = active_jobs[job_id]
+# Aynı (lokasyon, işletme türü, yarıçap) aramaları SEARCH_CACHE_TTL_HOURS boyunca tekrar yapılmaz
+search_cache = get_search_result_cache()
+# Aramaların son çalıştırmada bulduğu yerler (delta modu ve detay çağrısı tasarrufu için)
+snapshot_store = get_snapshot_store()
+
+def job_filepath(job):
+    """İşin çıktı dosyasının adını ve yolunu oluştur"""
+    safe_location = job.location.replace(" ", "_").replace(",", "")
+    safe_business = job.business_type.replace(" ", "_")
+    filename = output_filename(
+        f"{safe_location}_{safe_business}_{job.radius_km}km_{job.job_id[:8]}", job.output_format, job.compress
+    )
+    return filename, os.path.join(UPLOAD_FOLDER, filename)
+
+def cached_search(job):
+    """İşin sonuçları önbellekteyse (sonuçlar, yaş) döndür"""
+    if not search_cache.ttl_seconds:
+        return None
+    return search_cache.get(job.location, job.business_type, job.radius_km)
+
+def complete_from_cache(job, cached):
+    """Önbellekteki sonuçları istenen formatta dosyaya yaz ve işi tamamla"""
+    results, age = cached
+    job.status = 'running'
+    job.phase = 'export'
+    job.progress = 90
+    job_store.save(job)
+    
+    filename, filepath = job_filepath(job)
+    with get_exporter(job.output_format, filepath, job.compress) as exporter:
+        exporter.write_rows(search_cache.iter_rows(job.location, job.business_type, job.radius_km))
+    
+    job.grid_report = results.get('grid_report')
+    job.filename = filename
+    job.result_count = exporter.row_count
+    job.from_cache = True
+    job.cache_age = round(age)
+    job.status = 'completed'
+    job.progress = 100
+    job_store.save(job)
+
+def perform_search_background(job_id, payload):
+    """Kuyruktan alınan arama işini gerçekleştir"""
+    # Depoda kaydı yoksa (silinmişse) kuyruktaki parametrelerden yeniden kur
+    job = job_store.get(job_id)
+    if job is None:
+        job = SearchJob(job_id, payload['location'], payload['business_type'], payload['radius_km'],
+                        payload.get('format', DEFAULT_FORMAT), payload.get('gzip', False), payload.get('delta', False))
+    cache_writer = None
     
     try:
+        # Aynı arama kuyrukta beklerken başka bir iş tarafından tamamlanmış olabilir
+        cached = cached_search(job) if not job.delta else None
+        if cached is not None:
+            complete_from_cache(job, cached)
+            return
+        
         job.status = 'running'
         job.progress = 10
+        job_store.save(job)
         
         api_key = os.getenv('GOOGLE_MAPS_API_KEY')
         if not api_key:
@@ -203,34 +158,179 @@ def perform_search_background(job_id):
             job.error_message = 'Google Maps API anahtarı bulunamadı!'
             return
         
-        scraper = GoogleMapsScraper(api_key)
+        scraper = GoogleMapsScraper(
+            api_key,
+            details_workers=int(os.getenv('DETAILS_WORKERS', 8)),
+            grid_max_depth=int(os.getenv('GRID_MAX_DEPTH', 3)),
+            grid_max_cells=int(os.getenv('GRID_MAX_CELLS', 32)),
+            known_max_age_days=float(os.getenv('DELTA_MAX_AGE_DAYS', 30)),
+            boundary_margin_km=float(os.getenv('BOUNDARY_MARGIN_KM', 0)),
+            radius_margin_km=float(os.getenv('RADIUS_MARGIN_KM', 0))
+        )
         job.progress = 30
         
-        # Arama yap
-        businesses = scraper.search_businesses(job.location, job.business_type, job.radius_km)
-        job.progress = 80
+        # Dosya adı oluştur
+        filename, filepath = job_filepath(job)
+        # Satırlar bellekte toplanmaz, dosyayla birlikte önbelleğe de akıtılır
+        # (önceki çalıştırmanın satırlarını kullanan delta sonuçları paylaşılmaz)
+        if search_cache.ttl_seconds and not job.delta:
+            cache_writer = search_cache.writer(job.location, job.business_type, job.radius_km)
         
-        if businesses:
-            # Dosya adı oluştur
-            safe_location = job.location.replace(" ", "_").replace(",", "")
-            safe_business = job.business_type.replace(" ", "_")
-            filename = f"{safe_location}_{safe_business}_{job.radius_km}km_{job_id[:8]}.xlsx"
-            filepath = os.path.join(UPLOAD_FOLDER, filename)
-            
-            # Excel'e kaydet
-            scraper.save_to_excel(businesses, filepath)
-            
+        # Her çalıştırma bulduklarını kaydeder; delta modunda önceki çalıştırmada değişmeden
+        # görülen yerlerin detayları tekrar çekilmez ve satırlar ona göre işaretlenir
+        snapshot_key = snapshot_store.make_key(payload.get('user_id'), job.location, job.business_type, job.radius_km)
+        previous = snapshot_store.load(snapshot_key) if job.delta else None
+        marker = DeltaMarker(previous) if job.delta else None
+        search_complete = False
+        search_error = None
+        
+        # Arama yap - sonuçlar bulundukça dosyaya yaz ve ilerlemeyi güncelle (%30-%90 arası)
+        # Depo faz değişimlerinde hemen, işletme sayısı için en fazla yarım saniyede bir güncellenir
+        last_saved = time.time()
+        with get_exporter(job.output_format, filepath, job.compress) as exporter:
+            for event in scraper.iter_businesses(job.location, job.business_type, job.radius_km, known=previous):
+                if event['type'] == 'business':
+                    if marker is not None:
+                        exporter.write_row(marker.mark(event['place_id'], event['business']))
+                    else:
+                        exporter.write_row(event['business'])
+                    if cache_writer is not None:
+                        cache_writer.add(event['business'])
+                    job.result_count = event['count']
+                    if time.time() - last_saved < 0.5:
+                        continue
+                elif event['type'] == 'phase':
+                    job.phase = event['phase']
+                    job.progress = 30 + event['progress'] * 3 // 5
+                elif event['type'] == 'done':
+                    search_complete = not event['partial']
+                elif event['type'] == 'error':
+                    # Lokasyon bulunamadı ya da arama API hatasıyla kesildi
+                    search_error = event['message']
+                job_store.save(job)
+                last_saved = time.time()
+            job.phase = 'export'
+            job.progress = 90
+            job_store.save(job)
+            # Eksik aramada gelmeyen yerlerin kapandığı söylenemez
+            if marker is not None and search_complete:
+                exporter.write_rows(marker.removed())
+        
+        job.grid_report = scraper.grid_summary()
+        job.stats = scraper.job_stats()
+        # 'done' olayı gelmeden biten (hata ile kesilen) arama da eksiktir
+        job.partial = scraper.partial or not search_complete
+        if marker is not None:
+            job.stats['delta'] = marker.counts
+        snapshot_store.save(snapshot_key, scraper.known_snapshot(), replace=search_complete)
+        print(f"[{job_id[:8]}] Detay önbelleği: {scraper.details_cache.stats()}")
+        print(f"[{job_id[:8]}] Atlanan detay çağrısı: {job.stats['details_saved']} "
+              f"(yarıçap dışı {job.stats['outside_radius']}, alan dışı {job.stats['outside_area']}, "
+              f"önceki çalıştırma {job.stats['reused_details']})")
+        
+        if exporter.row_count:
             job.filename = filename
-            job.result_count = len(businesses)
+            job.result_count = exporter.row_count
             job.status = 'completed'
             job.progress = 100
+            # Hatadan önce bulunanlar indirilebilir, iş kısmi olarak işaretlenir
+            job.error_message = search_error
+            # Eksik kalan (bütçe ya da hata) sonuçlar paylaşılmaz
+            if cache_writer is not None and search_complete:
+                cache_writer.commit(job.grid_report)
         else:
+            os.remove(filepath)
             job.status = 'error'
-            job.error_message = 'Hiç işletme bulunamadı!'
+            job.error_message = search_error or 'Hiç işletme bulunamadı!'
             
     except Exception as e:
         job.status = 'error'
         job.error_message = str(e)
+    finally:
+        if cache_writer is not None:
+            cache_writer.discard()
+        job_store.save(job)
+
+def run_db_maintenance(force=False):
+    """Eski işleri temizle, geçmiş tablolarına saklama süresini uygula ve veritabanını optimize et"""
+    job_store.purge()
+    snapshot_store.purge(float(os.getenv('SNAPSHOT_RETENTION_DAYS', 90)) * 86400)
+    return db.run_maintenance(
+        interval_hours=float(os.getenv('DB_MAINTENANCE_INTERVAL_HOURS', 24)),
+        search_days=int(os.getenv('SEARCH_HISTORY_RETENTION_DAYS', 90)),
+        login_days=int(os.getenv('LOGIN_HISTORY_RETENTION_DAYS', 180)),
+        vacuum=os.getenv('DB_VACUUM', '1') == '1',
+        force=force
+    )
+
+def fail_abandoned_jobs(job_ids):
+    """Kuyruğun bıraktığı (kirası dolup deneme hakkı biten) işleri depoda hataya al"""
+    for job_id in job_ids:
+        job = job_store.get(job_id)
+        if job is None or job.status in ('completed', 'error'):
+            continue
+        job.status = 'error'
+        job.error_message = LEASE_EXPIRED_ERROR
+        job_store.save(job)
+
+# Aramalar sabit boyutlu worker havuzunda, kalıcı kuyruktan sırayla yürütülür
+job_queue = get_job_queue()
+job_workers = WorkerPool(job_queue, perform_search_background, concurrency=int(os.getenv('JOB_WORKERS', 2)),
+                         maintenance=run_db_maintenance, on_abandoned=fail_abandoned_jobs)
+
+def start_job_workers():
+    """
+    Kuyruk worker'larını başlat
+    
+    Sadece sunucu süreçlerinde çağrılır (gunicorn.conf.py'deki post_worker_init,
+    `python app.py` ya da START_JOB_WORKERS=1). Modülü içe aktaran CLI komutları
+    ve benchmark betikleri iş almaz; alsalar kısa süre sonra çıkıp işi kira
+    süresi dolana kadar bekletir ve bir deneme hakkını harcarlardı.
+    """
+    job_workers.start()
+
+if os.getenv('START_JOB_WORKERS') == '1':
+    start_job_workers()
+
+@app.cli.command('warm-geocode')
+def warm_geocode_command():
+    """Tüm il/ilçe lokasyonlarını geocode önbelleğine yükle"""
+    api_key = os.getenv('GOOGLE_MAPS_API_KEY')
+    if not api_key:
+        print('Google Maps API anahtarı bulunamadı!')
+        return
+    
+    locations = all_locations()
+    fetched = GoogleMapsScraper(api_key).warm_geocode_cache(locations)
+    print(f"{len(locations)} lokasyondan {fetched} tanesi geocode önbelleğine eklendi.")
+
+@app.cli.command('build-gazetteer')
+def build_gazetteer_command():
+    """Tüm il/ilçeleri geocode edip gazetteer koordinat dosyasını yeniden yaz"""
+    api_key = os.getenv('GOOGLE_MAPS_API_KEY')
+    if not api_key:
+        print('Google Maps API anahtarı bulunamadı!')
+        return
+    
+    # Önbellekteki yanıtlar tekrar kullanılır, eksikler API'den çekilir
+    scraper = GoogleMapsScraper(api_key)
+    def geocode(location):
+        result = scraper.geocode_cache.get(location)
+        if result is None:
+            result = scraper._call('geocode', scraper.gmaps.geocode, location)
+            if result:
+                scraper.geocode_cache.set(location, result)
+        return result
+    
+    written = build_coordinates(geocode)
+    print(f"{len(all_locations())} lokasyondan {written} tanesinin koordinatı yazıldı.")
+
+@app.cli.command('db-maintenance')
+def db_maintenance_command():
+    """Geçmiş tablolarının saklama ve optimizasyon bakımını hemen çalıştır"""
+    result = run_db_maintenance(force=True)
+    print(f"Özetlenip silinen arama kaydı: {result['search_history']}, "
+          f"giriş kaydı: {result['login_history']}")
 
 @app.route('/login', methods=['GET', 'POST'])
 def login():
@@ -238,19 +338,34 @@ def login():
     if request.method == 'POST':
         username = request.form['username']
         password = request.form['password']
+        # İstemcinin gönderdiği başlık değil, ProxyFix'in güvenilen proxy'den aldığı adres
+        ip_address = request.remote_addr or 'Unknown'
+        
+        # Başarısız denemeler hem IP hem kullanıcı adı bazında sınırlanır
+        limiter_keys = (f"ip:{ip_address}", f"user:{username.lower()}")
+        retry_after = login_limiter.retry_after(*limiter_keys)
+        if retry_after:
+            flash(f'Çok fazla başarısız deneme! {int(retry_after // 60) + 1} dakika sonra tekrar deneyin.', 'error')
+            return render_template('login.html'), 429, {'Retry-After': str(int(retry_after) + 1)}
+        
+        try:
+            user_data = db.authenticate_user(username, password)
+        except HasherBusy:
+            flash('Sunucu şu anda yoğun, lütfen birkaç saniye sonra tekrar deneyin.', 'error')
+            return render_template('login.html'), 503, {'Retry-After': '5'}
         
-        user_data = db.authenticate_user(username, password)
         if user_data:
+            login_limiter.reset(limiter_keys[1])
             user = User(user_data)
             login_user(user)
             
             # Giriş IP'sini kaydet
-            ip_address = request.environ.get('HTTP_X_FORWARDED_FOR', request.environ.get('REMOTE_ADDR', 'Unknown'))
             user_agent = request.headers.get('User-Agent', '')
             db.add_login_history(user.id, ip_address, user_agent)
             
             return redirect(url_for('index'))
         else:
+            login_limiter.record_failure(*limiter_keys)
             flash('Geçersiz kullanıcı adı veya şifre!', 'error')
     
     return render_template('login.html')
@@ -278,12 +393,20 @@ def admin():
         flash('Bu sayfaya erişim yetkiniz yok!', 'error')
         return redirect(url_for('index'))
     
-    users = db.get_all_users()
-    # Her kullanıcı için giriş geçmişini ekle
-    for user in users:
-        user['login_history'] = db.get_user_login_history(user['id'], 10)
+    search = request.args.get('q', '').strip()
+    after_id = request.args.get('after', type=int)
+    before_id = request.args.get('before', type=int)
     
-    return render_template('admin.html', users=users)
+    # Kullanıcılar ve son girişleri tek sorguda, sayfa sayfa
+    page = db.get_users_page(
+        limit=int(os.getenv('ADMIN_PAGE_SIZE', 50)),
+        after_id=after_id,
+        before_id=before_id,
+        search=search or None
+    )
+    
+    return render_template('admin.html', users=page['users'], counts=db.get_user_counts(), search=search,
+                           next_cursor=page['next_cursor'], prev_cursor=page['prev_cursor'])
 
 @app.route('/admin/create_user', methods=['POST'])
 @login_required
@@ -319,7 +442,9 @@ def extend_user(user_id):
     
     days_to_add = int(request.form['days_to_add'])
     
-    if db.update_user_expiry(user_id, days_to_add):
+    updated = db.update_user_expiry(user_id, days_to_add)
+    user_cache.invalidate(str(user_id))
+    if updated:
         flash('Kullanıcı süresi başarıyla uzatıldı!', 'success')
     else:
         flash('Süre uzatma işlemi başarısız!', 'error')
@@ -334,6 +459,7 @@ def toggle_user(user_id):
         return jsonify({'error': 'Yetkiniz yok!'}), 403
     
     new_status = db.toggle_user_status(user_id)
+    user_cache.invalidate(str(user_id))
     status_text = 'aktif' if new_status else 'pasif'
     flash(f'Kullanıcı durumu {status_text} olarak güncellendi!', 'success')
     
@@ -346,18 +472,36 @@ def delete_user(user_id):
     if not current_user.is_admin:
         return jsonify({'error': 'Yetkiniz yok!'}), 403
     
-    if db.delete_user(user_id):
+    deleted = db.delete_user(user_id)
+    user_cache.invalidate(str(user_id))
+    if deleted:
         flash('Kullanıcı başarıyla silindi!', 'success')
     else:
         flash('Kullanıcı silinemedi!', 'error')
     
     return redirect(url_for('admin'))
 
+@app.route('/admin/metrics')
+@login_required
+def admin_metrics():
+    """API limiti ve bekleme metriklerini JSON olarak döndür"""
+    if not current_user.is_admin:
+        return jsonify({'error': 'Yetkiniz yok!'}), 403
+    
+    return jsonify({
+        'rate_limiter': get_rate_limiter().metrics(),
+        'job_queue': dict(job_queue.metrics(), workers=job_workers.concurrency,
+                          active_here=job_workers.active_count())
+    })
+
 @app.route('/api/ilceler/<il>')
 def api_ilceler(il):
-    """İlçeleri JSON olarak döndür"""
-    ilceler = get_ilceler(il)
-    return jsonify(ilceler)
+    """İlçeleri JSON olarak döndür (liste değişmediği için tarayıcı önbelleğinde tutulur)"""
+    response = Response(ILCELER_JSON.get(il, '[]'), mimetype='application/json')
+    response.set_etag(ILCELER_ETAGS.get(il, 'empty'))
+    response.cache_control.public = True
+    response.cache_control.max_age = int(os.getenv('ILCELER_MAX_AGE', 86400))
+    return response.make_conditional(request)
 
 @app.route('/api/search', methods=['POST'])
 @login_required
@@ -369,10 +513,18 @@ def api_search():
     ilce = data.get('ilce', '').strip()
     business_type = data.get('business_type', '').strip()
     radius_km = data.get('radius_km', 3)
+    # Metin olmayan format (ör. {"format": 5}) geçersiz sayılır
+    output_format = data.get('format') or DEFAULT_FORMAT
+    output_format = output_format.strip().lower() if isinstance(output_format, str) else None
+    compress = bool(data.get('gzip', False))
+    delta = bool(data.get('delta', False))
     
     if not il or not business_type:
         return jsonify({'error': 'İl ve işletme türü zorunludur!'}), 400
     
+    if output_format not in EXPORTERS:
+        return jsonify({'error': f"Geçersiz çıktı formatı! ({', '.join(EXPORTERS)})"}), 400
+    
     try:
         radius_km = float(radius_km)
         if radius_km <= 0:
@@ -381,56 +533,136 @@ def api_search():
         return jsonify({'error': 'Geçerli bir yarıçap değeri girin!'}), 400
     
     # Lokasyon string'i oluştur
-    if ilce:
-        location = f"{ilce}, {il}, Turkey"
-    else:
-        location = f"{il}, Turkey"
+    location = location_name(il, ilce)
     
     # Benzersiz iş ID'si oluştur
     job_id = str(uuid.uuid4())
     
     # İş oluştur
-    job = SearchJob(job_id, location, business_type, radius_km)
-    active_jobs[job_id] = job
+    job = SearchJob(job_id, location, business_type, radius_km, output_format, compress, delta)
+    job_store.save(job)
     
     # Arama geçmişine kaydet
     db.add_search_history(current_user.id, location, business_type, radius_km)
     
-    # Arka planda arama başlat
-    thread = threading.Thread(target=perform_search_background, args=(job_id,))
-    thread.daemon = True
-    thread.start()
+    # Aynı arama yakın zamanda yapıldıysa kuyruğa girmeden önbellekten tamamla
+    # (delta modu önceki çalıştırmayla karşılaştırmak için aramayı her zaman yapar)
+    cached = cached_search(job) if not delta else None
+    if cached is not None:
+        try:
+            complete_from_cache(job, cached)
+        except Exception as e:
+            job.status = 'error'
+            job.error_message = str(e)
+            job_store.save(job)
+        return jsonify({
+            'job_id': job_id,
+            'status': job.status,
+            'from_cache': job.from_cache,
+            'cache_age': job.cache_age,
+            'message': 'Sonuçlar önbellekten hazırlandı!'
+        })
+    
+    # Kuyruğa ekle, boştaki bir worker alır
+    queue_position = job_queue.enqueue(job_id, job_payload(job, current_user.id))
+    job_workers.notify()
     
     return jsonify({
         'job_id': job_id,
-        'status': 'started',
-        'message': 'Arama başlatıldı!'
+        'status': 'queued',
+        'queue_position': queue_position,
+        'message': 'Arama sıraya alındı!' if queue_position else 'Arama başlatıldı!'
     })
 
-@app.route('/api/status/<job_id>')
-def api_status(job_id):
-    """İş durumunu kontrol et"""
-    if job_id not in active_jobs:
-        return jsonify({'error': 'İş bulunamadı!'}), 404
-    
-    job = active_jobs[job_id]
-    
+def job_status(job, detailed=True):
+    """İşin durum yanıtını oluştur (detailed=False grid ağacını ve sayaçları atlar)"""
     response = {
-        'job_id': job_id,
+        'job_id': job.job_id,
         'status': job.status,
         'progress': job.progress,
+        'phase': job.phase,
+        'result_count': job.result_count,
         'location': job.location,
         'business_type': job.business_type,
-        'radius_km': job.radius_km
+        'radius_km': job.radius_km,
+        'format': job.output_format,
+        'partial': job.partial,
+        'from_cache': job.from_cache,
+        'cache_age': job.cache_age
     }
     
+    if detailed and job.grid_report:
+        response['grid'] = job.grid_report
+    if detailed and job.stats:
+        response['stats'] = job.stats
+    
     if job.status == 'completed':
         response['result_count'] = job.result_count
         response['download_url'] = url_for('download_file', filename=job.filename)
+        if job.error_message:
+            response['error_message'] = job.error_message
     elif job.status == 'error':
         response['error_message'] = job.error_message
     
-    return jsonify(response)
+    return response
+
+@app.route('/api/status/<job_id>')
+def api_status(job_id):
+    """İş durumunu kontrol et"""
+    job = job_store.get(job_id)
+    if job is None:
+        return jsonify({'error': 'İş bulunamadı!'}), 404
+    
+    return jsonify(job_status(job))
+
+@app.route('/api/events/<job_id>')
+def api_events(job_id):
+    """
+    İş ilerlemesini Server-Sent Events olarak akıt
+    
+    Sunucu depoyu kısa aralıklarla okur ve yalnızca durum değiştiğinde
+    'progress' olayı gönderir; iş bitince detaylı 'done' olayı gönderip
+    bağlantıyı kapatır. Her akış gthread worker'ında bir thread tuttuğu
+    için en fazla SSE_MAX_DURATION saniye açık kalır; ardından bağlantı
+    kapanır ve EventSource `retry` süresi sonra kendiliğinden yeniden bağlanır.
+    """
+    if job_store.get(job_id) is None:
+        return jsonify({'error': 'İş bulunamadı!'}), 404
+    
+    poll_interval = float(os.getenv('SSE_POLL_INTERVAL', 0.5))
+    max_duration = float(os.getenv('SSE_MAX_DURATION', 25))
+    
+    def generate():
+        started = time.time()
+        last_sent = started
+        last_status = None
+        # Süre dolup bağlantı kapanınca (ya da koparsa) tarayıcı 1 saniye sonra yeniden bağlanır
+        yield 'retry: 1000\n\n'
+        while time.time() - started < max_duration:
+            job = job_store.get(job_id)
+            if job is None:
+                yield f"event: error\ndata: {json.dumps({'error': 'İş bulunamadı!'})}\n\n"
+                return
+            
+            if job.status in ('completed', 'error'):
+                yield f"event: done\ndata: {json.dumps(job_status(job), ensure_ascii=False)}\n\n"
+                return
+            
+            status = job_status(job, detailed=False)
+            if status != last_status:
+                yield f"event: progress\ndata: {json.dumps(status, ensure_ascii=False)}\n\n"
+                last_status = status
+                last_sent = time.time()
+            elif time.time() - last_sent >= 15:
+                yield ': ping\n\n'
+                last_sent = time.time()
+            
+            time.sleep(poll_interval)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
 @app.route('/download/<filename>')
 def download_file(filename):
@@ -444,13 +676,13 @@ def download_file(filename):
 @app.route('/result/<job_id>')
 def result_page(job_id):
     """Sonuç sayfası"""
-    if job_id not in active_jobs:
+    job = job_store.get(job_id)
+    if job is None:
         return "İş bulunamadı!", 404
-    
-    job = active_jobs[job_id]
     return render_template('result.html', job=job, job_id=job_id)
 
 if __name__ == '__main__':
     import os
+    start_job_workers()
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=False)
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import contextvars
+import aiohttp
+from typing import Any, List, Dict, NamedTuple, Optional, Tuple
+from google_maps_scraper import GoogleMapsScraper, DETAIL_FIELDS, summarize_grid
+from rate_limiter import BudgetExceeded, CallBudget, RateLimiter, get_call_budget, get_rate_limiter
+from cache import PlaceDetailsCache, GeocodeCache, get_place_details_cache, get_geocode_cache
+import gazetteer
+import geofence
+
+DEFAULT_BASE_URL = 'https://maps.googleapis.com/maps/api'
+
+# Arama başına istek memo'su; search_businesses her çağrıda yenisini kurar
+_search_memo = contextvars.ContextVar('search_memo')
+# Arama başına çağrı bütçesi
+_search_budget = contextvars.ContextVar('search_budget')
+
+
+class PlacesApiError(Exception):
+    """Google Maps Web Service OK/ZERO_RESULTS dışında bir durum döndürdü"""
+
+    def __init__(self, status: str, message: str = ''):
+        super().__init__(f"{status}: {message}" if message else status)
+        self.status = status
+
+
+class SearchResult(NamedTuple):
+    """Tek bir aramanın sonucu; eşzamanlı aramalar birbirinin durumunu ezmez"""
+    businesses: List[Dict]
+    partial: bool  # Bütçe dolduğu ya da hata ile kesildiği için eksik
+    usage: Dict[str, Any]  # Aramanın çağrı bütçesi kullanımı (CallBudget.usage())
+    grid: Dict[str, Any]  # Grid hücre ağacının özeti (summarize_grid)
+
+
+class AiohttpTransport:
+    """Tek bir paylaşılan aiohttp oturumu üzerinden JSON GET istekleri yapar"""
+
+    def __init__(self, timeout: float = 30):
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session = None
+
+    async def get_json(self, url: str, params: Dict) -> Dict:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=self.timeout)
+        async with self._session.get(url, params=params) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+class AsyncGoogleMapsScraper:
+    """
+    GoogleMapsScraper'ın asyncio karşılığı
+
+    Aynı geocode, nearby, text ve place details çağrılarını tek bir HTTP
+    oturumu üzerinden coroutine olarak yapar ve aynı işletme sözlüklerini
+    döndürür. Böylece tek bir event loop içinde çok sayıda arama aynı anda
+    yürütülebilir. Her arama bütçesini, eksiklik bilgisini ve grid raporunu
+    kendi `SearchResult`'ında döndürür.
+
+    Örnek:
+        async with AsyncGoogleMapsScraper(api_key) as scraper:
+            results = await asyncio.gather(
+                scraper.search_businesses("Kadıköy, İstanbul, Turkey", "eczane", 3),
+                scraper.search_businesses("Çankaya, Ankara, Turkey", "kuaför", 3),
+            )
+            businesses = [business for result in results for business in result.businesses]
+    """
+
+    # Senkron sınıfla aynı eşleme ve filtre mantığı
+    _get_place_type = GoogleMapsScraper._get_place_type
+    _build_business_info = GoogleMapsScraper._build_business_info
+    _make_cell = GoogleMapsScraper._make_cell
+    _split_cell = GoogleMapsScraper._split_cell
+    _is_saturated = GoogleMapsScraper._is_saturated
+
+    def __init__(self, api_key: str, transport=None, base_url: str = DEFAULT_BASE_URL,
+                 details_concurrency: int = 8, page_token_delay: float = 2.0,
+                 details_cache: Optional[PlaceDetailsCache] = None,
+                 geocode_cache: Optional[GeocodeCache] = None,
+                 grid_max_depth: int = 3, grid_max_cells: int = 32,
+                 rate_limiter: Optional[RateLimiter] = None, call_budget: Optional[CallBudget] = None,
+                 boundary_margin_km: float = 0.0, radius_margin_km: float = 0.0):
+        """
+        Args:
+            api_key (str): Google Maps API anahtarı
+            transport: `async get_json(url, params) -> dict` metodu olan nesne
+                (varsayılan: AiohttpTransport). Testlerde sahte sunucu için değiştirilebilir.
+            base_url (str): Web Service kök adresi (sahte Places sunucusu için)
+            details_concurrency (int): Arama başına eşzamanlı detay çağrısı sayısı
+            page_token_delay (float): next_page_token geçerli olana kadar beklenecek süre
+            details_cache (PlaceDetailsCache): Place details önbelleği (varsayılan: paylaşılan disk önbelleği)
+            geocode_cache (GeocodeCache): Geocode önbelleği (varsayılan: paylaşılan disk önbelleği)
+            grid_max_depth (int): Grid aramada en fazla bölme derinliği
+            grid_max_cells (int): Grid aramada aranacak en fazla hücre sayısı
+            rate_limiter (RateLimiter): API çağrı limiti (varsayılan: süreç genelinde paylaşılan limiter)
+            call_budget (CallBudget): Her arama için uygulanacak çağrı bütçesi (varsayılan: ortam değişkenleri)
+            boundary_margin_km (float): Hedef alan sınır kutusuna eklenecek pay
+            radius_margin_km (float): Yarıçap filtresine eklenecek pay (negatif = filtre yok)
+        """
+        self.api_key = api_key
+        self.transport = transport or AiohttpTransport()
+        self.base_url = base_url.rstrip('/')
+        self.details_concurrency = max(1, int(details_concurrency))
+        self.page_token_delay = page_token_delay
+        self.details_cache = details_cache or get_place_details_cache()
+        self.geocode_cache = geocode_cache or get_geocode_cache()
+        self.grid_max_depth = grid_max_depth
+        self.grid_max_cells = grid_max_cells
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.call_budget = call_budget or get_call_budget()
+        self.boundary_margin_km = boundary_margin_km
+        self.radius_margin_km = radius_margin_km
+        self._inflight = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """Paylaşılan HTTP oturumunu kapat"""
+        close = getattr(self.transport, 'close', None)
+        if close is not None:
+            await close()
+
+    async def _request(self, endpoint: str, path: str, params: Dict) -> Dict:
+        """
+        Web Service çağrısı yap
+
+        Aynı arama içinde tekrarlanan özdeş istekler memo'dan döner; eşzamanlı
+        aramalardaki özdeş istekler tek bir upstream isteğinde birleştirilir.
+        """
+        key = (path, repr(sorted(params.items())))
+        memo = _search_memo.get(None)
+        if memo is not None and key in memo:
+            return memo[key]
+
+        # Bütçe birleştirmeden önce bu aramanınkinden düşülür (liderin bütçe hatası takipçilere geçmez)
+        budget = _search_budget.get(None)
+        if budget is not None:
+            budget.spend(endpoint)
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._upstream_request(endpoint, path, params))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        response = await asyncio.shield(future)
+
+        if memo is not None:
+            memo[key] = response
+        return response
+
+    async def _upstream_request(self, endpoint: str, path: str, params: Dict) -> Dict:
+        """Uç nokta limitinden geçerek isteği gönder ve durum kodunu kontrol et"""
+        await self.rate_limiter.acquire_async(endpoint)
+        query = {k: v for k, v in params.items() if v is not None}
+        query['key'] = self.api_key
+        response = await self.transport.get_json(f"{self.base_url}/{path}", query)
+        status = response.get('status', 'OK')
+        if status not in ('OK', 'ZERO_RESULTS'):
+            raise PlacesApiError(status, response.get('error_message', ''))
+        return response
+
+    async def geocode(self, address: str) -> List[Dict]:
+        known = gazetteer.geocode_result(address)
+        if known is not None:
+            return known
+        # SQLite önbelleği bloklayıcıdır (busy timeout), olay döngüsü dışında çalıştırılır
+        cached = await asyncio.to_thread(self.geocode_cache.get, address)
+        if cached is not None:
+            return cached
+        response = await self._request('geocode', 'geocode/json', {'address': address})
+        results = response.get('results', [])
+        if results:
+            await asyncio.to_thread(self.geocode_cache.set, address, results)
+        return results
+
+    async def places_nearby(self, location: Optional[Tuple[float, float]] = None, radius: Optional[int] = None,
+                            type: Optional[str] = None, keyword: Optional[str] = None,
+                            page_token: Optional[str] = None) -> Dict:
+        if page_token:
+            # Sayfa token'ı ile diğer parametreler yok sayılır
+            return await self._request('nearby', 'place/nearbysearch/json', {'pagetoken': page_token})
+        return await self._request('nearby', 'place/nearbysearch/json', {
+            'location': f"{location[0]},{location[1]}",
+            'radius': radius,
+            'type': type,
+            'keyword': keyword
+        })
+
+    async def places(self, query: str) -> Dict:
+        return await self._request('text', 'place/textsearch/json', {'query': query})
+
+    async def place(self, place_id: str, fields: List[str]) -> Dict:
+        return await self._request('details', 'place/details/json', {
+            'place_id': place_id,
+            'fields': ','.join(fields)
+        })
+
+    async def search_businesses(self, location: str, business_type: str, radius_km: float) -> SearchResult:
+        """
+        Belirtilen lokasyon ve yarıçapta işletmeleri arar (asenkron)
+
+        Args:
+            location (str): Arama yapılacak lokasyon
+            business_type (str): İşletme türü
+            radius_km (float): Arama yarıçapı (km)
+
+        Returns:
+            SearchResult: İşletme listesi, eksiklik bilgisi, bütçe kullanımı ve grid özeti
+        """
+        # Bu aramanın alt görevleri aynı memo'yu ve bütçeyi görür (context kopyalanır)
+        _search_memo.set({})
+        budget = self.call_budget.fresh()
+        _search_budget.set(budget)
+        grid_report = []
+
+        def result(businesses: List[Dict], failed: bool = False) -> SearchResult:
+            return SearchResult(businesses, failed or budget.exhausted, budget.usage(), summarize_grid(grid_report))
+
+        try:
+            geocode_result = await self.geocode(location)
+            if not geocode_result:
+                print(f"Lokasyon bulunamadı: {location}")
+                return result([])
+
+            lat = geocode_result[0]['geometry']['location']['lat']
+            lng = geocode_result[0]['geometry']['location']['lng']
+            # Hedef alan dışındaki yerler detay çağrısından önce elenir
+            boundary = geofence.boundary_for(location, geocode_result, self.boundary_margin_km)
+
+            seen_place_ids = set()
+            detail_tasks = []
+            semaphore = asyncio.Semaphore(self.details_concurrency)
+
+            def submit(places: List[Dict]):
+                inside_radius = None
+                if self.radius_margin_km >= 0 and places:
+                    inside_radius = geofence.radius_mask(places, lat, lng, radius_km + self.radius_margin_km)
+                for index, place in enumerate(places):
+                    place_id = place.get('place_id')
+                    if place_id and place_id not in seen_place_ids:
+                        seen_place_ids.add(place_id)
+                        if inside_radius is not None and not inside_radius[index]:
+                            continue
+                        if not geofence.place_in_boundary(place, boundary):
+                            continue
+                        detail_tasks.append(asyncio.ensure_future(
+                            self._get_business_details(place_id, semaphore)))
+
+            place_type = self._get_place_type(business_type)
+            radius = int(radius_km * 1000)
+            alternative_queries = [
+                f"{business_type} {location}",
+                f"{location} {business_type}",
+                f"{business_type} in {location}"
+            ]
+
+            # Keşif fazları aynı anda yürür, detaylar bulundukça başlatılır
+            text_tasks = [asyncio.ensure_future(self._text_search(submit, location, business_type))]
+            text_tasks += [asyncio.ensure_future(self._alternative_search(submit, query))
+                           for query in alternative_queries]
+
+            type_result, keyword_result = await asyncio.gather(
+                self._first_page(submit, (lat, lng), radius, type=place_type),
+                self._first_page(submit, (lat, lng), radius, keyword=business_type)
+            )
+            root_saturated = self._is_saturated(type_result) or self._is_saturated(keyword_result)
+
+            await asyncio.gather(
+                self._follow_pages(submit, type_result),
+                self._follow_pages(submit, keyword_result),
+                self._grid_search(submit, grid_report, lat, lng, radius_km, place_type, business_type,
+                                  root_saturated),
+                *text_tasks
+            )
+
+            businesses = []
+            for task in asyncio.as_completed(detail_tasks):
+                business_details = await task
+                if business_details:
+                    businesses.append(business_details)
+
+            return result(businesses)
+
+        except Exception as e:
+            print(f"Arama sırasında hata: {str(e)}")
+            return result([], failed=True)
+
+    async def _first_page(self, submit, location: Tuple[float, float], radius: int,
+                          type: Optional[str] = None, keyword: Optional[str] = None) -> Dict:
+        """Nearby search ilk sayfası"""
+        try:
+            result = await self.places_nearby(location=location, radius=radius, type=type, keyword=keyword)
+        except Exception as e:
+            print(f"Nearby search hatası: {str(e)}")
+            return {}
+        submit(result.get('results', []))
+        return result
+
+    async def _follow_pages(self, submit, first_result: Dict):
+        """Nearby search sonraki sayfaları (maksimum 3 sayfa)"""
+        next_page_token = first_result.get('next_page_token')
+        page_count = 1
+        while next_page_token and page_count < 3:
+            await asyncio.sleep(self.page_token_delay)  # Google API gereksinimi
+            try:
+                result = await self.places_nearby(page_token=next_page_token)
+            except Exception:
+                break
+            submit(result.get('results', []))
+            next_page_token = result.get('next_page_token')
+            page_count += 1
+
+    async def _grid_search(self, submit, report: List[Dict], center_lat: float, center_lng: float,
+                           radius_km: float, place_type: str, business_type: str, root_saturated: bool):
+        """
+        Uyarlanabilir quadtree grid arama (her seviyedeki hücreler aynı anda aranır)
+
+        Hücre ağacı senkron sınıftaki `grid_report` biçiminde aramanın
+        kendi `report` listesine eklenir.
+        """
+        root = self._make_cell(center_lat, center_lng, radius_km, 0)
+        root['saturated'] = root_saturated
+        report.append(root)
+
+        level = [root] if root_saturated else []
+        probed = 0
+        while level and level[0]['depth'] < self.grid_max_depth:
+            children = []
+            for cell in level:
+                for child in self._split_cell(cell)[:max(self.grid_max_cells - probed - len(children), 0)]:
+                    cell['split'] = True
+                    children.append(child)
+            probed += len(children)
+            report.extend(children)
+            await asyncio.gather(*[
+                self._probe_cell(submit, child, place_type, business_type) for child in children
+            ])
+            level = [child for child in children if child['saturated']]
+
+    async def _probe_cell(self, submit, cell: Dict, place_type: str, business_type: str):
+        """Hücre merkezinde type ve keyword ile nearby arama yap, doygunluğu işaretle"""
+        results = 0
+        for kwargs in ({'type': place_type}, {'keyword': business_type}):
+            try:
+                cell_result = await self.places_nearby(
+                    location=(cell['lat'], cell['lng']), radius=cell['radius_m'], **kwargs)
+            except BudgetExceeded:
+                break
+            except Exception:
+                cell['calls'] += 1
+                continue
+            cell['calls'] += 1
+            submit(cell_result.get('results', []))
+            results += len(cell_result.get('results', []))
+            if self._is_saturated(cell_result):
+                cell['saturated'] = True
+        if cell['calls']:
+            cell['results'] = results
+
+    async def _text_search(self, submit, location: str, business_type: str):
+        """Text search ile ek arama yap"""
+        queries = [
+            f"{business_type} near {location}",
+            f"{business_type} {location}",
+            f"{location} {business_type}"
+        ]
+
+        responses = await asyncio.gather(*[self.places(query) for query in queries], return_exceptions=True)
+        all_results = []
+        for response in responses:
+            if not isinstance(response, Exception):
+                all_results.extend(response.get('results', []))
+        submit(all_results[:30])
+
+    async def _alternative_search(self, submit, query: str):
+        try:
+            alt_results = await self.places(query)
+            submit(alt_results.get('results', [])[:15])
+        except Exception:
+            pass
+
+    async def _get_business_details(self, place_id: str, semaphore: asyncio.Semaphore) -> Optional[Dict]:
+        """İşletmenin detaylı bilgilerini alır"""
+        result = await asyncio.to_thread(self.details_cache.get, place_id)
+        if result is not None:
+            return self._build_business_info(result)
+
+        async with semaphore:
+            try:
+                place_details = await self.place(place_id, DETAIL_FIELDS)
+                result = place_details.get('result', {})
+                await asyncio.to_thread(self.details_cache.set, place_id, result)
+                return self._build_business_info(result)
+            except BudgetExceeded:
+                return None
+            except Exception as e:
+                print(f"İşletme detayları alınırken hata: {str(e)}")
+                return None
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Excel dışa aktarma karşılaştırması: eski pandas/ExcelWriter yolu ve
+write-only ExcelExporter.
+
+Her ölçüm ayrı bir alt süreçte çalışır, böylece tepe bellek (peak RSS)
+ölçümleri birbirini etkilemez. Eski yol için pandas kurulu olmalıdır:
+
+    pip install pandas
+    python benchmarks/bench_excel_export.py            # 1k / 10k / 100k satır
+    python benchmarks/bench_excel_export.py 5000 50000
+"""
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+
+def generate_businesses(count):
+    """Gerçekçi uzunlukta sahte işletme satırları üret"""
+    for i in range(count):
+        yield {
+            'İşletme Adı': f"Örnek Eczane {i}",
+            'Adres': f"Caferağa Mah. Moda Cad. No:{i % 300}, {34710 + i % 50} Kadıköy/İstanbul, Türkiye",
+            'Telefon': f"(0216) {330 + i % 600:03d} {i % 100:02d} {i % 97:02d}",
+            'Website': f"https://www.ornek-eczane-{i}.com.tr/",
+            'Durum': 'OPERATIONAL'
+        }
+
+
+def legacy_save_to_excel(businesses, filename):
+    """Eski GoogleMapsScraper.save_to_excel gövdesi (pandas DataFrame yolu)"""
+    import pandas as pd
+
+    df = pd.DataFrame(businesses)
+    with pd.ExcelWriter(filename, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name='İşletmeler', index=False)
+        worksheet = writer.sheets['İşletmeler']
+        for column in worksheet.columns:
+            max_length = 0
+            column_letter = column[0].column_letter
+            for cell in column:
+                if len(str(cell.value)) > max_length:
+                    max_length = len(str(cell.value))
+            worksheet.column_dimensions[column_letter].width = min(max_length + 2, 50)
+
+
+def streaming_save_to_excel(businesses, filename):
+    from exporters import ExcelExporter
+
+    with ExcelExporter(filename) as exporter:
+        exporter.write_rows(businesses)
+
+
+def run_single(method, count):
+    """Alt süreçte tek ölçüm yap ve sonucu JSON olarak yaz"""
+    filename = os.path.join(tempfile.mkdtemp(), 'bench.xlsx')
+    start = time.perf_counter()
+    if method == 'legacy':
+        # Eski API tüm listeyi bellekte bekliyordu
+        legacy_save_to_excel(list(generate_businesses(count)), filename)
+    else:
+        streaming_save_to_excel(generate_businesses(count), filename)
+    elapsed = time.perf_counter() - start
+
+    # Linux'ta ru_maxrss KB, macOS'ta byte cinsindendir
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    print(json.dumps({'seconds': elapsed, 'peak_rss_mb': peak_mb, 'size_kb': os.path.getsize(filename) / 1024}))
+    os.remove(filename)
+
+
+def main(sizes):
+    print(f"{'satır':>8} | {'yöntem':<10} | {'süre (s)':>9} | {'tepe RSS (MB)':>13} | {'dosya (KB)':>10}")
+    print('-' * 63)
+    for count in sizes:
+        for method in ('legacy', 'streaming'):
+            proc = subprocess.run(
+                [sys.executable, __file__, '--run', method, str(count)],
+                capture_output=True, text=True
+            )
+            if proc.returncode != 0:
+                error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'hata'
+                print(f"{count:>8} | {method:<10} | {error}")
+                continue
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+            print(f"{count:>8} | {method:<10} | {result['seconds']:>9.2f} | "
+                  f"{result['peak_rss_mb']:>13.1f} | {result['size_kb']:>10.0f}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == '--run':
+        run_single(sys.argv[2], int(sys.argv[3]))
+    else:
+        main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
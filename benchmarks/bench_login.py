@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Eş zamanlı yük altında /login route'unun saniyedeki başarılı giriş sayısı
+ve gecikme dağılımı: şifre doğrulama istek thread'inde (inline) ve süreç
+havuzunda (pool).
+
+Her yöntem ayrı bir alt süreçte, boş bir geçici dizinde çalışır. İstekler
+gthread worker'ındaki thread'leri taklit eden `concurrency` thread'den,
+her biri kendi Flask test istemcisiyle gönderilir. Başarılı girişler
+sayılır; havuz dolduğunda dönen 503 yanıtları ayrıca raporlanır:
+
+    python benchmarks/bench_login.py                # 8 thread, 200 giriş
+    python benchmarks/bench_login.py 16 400
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_LOGINS = 200
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_single(method, concurrency, logins):
+    """Alt süreçte ölçüm yap ve sonucu JSON olarak yaz"""
+    os.chdir(tempfile.mkdtemp())
+    os.environ['JOB_WORKERS'] = '1'
+    if method == 'inline':
+        os.environ['PASSWORD_HASH_WORKERS'] = '0'
+
+    import app as web
+
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    remaining = [logins]
+
+    def worker():
+        client = web.app.test_client()
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            start = time.perf_counter()
+            response = client.post('/login', data={'username': 'trkz', 'password': '124124Aa.'})
+            elapsed = time.perf_counter() - start
+            with lock:
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                if response.status_code == 302:
+                    latencies.append(elapsed)
+            client.get('/logout')
+
+    # Isınma (havuz süreçleri ve sahte hash)
+    warmup = web.app.test_client()
+    warmup.post('/login', data={'username': 'trkz', 'password': '124124Aa.'})
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.perf_counter() - start
+
+    print(json.dumps({
+        'logins_per_sec': len(latencies) / duration,
+        'p50': percentile(latencies, 0.50) if latencies else 0.0,
+        'p99': percentile(latencies, 0.99) if latencies else 0.0,
+        'busy': statuses.get(503, 0)
+    }))
+
+
+def main(concurrency, logins):
+    print(f"{concurrency} thread, {logins} giriş")
+    print(f"{'yöntem':<8} | {'giriş/s':>8} | {'p50 (ms)':>9} | {'p99 (ms)':>9} | {'503':>5}")
+    print('-' * 52)
+    for method in ('inline', 'pool'):
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--run', method, str(concurrency), str(logins)],
+            capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'hata'
+            print(f"{method:<8} | {error}")
+            continue
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"{method:<8} | {result['logins_per_sec']:>8.1f} | {result['p50'] * 1000:>9.1f} | "
+              f"{result['p99'] * 1000:>9.1f} | {result['busy']:>5}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 5 and sys.argv[1] == '--run':
+        run_single(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CONCURRENCY,
+             int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_LOGINS)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ana sayfa (/) ve durum (/api/status/<job_id>) route'larının saniyedeki
+istek sayısı: bağlantı başına istek (eski) ve thread'e ait tekrar kullanılan
+WAL bağlantısı (yeni).
+
+Her yöntem ayrı bir alt süreçte, boş bir geçici dizinde çalışır; eski yol
+için Database._connect her çağrıda yeni bir bağlantı açacak şekilde
+değiştirilir ve veritabanı WAL moduna alınmaz. İstekler Flask test
+istemcisiyle, oturum açmış admin kullanıcısı olarak gönderilir:
+
+    python benchmarks/bench_routes.py          # route başına 2000 istek
+    python benchmarks/bench_routes.py 5000
+"""
+
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+DEFAULT_REQUESTS = 2000
+
+
+def legacy_connect(self):
+    """Eski davranış: her metot çağrısında yeni bağlantı"""
+    return sqlite3.connect(self.db_path)
+
+
+def run_single(method, requests):
+    """Alt süreçte ölçüm yap ve sonucu JSON olarak yaz"""
+    os.chdir(tempfile.mkdtemp())
+    os.environ['JOB_WORKERS'] = '1'
+
+    import database
+    if method == 'legacy':
+        database.Database._connect = legacy_connect
+
+    import app as web
+    from job_store import SearchJob
+
+    job = SearchJob('bench-job', 'Kadıköy, İstanbul, Turkey', 'eczane', 3)
+    job.status = 'running'
+    job.progress = 55
+    web.job_store.save(job)
+
+    client = web.app.test_client()
+    client.post('/login', data={'username': 'trkz', 'password': '124124Aa.'})
+
+    result = {}
+    for name, path in (('index', '/'), ('status', '/api/status/bench-job')):
+        # Isınma
+        for _ in range(50):
+            client.get(path)
+        start = time.perf_counter()
+        for _ in range(requests):
+            response = client.get(path)
+            if response.status_code != 200:
+                raise RuntimeError(f"{path} -> {response.status_code}")
+        result[name] = requests / (time.perf_counter() - start)
+    print(json.dumps(result))
+
+
+def main(requests):
+    print(f"{'yöntem':<10} | {'/ (istek/s)':>12} | {'/api/status (istek/s)':>22}")
+    print('-' * 52)
+    for method in ('legacy', 'pooled'):
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--run', method, str(requests)],
+            capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'hata'
+            print(f"{method:<10} | {error}")
+            continue
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"{method:<10} | {result['index']:>12.0f} | {result['status']:>22.0f}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == '--run':
+        run_single(sys.argv[2], int(sys.argv[3]))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_REQUESTS)
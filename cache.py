@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+import uuid
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Any, Tuple
+
+
+class SqliteCache:
+    """
+    SQLite tabanlı, TTL ve LRU tahliyeli anahtar/değer önbelleği
+
+    Aynı dosyayı birden fazla süreç (gunicorn worker'ları, CLI, GUI)
+    paylaşabilir; bu yüzden WAL modu ve busy timeout kullanılır.
+
+    İsabetler yazma işlemi açmaz: erişim zamanı `last_access` değeri
+    `ACCESS_WRITE_INTERVAL` saniyeden eskiyse bellekte biriktirilir ve
+    sonraki `set()` ile, tahliyeden önce ya da biriken kayıt sayısı ve
+    süre dolunca tek işlemde yazılır. LRU sırası bu aralık kadar yaklaşıktır.
+    """
+
+    table_name = 'cache'
+
+    # Erişim zamanlarının yazılma aralığı ve bir seferde biriktirilecek en fazla kayıt
+    ACCESS_WRITE_INTERVAL = 300
+    ACCESS_FLUSH_SIZE = 100
+
+    def __init__(self, db_path: str, ttl_seconds: float, max_entries: int = 0):
+        """
+        Args:
+            db_path (str): SQLite dosya yolu
+            ttl_seconds (float): Kaydın geçerli sayılacağı süre
+            max_entries (int): Tutulacak en fazla kayıt (0 = sınırsız)
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._touched = {}
+        self._last_flush = time.time()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {self.table_name} (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        ''')
+        self._conn.execute(f'''
+            CREATE INDEX IF NOT EXISTS idx_{self.table_name}_last_access
+            ON {self.table_name} (last_access)
+        ''')
+        self._conn.commit()
+        self._count = self._conn.execute(f'SELECT COUNT(*) FROM {self.table_name}').fetchone()[0]
+
+    def get(self, key: str) -> Optional[Any]:
+        """Geçerli kaydı döndür, yoksa veya süresi dolmuşsa None"""
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Geçerli kaydı ve yaşını (saniye) döndür, yoksa veya süresi dolmuşsa None"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f'SELECT value, fetched_at, last_access FROM {self.table_name} WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if now - row[2] > self.ACCESS_WRITE_INTERVAL:
+                self._touched[key] = now
+                if (len(self._touched) >= self.ACCESS_FLUSH_SIZE
+                        or now - self._last_flush > self.ACCESS_WRITE_INTERVAL):
+                    self._flush_access()
+                    self._conn.commit()
+        return json.loads(row[0]), now - row[1]
+
+    def _flush_access(self):
+        """Biriken erişim zamanlarını yaz (kilit altında, commit çağırana ait)"""
+        self._last_flush = time.time()
+        if not self._touched:
+            return
+        self._conn.executemany(
+            f'UPDATE {self.table_name} SET last_access = MAX(last_access, ?) WHERE key = ?',
+            [(accessed, key) for key, accessed in self._touched.items()]
+        )
+        self._touched.clear()
+
+    def set(self, key: str, value: Any):
+        """Kaydı ekle/güncelle ve gerekirse en eski kullanılanları tahliye et"""
+        with self._lock:
+            self._set_locked(key, value)
+            self._conn.commit()
+
+    def _set_locked(self, key: str, value: Any):
+        """Kaydı yaz ve gerekirse tahliye et (kilit altında, commit çağırana ait)"""
+        now = time.time()
+        data = json.dumps(value, ensure_ascii=False)
+        cursor = self._conn.execute(f'''
+            INSERT OR IGNORE INTO {self.table_name} (key, value, fetched_at, last_access)
+            VALUES (?, ?, ?, ?)
+        ''', (key, data, now, now))
+        if cursor.rowcount:
+            self._count += 1
+        else:
+            self._conn.execute(f'''
+                UPDATE {self.table_name} SET value = ?, fetched_at = ?, last_access = ?
+                WHERE key = ?
+            ''', (data, now, now, key))
+        self._touched.pop(key, None)
+        self._flush_access()
+        if self.max_entries and self._count > self.max_entries:
+            self._evict()
+
+    def _evict(self):
+        """En uzun süredir kullanılmayan kayıtları sil (kilit altında çağrılır)"""
+        # Diğer süreçlerin eklediği kayıtlar için sayıyı tazele
+        self._count = self._conn.execute(f'SELECT COUNT(*) FROM {self.table_name}').fetchone()[0]
+        excess = self._count - self.max_entries
+        if excess <= 0:
+            return
+        cursor = self._conn.execute(f'''
+            DELETE FROM {self.table_name} WHERE key IN (
+                SELECT key FROM {self.table_name} ORDER BY last_access ASC LIMIT ?
+            )
+        ''', (excess,))
+        self.evictions += cursor.rowcount
+        self._count -= cursor.rowcount
+
+    def stats(self) -> Dict:
+        """İsabet/kayıp sayaçlarını döndür"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': self._count,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0
+        }
+
+
+class TTLCache:
+    """
+    Süreç içi, TTL'li bellek önbelleği
+
+    Kayıtlar `ttl_seconds` sonra geçersiz olur; değişen kayıtlar
+    `invalidate()` ile hemen düşürülebilir. `max_entries` aşılınca en eski
+    eklenen kayıt atılır.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 10000):
+        """
+        Args:
+            ttl_seconds (float): Kaydın geçerli sayılacağı süre
+            max_entries (int): Tutulacak en fazla kayıt
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Optional[Any]:
+        """Geçerli kaydı döndür, yoksa veya süresi dolmuşsa None"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or time.monotonic() - entry[1] > self.ttl_seconds:
+                self._data.pop(key, None)
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Any, value: Any):
+        with self._lock:
+            self._data.pop(key, None)
+            if len(self._data) >= self.max_entries:
+                # dict ekleme sırasını korur, ilk anahtar en eskisidir
+                del self._data[next(iter(self._data))]
+            self._data[key] = (value, time.monotonic())
+
+    def invalidate(self, key: Any):
+        """Kaydı hemen düşür"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class PlaceDetailsCache(SqliteCache):
+    """place_id -> place details yanıtı önbelleği"""
+
+    table_name = 'place_details'
+
+
+def normalize_location(location: str) -> str:
+    """
+    Lokasyon string'ini önbellek anahtarına dönüştür
+
+    Türkçe büyük/küçük harf kurallarını uygular (İ -> i, I -> ı), boşlukları
+    sadeleştirir ve virgül etrafını tek biçime getirir:
+        "  KADIKÖY ,İstanbul,  Turkey " -> "kadıköy, istanbul, turkey"
+    """
+    text = unicodedata.normalize('NFC', location)
+    text = text.replace('İ', 'i').replace('I', 'ı').lower()
+    parts = [' '.join(part.split()) for part in text.split(',')]
+    return ', '.join(part for part in parts if part)
+
+
+class GeocodeCache(SqliteCache):
+    """Normalize edilmiş lokasyon -> geocode sonucu önbelleği"""
+
+    table_name = 'geocode'
+
+    def get(self, location: str) -> Optional[Any]:
+        return super().get(normalize_location(location))
+
+    def set(self, location: str, value: Any):
+        super().set(normalize_location(location), value)
+
+    def warm(self, locations: Iterable[str], geocode: Callable[[str], Any]) -> int:
+        """
+        Önbellekte olmayan lokasyonları toplu olarak geocode et
+
+        Args:
+            locations: Lokasyon string'leri
+            geocode: Lokasyonu geocode eden fonksiyon (ör. gmaps.geocode)
+
+        Returns:
+            int: API'den çekilen lokasyon sayısı
+        """
+        fetched = 0
+        for location in locations:
+            if self.get(location) is not None:
+                continue
+            try:
+                result = geocode(location)
+            except Exception as e:
+                print(f"Geocode hatası ({location}): {str(e)}")
+                continue
+            if result:
+                self.set(location, result)
+                fetched += 1
+        return fetched
+
+
+class SearchResultCache(SqliteCache):
+    """
+    (lokasyon, işletme türü, yarıçap) -> tamamlanmış arama sonuçları önbelleği
+
+    Aynı aramayı yapan kullanıcılar keşif ve detay çağrılarını tekrarlamaz;
+    dosya her iş için istenen formatta yeniden yazılır. Kayıt yalnızca
+    satır sayısını ve grid raporunu tutar; satırlar arama sürerken
+    `writer()` ile `search_result_rows` tablosuna parça parça yazılır ve
+    `iter_rows()` ile aynı şekilde okunur, hiçbir aşamada tüm sonuç
+    belleğe alınmaz.
+
+    Yazılan satırlar `commit()` çağrılana kadar geçici bir anahtar altında
+    bekler; eksik kalan arama `discard()` ile (ya da süreç çökerse bir
+    sonraki tahliyede) silinir, okuyucular yarım sonuç görmez.
+    """
+
+    table_name = 'search_results'
+    rows_table = 'search_result_rows'
+
+    # Satırların bir seferde yazılıp okunduğu parça boyutu
+    ROW_BATCH_SIZE = 500
+    # Çökmüş yazıcılardan kalan geçici satırların silinmesi için beklenen süre
+    PENDING_MAX_AGE = 86400
+
+    def __init__(self, db_path: str, ttl_seconds: float, max_entries: int = 0):
+        super().__init__(db_path, ttl_seconds, max_entries)
+        with self._lock:
+            self._conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS {self.rows_table} (
+                    key TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    pending INTEGER NOT NULL DEFAULT 0,
+                    written_at REAL NOT NULL,
+                    PRIMARY KEY (key, seq)
+                )
+            ''')
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(location: str, business_type: str, radius_km: float) -> str:
+        return f"{normalize_location(location)}|{normalize_location(business_type)}|{float(radius_km):g}"
+
+    def get(self, location: str, business_type: str, radius_km: float) -> Optional[Tuple[Any, float]]:
+        """Kaydı (row_count, grid_report) ve yaşını (saniye) döndür, yoksa None"""
+        return self.get_entry(self.make_key(location, business_type, radius_km))
+
+    def writer(self, location: str, business_type: str, radius_km: float) -> 'SearchResultWriter':
+        """Arama sürerken satırları önbelleğe yazacak yazıcıyı döndür"""
+        return SearchResultWriter(self, self.make_key(location, business_type, radius_km))
+
+    def iter_rows(self, location: str, business_type: str, radius_km: float) -> Iterator[Dict]:
+        """Önbellekteki satırları yazılma sırasıyla parça parça döndür"""
+        key = self.make_key(location, business_type, radius_km)
+        last_seq = -1
+        while True:
+            with self._lock:
+                batch = self._conn.execute(f'''
+                    SELECT seq, data FROM {self.rows_table}
+                    WHERE key = ? AND pending = 0 AND seq > ? ORDER BY seq LIMIT ?
+                ''', (key, last_seq, self.ROW_BATCH_SIZE)).fetchall()
+            for seq, data in batch:
+                yield json.loads(data)
+            if len(batch) < self.ROW_BATCH_SIZE:
+                return
+            last_seq = batch[-1][0]
+
+    def _write_rows(self, pending_key: str, rows: List[Tuple[int, str]]):
+        with self._lock:
+            now = time.time()
+            self._conn.executemany(f'''
+                INSERT INTO {self.rows_table} (key, seq, data, pending, written_at) VALUES (?, ?, ?, 1, ?)
+            ''', [(pending_key, seq, data, now) for seq, data in rows])
+            self._conn.commit()
+
+    def _publish(self, pending_key: str, key: str, value: Any):
+        """Geçici satırları kaydın satırları yap ve kaydı tek işlemde yaz"""
+        with self._lock:
+            self._conn.execute(f'DELETE FROM {self.rows_table} WHERE key = ?', (key,))
+            self._conn.execute(
+                f'UPDATE {self.rows_table} SET key = ?, pending = 0 WHERE key = ?', (key, pending_key)
+            )
+            self._set_locked(key, value)
+            self._conn.commit()
+
+    def _discard(self, pending_key: str):
+        with self._lock:
+            self._conn.execute(f'DELETE FROM {self.rows_table} WHERE key = ?', (pending_key,))
+            self._conn.commit()
+
+    def _evict(self):
+        """Kayıtlarla birlikte satırlarını ve çökmüş yazıcılardan kalanları sil"""
+        super()._evict()
+        self._conn.execute(f'''
+            DELETE FROM {self.rows_table}
+            WHERE (pending = 0 AND key NOT IN (SELECT key FROM {self.table_name}))
+               OR (pending = 1 AND written_at < ?)
+        ''', (time.time() - self.PENDING_MAX_AGE,))
+
+
+class SearchResultWriter:
+    """
+    Bir aramanın satırlarını önbelleğe akıtan yazıcı
+
+    `add()` satırları ROW_BATCH_SIZE'lık parçalar halinde geçici anahtar
+    altına yazar; `commit()` kaydı yayınlar, `discard()` (commit edilmemişse)
+    yazılanları siler.
+    """
+
+    def __init__(self, cache: SearchResultCache, key: str):
+        self.cache = cache
+        self.key = key
+        self.pending_key = f"{key}|{uuid.uuid4().hex}"
+        self.row_count = 0
+        self._buffer = []
+        self._closed = False
+
+    def add(self, row: Dict):
+        self._buffer.append((self.row_count, json.dumps(row, ensure_ascii=False)))
+        self.row_count += 1
+        if len(self._buffer) >= self.cache.ROW_BATCH_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            self.cache._write_rows(self.pending_key, self._buffer)
+            self._buffer = []
+
+    def commit(self, grid_report: Any = None):
+        """Yazılan satırları ve grid raporunu önbellek kaydı olarak yayınla"""
+        self._flush()
+        self.cache._publish(self.pending_key, self.key, {'row_count': self.row_count, 'grid_report': grid_report})
+        self._closed = True
+
+    def discard(self):
+        """Commit edilmemiş satırları sil"""
+        if self._closed:
+            return
+        self._buffer = []
+        if self.row_count:
+            self.cache._discard(self.pending_key)
+        self._closed = True
+
+
+_place_details_cache = None
+_geocode_cache = None
+_search_result_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_place_details_cache() -> PlaceDetailsCache:
+    """Süreç genelinde paylaşılan place details önbelleğini döndür"""
+    global _place_details_cache
+    with _cache_lock:
+        if _place_details_cache is None:
+            _place_details_cache = PlaceDetailsCache(
+                os.getenv('PLACE_CACHE_PATH', 'cache.db'),
+                ttl_seconds=float(os.getenv('PLACE_CACHE_TTL_DAYS', 7)) * 86400,
+                max_entries=int(os.getenv('PLACE_CACHE_MAX_ENTRIES', 100000))
+            )
+        return _place_details_cache
+
+
+def get_geocode_cache() -> GeocodeCache:
+    """Süreç genelinde paylaşılan geocode önbelleğini döndür"""
+    global _geocode_cache
+    with _cache_lock:
+        if _geocode_cache is None:
+            _geocode_cache = GeocodeCache(
+                os.getenv('PLACE_CACHE_PATH', 'cache.db'),
+                ttl_seconds=float(os.getenv('GEOCODE_CACHE_TTL_DAYS', 180)) * 86400
+            )
+        return _geocode_cache
+
+
+def get_search_result_cache() -> SearchResultCache:
+    """
+    Süreç genelinde paylaşılan arama sonucu önbelleğini döndür
+
+    SEARCH_CACHE_TTL_HOURS (varsayılan 24, 0 = kapalı) ve
+    SEARCH_CACHE_MAX_ENTRIES (500) ortam değişkenlerinden okunur.
+    """
+    global _search_result_cache
+    with _cache_lock:
+        if _search_result_cache is None:
+            _search_result_cache = SearchResultCache(
+                os.getenv('PLACE_CACHE_PATH', 'cache.db'),
+                ttl_seconds=float(os.getenv('SEARCH_CACHE_TTL_HOURS', 24)) * 3600,
+                max_entries=int(os.getenv('SEARCH_CACHE_MAX_ENTRIES', 500))
+            )
+        return _search_result_cache
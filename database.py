@@ -2,18 +2,74 @@
 # -*- coding: utf-8 -*-
 
 import sqlite3
+import threading
 from datetime import datetime, timedelta
-from werkzeug.security import generate_password_hash, check_password_hash
 import os
+from password_hasher import HasherBusy, get_password_hasher
+
+# Şema geçişleri: PRAGMA user_version'dan büyük olanlar sırayla uygulanır
+MIGRATIONS = [
+    # 1: Kullanıcı bazlı geçmiş sorgularını karşılayan (covering) indeksler
+    '''
+    CREATE INDEX IF NOT EXISTS idx_search_history_user_created
+        ON search_history (user_id, created_at, location, business_type, radius_km, result_count);
+    CREATE INDEX IF NOT EXISTS idx_login_history_user_time
+        ON login_history (user_id, login_time, ip_address, user_agent);
+    ''',
+    # 2: Saklama süresini aşan kayıtların günlük özetleri ve bakım zamanları
+    '''
+    CREATE TABLE IF NOT EXISTS search_history_daily (
+        user_id INTEGER NOT NULL,
+        day DATE NOT NULL,
+        location TEXT NOT NULL,
+        business_type TEXT NOT NULL,
+        searches INTEGER NOT NULL,
+        total_results INTEGER NOT NULL,
+        PRIMARY KEY (user_id, day, location, business_type)
+    );
+    CREATE TABLE IF NOT EXISTS login_history_daily (
+        user_id INTEGER NOT NULL,
+        day DATE NOT NULL,
+        ip_address TEXT NOT NULL,
+        logins INTEGER NOT NULL,
+        PRIMARY KEY (user_id, day, ip_address)
+    );
+    CREATE TABLE IF NOT EXISTS maintenance (
+        name TEXT PRIMARY KEY,
+        last_run TIMESTAMP NOT NULL
+    );
+    ''',
+]
 
 class Database:
-    def __init__(self, db_path='users.db'):
+    def __init__(self, db_path='users.db', hasher=None):
         self.db_path = db_path
+        # Şifre hash'leri istek thread'lerinde değil, sınırlı bir süreç havuzunda hesaplanır
+        self.hasher = hasher or get_password_hasher()
+        # Her thread kendi bağlantısını tekrar kullanır (sqlite3 bağlantıları thread'ler arasında paylaşılmaz)
+        self._local = threading.local()
         self.init_db()
     
+    def _connect(self):
+        """
+        Thread'e ait, tekrar kullanılan bağlantıyı döndür
+        
+        İlk kullanımda WAL modu, NORMAL senkronizasyon ve busy timeout
+        ayarlanır; hazırlanmış SQL ifadeleri bağlantının ifade önbelleğinde
+        tutulur. Fork sonrası (gunicorn) üst sürecin bağlantısı kullanılmaz.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30, cached_statements=256)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+    
     def init_db(self):
         """Veritabanını başlat ve tabloları oluştur"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         # Kullanıcılar tablosu
@@ -59,23 +115,126 @@ class Database:
         # Varsayılan admin kullanıcısı oluştur
         admin_exists = cursor.execute('SELECT COUNT(*) FROM users WHERE username = ?', ('trkz',)).fetchone()[0]
         if admin_exists == 0:
-            admin_hash = generate_password_hash('124124Aa.')
+            admin_hash = self.hasher.hash('124124Aa.')
             expiry_date = (datetime.now() + timedelta(days=365)).date()
             cursor.execute('''
-                INSERT INTO users (username, password_hash, is_admin, expiry_date)
+                INSERT OR IGNORE INTO users (username, password_hash, is_admin, expiry_date)
                 VALUES (?, ?, ?, ?)
             ''', ('trkz', admin_hash, True, expiry_date))
         
         conn.commit()
-        conn.close()
+        self.migrate()
+    
+    def migrate(self):
+        """Uygulanmamış şema geçişlerini uygula"""
+        conn = self._connect()
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        for number, script in enumerate(MIGRATIONS[version:], start=version + 1):
+            # Betikler IF NOT EXISTS ile yazıldı, aynı anda başlayan worker'larda tekrar çalışabilir
+            conn.executescript(script)
+            conn.execute(f'PRAGMA user_version = {number}')
+            conn.commit()
+    
+    def apply_retention(self, search_days=90, login_days=180):
+        """
+        Eski geçmiş kayıtlarını günlük özet tablolarına taşı
+        
+        `search_days` / `login_days` günden eski arama ve giriş kayıtları
+        kullanıcı, gün ve lokasyon/IP bazında toplanıp *_daily tablolarına
+        eklenir, ardından ana tablolardan silinir. 0 o tablo için saklamayı
+        kapatır.
+        
+        Returns:
+            dict: Özetlenip silinen satır sayıları
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        result = {'search_history': 0, 'login_history': 0}
+        
+        try:
+            if search_days:
+                cutoff = f'-{int(search_days)} days'
+                cursor.execute('''
+                    INSERT INTO search_history_daily (user_id, day, location, business_type, searches, total_results)
+                    SELECT user_id, date(created_at), location, business_type, COUNT(*), SUM(result_count)
+                    FROM search_history WHERE created_at < datetime('now', ?)
+                    GROUP BY user_id, date(created_at), location, business_type
+                    ON CONFLICT (user_id, day, location, business_type) DO UPDATE SET
+                        searches = searches + excluded.searches,
+                        total_results = total_results + excluded.total_results
+                ''', (cutoff,))
+                cursor.execute("DELETE FROM search_history WHERE created_at < datetime('now', ?)", (cutoff,))
+                result['search_history'] = cursor.rowcount
+            
+            if login_days:
+                cutoff = f'-{int(login_days)} days'
+                cursor.execute('''
+                    INSERT INTO login_history_daily (user_id, day, ip_address, logins)
+                    SELECT user_id, date(login_time), ip_address, COUNT(*)
+                    FROM login_history WHERE login_time < datetime('now', ?)
+                    GROUP BY user_id, date(login_time), ip_address
+                    ON CONFLICT (user_id, day, ip_address) DO UPDATE SET
+                        logins = logins + excluded.logins
+                ''', (cutoff,))
+                cursor.execute("DELETE FROM login_history WHERE login_time < datetime('now', ?)", (cutoff,))
+                result['login_history'] = cursor.rowcount
+            
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        
+        return result
+    
+    def optimize(self, vacuum=True):
+        """İstatistikleri güncelle (ANALYZE) ve isteğe bağlı olarak dosyayı sıkıştır (VACUUM)"""
+        conn = self._connect()
+        conn.commit()
+        conn.execute('ANALYZE')
+        if vacuum:
+            conn.execute('VACUUM')
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    
+    def run_maintenance(self, interval_hours=24, search_days=90, login_days=180, vacuum=True, force=False):
+        """
+        Saklama ve optimizasyon işlerini en fazla `interval_hours` saatte bir çalıştır
+        
+        Son çalışma zamanı veritabanında tutulur; böylece birden fazla süreç
+        aynı aralıkta tekrar çalıştırmaz.
+        
+        Returns:
+            dict: Özetlenen satır sayıları, aralık dolmadıysa None
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        # Son çalışma zamanına bak ve aynı işlemde sırayı kendimize al
+        conn.commit()
+        cursor.execute('BEGIN IMMEDIATE')
+        row = cursor.execute(
+            "SELECT last_run > datetime('now', ?) FROM maintenance WHERE name = 'history'",
+            (f'-{int(interval_hours * 60)} minutes',)
+        ).fetchone()
+        if row and row[0] and not force:
+            conn.rollback()
+            return None
+        cursor.execute('''
+            INSERT INTO maintenance (name, last_run) VALUES ('history', CURRENT_TIMESTAMP)
+            ON CONFLICT (name) DO UPDATE SET last_run = CURRENT_TIMESTAMP
+        ''')
+        conn.commit()
+        
+        result = self.apply_retention(search_days, login_days)
+        self.optimize(vacuum)
+        return result
     
     def create_user(self, username, password, days_valid=30, is_admin=False, unlimited=False):
         """Yeni kullanıcı oluştur"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
             
-            password_hash = generate_password_hash(password)
+            password_hash = self.hasher.hash(password)
             
             if unlimited:
                 # Sınırsız kullanıcı için çok uzak bir tarih (2099-12-31)
@@ -89,14 +248,14 @@ class Database:
             ''', (username, password_hash, is_admin, expiry_date))
             
             conn.commit()
-            conn.close()
             return True
         except sqlite3.IntegrityError:
+            conn.rollback()
             return False  # Kullanıcı zaten var
     
     def verify_user(self, username, password):
         """Kullanıcı doğrulama"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -105,11 +264,11 @@ class Database:
         ''', (username,))
         
         user = cursor.fetchone()
-        conn.close()
         
         if user and user[4]:  # is_active kontrolü
             user_id, password_hash, is_admin, expiry_date, is_active = user
-            if check_password_hash(password_hash, password):
+            if self.hasher.verify(password_hash, password):
+                self._upgrade_hash(user_id, password_hash, password)
                 # Süre kontrolü
                 expiry = datetime.strptime(expiry_date, '%Y-%m-%d').date()
                 if expiry >= datetime.now().date():
@@ -125,7 +284,7 @@ class Database:
     
     def update_last_login(self, user_id):
         """Son giriş zamanını güncelle"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -133,11 +292,40 @@ class Database:
         ''', (user_id,))
         
         conn.commit()
-        conn.close()
+    
+    def _format_user(self, row):
+        """users satırını admin paneli sözlüğüne dönüştür"""
+        user_id, username, is_admin, expiry_date, created_at, last_login, is_active = row
+        expiry = datetime.strptime(expiry_date, '%Y-%m-%d').date()
+        days_left = (expiry - datetime.now().date()).days
+        
+        # Sınırsız kullanıcı kontrolü (2099 yılı = sınırsız)
+        is_unlimited = expiry.year >= 2099
+        
+        if is_unlimited:
+            status = 'Sınırsız' if is_active else 'Pasif'
+            days_left_text = 'Sınırsız'
+        else:
+            status = 'Aktif' if days_left > 0 and is_active else 'Süresi Dolmuş' if days_left <= 0 else 'Pasif'
+            days_left_text = f"{days_left} gün" if days_left > 0 else "Dolmuş"
+        
+        return {
+            'id': user_id,
+            'username': username,
+            'is_admin': bool(is_admin),
+            'expiry_date': expiry_date,
+            'days_left': days_left,
+            'days_left_text': days_left_text,
+            'created_at': created_at,
+            'last_login': last_login,
+            'is_active': bool(is_active),
+            'is_unlimited': is_unlimited,
+            'status': status
+        }
     
     def get_all_users(self):
         """Tüm kullanıcıları getir"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -145,42 +333,108 @@ class Database:
             FROM users ORDER BY created_at DESC
         ''')
         
+        return [self._format_user(row) for row in cursor.fetchall()]
+    
+    def get_users_page(self, limit=50, after_id=None, before_id=None, search=None, logins_per_user=10):
+        """
+        Admin paneli için bir sayfa kullanıcıyı son girişleriyle birlikte getir
+        
+        Kullanıcılar id'ye göre yeniden eskiye sıralanır ve id üzerinden keyset
+        sayfalama yapılır (after_id: sonraki sayfa, before_id: önceki sayfa).
+        Her kullanıcının son `logins_per_user` girişi aynı sorguda
+        ROW_NUMBER() penceresiyle alınır.
+        
+        Returns:
+            dict: users, next_cursor (sonraki sayfa için after_id), prev_cursor (önceki sayfa için before_id)
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        conditions = []
+        params = []
+        if search:
+            pattern = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            conditions.append("username LIKE ? ESCAPE '\\'")
+            params.append(f"%{pattern}%")
+        if after_id is not None:
+            conditions.append('id < ?')
+            params.append(after_id)
+        elif before_id is not None:
+            conditions.append('id > ?')
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        # Önceki sayfa için artan sırada alıp sonra ters çevir; bir fazla satır devam olup olmadığını gösterir
+        order = 'ASC' if after_id is None and before_id is not None else 'DESC'
+        
+        cursor.execute(f'''
+            WITH page AS (
+                SELECT id, username, is_admin, expiry_date, created_at, last_login, is_active
+                FROM users {where}
+                ORDER BY id {order}
+                LIMIT ?
+            ),
+            recent_logins AS (
+                SELECT user_id, ip_address, user_agent, login_time,
+                       ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY login_time DESC, id DESC) AS rn
+                FROM login_history
+                WHERE user_id IN (SELECT id FROM page)
+            )
+            SELECT p.id, p.username, p.is_admin, p.expiry_date, p.created_at, p.last_login, p.is_active,
+                   r.ip_address, r.user_agent, r.login_time
+            FROM page p
+            LEFT JOIN recent_logins r ON r.user_id = p.id AND r.rn <= ?
+            ORDER BY p.id {order}, r.rn
+        ''', (*params, limit + 1, logins_per_user))
+        
         users = []
+        by_id = {}
         for row in cursor.fetchall():
-            user_id, username, is_admin, expiry_date, created_at, last_login, is_active = row
-            expiry = datetime.strptime(expiry_date, '%Y-%m-%d').date()
-            days_left = (expiry - datetime.now().date()).days
-            
-            # Sınırsız kullanıcı kontrolü (2099 yılı = sınırsız)
-            is_unlimited = expiry.year >= 2099
-            
-            if is_unlimited:
-                status = 'Sınırsız' if is_active else 'Pasif'
-                days_left_text = 'Sınırsız'
-            else:
-                status = 'Aktif' if days_left > 0 and is_active else 'Süresi Dolmuş' if days_left <= 0 else 'Pasif'
-                days_left_text = f"{days_left} gün" if days_left > 0 else "Dolmuş"
-            
-            users.append({
-                'id': user_id,
-                'username': username,
-                'is_admin': bool(is_admin),
-                'expiry_date': expiry_date,
-                'days_left': days_left,
-                'days_left_text': days_left_text,
-                'created_at': created_at,
-                'last_login': last_login,
-                'is_active': bool(is_active),
-                'is_unlimited': is_unlimited,
-                'status': status
-            })
+            user = by_id.get(row[0])
+            if user is None:
+                user = self._format_user(row[:7])
+                user['login_history'] = []
+                by_id[row[0]] = user
+                users.append(user)
+            if row[7] is not None:
+                user['login_history'].append({
+                    'ip_address': row[7],
+                    'user_agent': row[8],
+                    'login_time': row[9]
+                })
+        
+        has_more = len(users) > limit
+        users = users[:limit]
+        if order == 'ASC':
+            users.reverse()
+        
+        # Sayfanın iki ucunda başka kayıt var mı
+        has_newer = has_more if order == 'ASC' else after_id is not None
+        has_older = has_more if order == 'DESC' else True
+        return {
+            'users': users,
+            'next_cursor': users[-1]['id'] if users and has_older else None,
+            'prev_cursor': users[0]['id'] if users and has_newer else None
+        }
+    
+    def get_user_counts(self):
+        """Admin paneli istatistikleri (toplam, aktif, süresi dolmuş)"""
+        conn = self._connect()
+        cursor = conn.cursor()
         
-        conn.close()
-        return users
+        today = datetime.now().date().isoformat()
+        cursor.execute('''
+            SELECT COUNT(*),
+                   COALESCE(SUM(is_active AND expiry_date > ? AND expiry_date < '2099-01-01'), 0),
+                   COALESCE(SUM(expiry_date <= ?), 0)
+            FROM users
+        ''', (today, today))
+        
+        total, active, expired = cursor.fetchone()
+        return {'total': total, 'active': active, 'expired': expired}
     
     def update_user_expiry(self, user_id, days_to_add):
         """Kullanıcının süresini güncelle"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         # Mevcut süreyi al
@@ -196,12 +450,11 @@ class Database:
         ''', (new_expiry, user_id))
         
         conn.commit()
-        conn.close()
         return True
     
     def toggle_user_status(self, user_id):
         """Kullanıcı durumunu aktif/pasif yap"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('SELECT is_active FROM users WHERE id = ?', (user_id,))
@@ -211,23 +464,21 @@ class Database:
         cursor.execute('UPDATE users SET is_active = ? WHERE id = ?', (new_status, user_id))
         
         conn.commit()
-        conn.close()
         return new_status
     
     def delete_user(self, user_id):
         """Kullanıcıyı sil"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('DELETE FROM users WHERE id = ? AND username != "trkz"', (user_id,))
         
         conn.commit()
-        conn.close()
         return cursor.rowcount > 0
     
     def add_search_history(self, user_id, location, business_type, radius_km, result_count=0):
         """Arama geçmişine yeni kayıt ekle"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -236,11 +487,10 @@ class Database:
         ''', (user_id, location, business_type, radius_km, result_count))
         
         conn.commit()
-        conn.close()
     
     def get_user_search_history(self, user_id, limit=5):
         """Kullanıcının arama geçmişini getir"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -261,12 +511,11 @@ class Database:
                 'created_at': row[4]
             })
         
-        conn.close()
         return history
     
     def add_login_history(self, user_id, ip_address, user_agent=None):
         """Kullanıcı giriş geçmişine kayıt ekle"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -275,11 +524,10 @@ class Database:
         ''', (user_id, ip_address, user_agent))
         
         conn.commit()
-        conn.close()
     
     def get_user_login_history(self, user_id, limit=10):
         """Kullanıcının giriş geçmişini getir"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -298,12 +546,11 @@ class Database:
                 'login_time': row[2]
             })
         
-        conn.close()
         return history
     
     def authenticate_user(self, username, password):
         """Kullanıcı doğrulama"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -312,10 +559,11 @@ class Database:
         ''', (username,))
         
         user_row = cursor.fetchone()
-        conn.close()
         
-        if user_row and check_password_hash(user_row[2], password):
+        # Kullanıcı yoksa da aynı maliyette doğrulama yapılır
+        if self.hasher.verify(user_row[2] if user_row else None, password):
             user_id, username, password_hash, is_admin, expiry_date, is_active = user_row
+            self._upgrade_hash(user_id, password_hash, password)
             expiry = datetime.strptime(expiry_date, '%Y-%m-%d').date()
             days_left = (expiry - datetime.now().date()).days
             
@@ -329,3 +577,42 @@ class Database:
                 }
         
         return None
+    
+    def _upgrade_hash(self, user_id, password_hash, password):
+        """Eski yöntem/parametrelerle üretilmiş hash'i başarılı girişte yenile"""
+        if not self.hasher.needs_rehash(password_hash):
+            return
+        try:
+            new_hash = self.hasher.hash(password)
+        except HasherBusy:
+            return  # Bir sonraki girişte tekrar denenir
+        
+        conn = self._connect()
+        conn.execute('''
+            UPDATE users SET password_hash = ? WHERE id = ? AND password_hash = ?
+        ''', (new_hash, user_id, password_hash))
+        conn.commit()
+    
+    def get_user(self, user_id):
+        """Aktif kullanıcıyı id ile getir (oturum yükleme için)"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT id, username, is_admin, expiry_date
+            FROM users WHERE id = ? AND is_active = 1
+        ''', (user_id,))
+        
+        user_row = cursor.fetchone()
+        if not user_row:
+            return None
+        
+        user_id, username, is_admin, expiry_date = user_row
+        expiry = datetime.strptime(expiry_date, '%Y-%m-%d').date()
+        return {
+            'id': user_id,
+            'username': username,
+            'is_admin': bool(is_admin),
+            'expiry_date': expiry_date,
+            'days_left': (expiry - datetime.now().date()).days
+        }
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import csv
+import gzip
+import json
+from typing import Dict, Iterable, List, Optional, Type
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+
+class Exporter:
+    """
+    Akış halinde satır yazan exporter'ların ortak tabanı
+
+    Alt sınıflar `_write(values)` ve `_close()` metodlarını uygular. Sütunlar
+    ilk satırın anahtarlarından alınır; sonraki satırlarda eksik alanlar 'N/A'
+    olur.
+    """
+
+    # Dosya uzantısı ve gzip ile sıkıştırılabilir olup olmadığı
+    extension = ''
+    supports_gzip = False
+
+    def __init__(self, filename: str, compress: bool = False):
+        """
+        Args:
+            filename (str): Kaydedilecek dosya adı
+            compress (bool): gzip ile sıkıştır (destekleyen formatlarda)
+        """
+        self.filename = filename
+        self.compress = compress and self.supports_gzip
+        self.columns: Optional[List[str]] = None
+        self.row_count = 0
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _open_text(self):
+        """Metin dosyasını (gerekirse gzip'li) aç"""
+        if self.compress:
+            return gzip.open(self.filename, 'wt', encoding='utf-8', newline='')
+        return open(self.filename, 'w', encoding='utf-8', newline='')
+
+    def write_row(self, business: Dict):
+        """Bir işletme satırı yaz"""
+        if self.columns is None:
+            self.columns = list(business.keys())
+            self._start()
+        self._write([business.get(column, 'N/A') for column in self.columns])
+        self.row_count += 1
+
+    def write_rows(self, businesses: Iterable[Dict]) -> int:
+        """Bir iterator'daki tüm satırları yaz"""
+        for business in businesses:
+            self.write_row(business)
+        return self.row_count
+
+    def close(self) -> int:
+        """Dosyayı kapat ve yazılan satır sayısını döndür"""
+        if not self._closed:
+            self._closed = True
+            self._close()
+        return self.row_count
+
+    def _start(self):
+        """Sütunlar belli olduğunda çağrılır (başlık yazmak için)"""
+
+    def _write(self, values: List):
+        raise NotImplementedError
+
+    def _close(self):
+        raise NotImplementedError
+
+
+class ExcelExporter(Exporter):
+    """
+    openpyxl write-only modunda satır satır Excel yazan exporter
+
+    Veri kümesinin tamamı bellekte tutulmaz. Write-only modda sütun
+    genişlikleri ilk satırdan önce yazılmak zorunda olduğu için ilk
+    `width_sample_rows` satır tamponlanır, genişlikler bu satırlar geldikçe
+    güncellenir, sonra tampon ve kalan satırlar doğrudan dosyaya akar.
+
+    Örnek:
+        with ExcelExporter("isletmeler.xlsx") as exporter:
+            for business in businesses:
+                exporter.write_row(business)
+    """
+
+    extension = '.xlsx'
+
+    def __init__(self, filename: str, compress: bool = False, sheet_name: str = 'İşletmeler',
+                 max_width: int = 50, width_sample_rows: int = 200):
+        """
+        Args:
+            filename (str): Kaydedilecek dosya adı
+            compress (bool): Yok sayılır (xlsx zaten zip arşividir)
+            sheet_name (str): Sayfa adı
+            max_width (int): En fazla sütun genişliği
+            width_sample_rows (int): Genişlik hesabı için tamponlanacak satır sayısı
+        """
+        super().__init__(filename, compress)
+        self.max_width = max_width
+        self.width_sample_rows = width_sample_rows
+        self._widths: List[int] = []
+        self._buffer: List[List] = []
+        self._flushed = False
+        self._workbook = Workbook(write_only=True)
+        self._worksheet = self._workbook.create_sheet(sheet_name)
+
+    def _start(self):
+        self._widths = [len(str(column)) for column in self.columns]
+
+    def _write(self, values: List):
+        if self._flushed:
+            self._worksheet.append(values)
+            return
+
+        for index, value in enumerate(values):
+            self._widths[index] = max(self._widths[index], len(str(value)))
+        self._buffer.append(values)
+        if len(self._buffer) >= self.width_sample_rows:
+            self._flush()
+
+    def _flush(self):
+        """Sütun genişliklerini ayarla, başlığı ve tamponu yaz"""
+        for index, width in enumerate(self._widths, start=1):
+            self._worksheet.column_dimensions[get_column_letter(index)].width = min(width + 2, self.max_width)
+        self._worksheet.append(self.columns)
+        for values in self._buffer:
+            self._worksheet.append(values)
+        self._buffer = []
+        self._flushed = True
+
+    def _close(self):
+        if self.columns is not None and not self._flushed:
+            self._flush()
+        self._workbook.save(self.filename)
+        self._workbook = None
+
+
+class CsvExporter(Exporter):
+    """UTF-8 (BOM'lu, Excel uyumlu) CSV exporter"""
+
+    extension = '.csv'
+    supports_gzip = True
+
+    def __init__(self, filename: str, compress: bool = False):
+        super().__init__(filename, compress)
+        self._file = self._open_text()
+        # Excel'in Türkçe karakterleri doğru okuması için BOM
+        self._file.write('\ufeff')
+        self._writer = csv.writer(self._file)
+
+    def _start(self):
+        self._writer.writerow(self.columns)
+
+    def _write(self, values: List):
+        self._writer.writerow(values)
+
+    def _close(self):
+        self._file.close()
+
+
+class JsonlExporter(Exporter):
+    """Satır başına bir JSON nesnesi (JSON Lines) exporter"""
+
+    extension = '.jsonl'
+    supports_gzip = True
+
+    def __init__(self, filename: str, compress: bool = False):
+        super().__init__(filename, compress)
+        self._file = self._open_text()
+
+    def _write(self, values: List):
+        self._file.write(json.dumps(dict(zip(self.columns, values)), ensure_ascii=False))
+        self._file.write('\n')
+
+    def _close(self):
+        self._file.close()
+
+
+class ParquetExporter(Exporter):
+    """
+    Parquet exporter (pyarrow gerekir)
+
+    Satırlar `batch_size` büyüklüğünde row group'lar halinde yazılır. gzip
+    seçilirse dosya sarmalanmaz, Parquet'in kendi gzip sıkıştırması kullanılır.
+    """
+
+    extension = '.parquet'
+
+    def __init__(self, filename: str, compress: bool = False, batch_size: int = 5000):
+        super().__init__(filename, compress)
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError('Parquet çıktısı için pyarrow kurulu olmalıdır (pip install pyarrow)')
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self._codec = 'gzip' if compress else 'snappy'
+        self.batch_size = batch_size
+        self._batch: List[List] = []
+        self._writer = None
+
+    def _write(self, values: List):
+        self._batch.append([None if value is None else str(value) for value in values])
+        if len(self._batch) >= self.batch_size:
+            self._write_batch()
+
+    def _write_batch(self):
+        if not self._batch:
+            return
+        columns = list(zip(*self._batch))
+        table = self._pa.table({
+            name: self._pa.array(columns[index], type=self._pa.string())
+            for index, name in enumerate(self.columns)
+        })
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.filename, table.schema, compression=self._codec)
+        self._writer.write_table(table)
+        self._batch = []
+
+    def _close(self):
+        self._write_batch()
+        if self._writer is not None:
+            self._writer.close()
+        else:
+            # Hiç satır yoksa boş ama geçerli bir dosya bırak
+            self._pq.write_table(self._pa.table({}), self.filename, compression=self._codec)
+
+
+# Format adı -> exporter sınıfı
+EXPORTERS: Dict[str, Type[Exporter]] = {
+    'xlsx': ExcelExporter,
+    'csv': CsvExporter,
+    'jsonl': JsonlExporter,
+    'parquet': ParquetExporter
+}
+
+DEFAULT_FORMAT = 'xlsx'
+
+
+def register_exporter(name: str, exporter_class: Type[Exporter]):
+    """Yeni bir çıktı formatı kaydet"""
+    EXPORTERS[name] = exporter_class
+
+
+def output_filename(base: str, fmt: str = DEFAULT_FORMAT, compress: bool = False) -> str:
+    """Uzantısız dosya adına formatın uzantısını (ve gerekirse .gz) ekle"""
+    exporter_class = EXPORTERS[fmt]
+    filename = base + exporter_class.extension
+    if compress and exporter_class.supports_gzip:
+        filename += '.gz'
+    return filename
+
+
+def get_exporter(fmt: str, filename: str, compress: bool = False) -> Exporter:
+    """Formata göre exporter oluştur"""
+    if fmt not in EXPORTERS:
+        raise ValueError(f"Desteklenmeyen çıktı formatı: {fmt} (geçerli: {', '.join(EXPORTERS)})")
+    return EXPORTERS[fmt](filename, compress=compress)
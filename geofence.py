@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import math
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import gazetteer
+
+# Bir enlem derecesinin yaklaşık km karşılığı
+KM_PER_DEGREE = 111.32
+
+# Ortalama dünya yarıçapı (km)
+EARTH_RADIUS_KM = 6371.0088
+
+# Sınırı idari bölgeyi temsil eden geocode sonuç türleri (adres/nokta sonuçlarının
+# viewport'u birkaç yüz metredir, sınır olarak kullanılmaz)
+AREA_TYPES = {
+    'administrative_area_level_1', 'administrative_area_level_2', 'administrative_area_level_3',
+    'administrative_area_level_4', 'locality', 'sublocality', 'sublocality_level_1',
+    'neighborhood', 'postal_code', 'colloquial_area'
+}
+
+
+class Boundary:
+    """Hedef alanın sınır kutusu"""
+
+    def __init__(self, bbox: Tuple[float, float, float, float], margin_km: float = 0.0):
+        """
+        Args:
+            bbox: (güney, batı, kuzey, doğu)
+            margin_km: Sınır kutusuna eklenecek pay
+        """
+        south, west, north, east = bbox
+        if margin_km:
+            lat_margin = margin_km / KM_PER_DEGREE
+            lng_margin = margin_km / (KM_PER_DEGREE * max(math.cos(math.radians((south + north) / 2)), 0.01))
+            south, west, north, east = south - lat_margin, west - lng_margin, north + lat_margin, east + lng_margin
+        self.bbox = (south, west, north, east)
+
+    def contains(self, lat: float, lng: float) -> bool:
+        """Nokta sınırın içinde mi"""
+        south, west, north, east = self.bbox
+        return south <= lat <= north and west <= lng <= east
+
+
+_boundaries: Dict[str, Boundary] = {}
+_boundaries_lock = threading.Lock()
+
+
+def boundary_for(location: str, geocode_result: Optional[List[Dict]] = None,
+                 margin_km: float = 0.0) -> Optional[Boundary]:
+    """
+    Lokasyonun sınırını döndür
+
+    Önce gazetteer'daki alanın kutusu kullanılır; sınır alan başına bir kez
+    oluşturulup saklanır. Gazetteer'da olmayan lokasyonlarda
+    idari bölge türündeki geocode sonucunun `bounds` ya da `viewport`
+    kutusu kullanılır. Sınır belirlenemezse None (filtre uygulanmaz).
+    """
+    area = gazetteer.find_area(location)
+    if area is not None:
+        key = f"{area.location}|{margin_km}"
+        with _boundaries_lock:
+            if key not in _boundaries:
+                _boundaries[key] = Boundary(area.bbox, margin_km)
+            return _boundaries[key]
+
+    if not geocode_result:
+        return None
+    result = geocode_result[0]
+    if not AREA_TYPES & set(result.get('types', [])):
+        return None
+    box = result['geometry'].get('bounds') or result['geometry'].get('viewport')
+    if not box:
+        return None
+    return Boundary((box['southwest']['lat'], box['southwest']['lng'],
+                     box['northeast']['lat'], box['northeast']['lng']), margin_km=margin_km)
+
+
+def place_in_boundary(place: Dict, boundary: Optional[Boundary]) -> bool:
+    """Keşif sonucundaki yerin koordinatı sınırın içinde mi (sınır ya da koordinat yoksa True)"""
+    if boundary is None:
+        return True
+    location = place.get('geometry', {}).get('location')
+    if not location:
+        return True
+    return boundary.contains(location['lat'], location['lng'])
+
+
+def haversine_km(center_lat: float, center_lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Merkezden her noktaya büyük daire uzaklığı (km), tüm dizi için tek seferde"""
+    lat1 = np.radians(center_lat)
+    lat2 = np.radians(lats)
+    half_dlat = (lat2 - lat1) / 2
+    half_dlng = (np.radians(lngs) - np.radians(center_lng)) / 2
+    a = np.sin(half_dlat) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(half_dlng) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def radius_mask(places: Sequence[Dict], center_lat: float, center_lng: float, radius_km: float) -> np.ndarray:
+    """
+    Keşif sonuçlarından merkeze `radius_km` uzaklık içinde olanlar
+
+    Partinin koordinatları iki diziye alınıp uzaklıklar tek vektörel
+    işlemle hesaplanır. Koordinatı olmayan yerler (NaN) içeride sayılır.
+
+    Returns:
+        np.ndarray: `places` ile aynı sırada bool maske
+    """
+    lats = np.full(len(places), np.nan)
+    lngs = np.full(len(places), np.nan)
+    for index, place in enumerate(places):
+        location = place.get('geometry', {}).get('location')
+        if location:
+            lats[index] = location['lat']
+            lngs[index] = location['lng']
+    # NaN karşılaştırmaları False döner, koordinatsız yerler elenmez
+    return ~(haversine_km(center_lat, center_lng, lats, lngs) > radius_km)
@@ -1,19 +1,143 @@
 import googlemaps
-import pandas as pd
 import os
 from dotenv import load_dotenv
-from typing import List, Dict, Optional
+from typing import Callable, Iterable, Iterator, List, Dict, Optional
 import time
+import math
+import heapq
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from rate_limiter import BudgetExceeded, CallBudget, RateLimiter, get_call_budget, get_rate_limiter
+from singleflight import inflight
+from exporters import DEFAULT_FORMAT, get_exporter
+from cache import PlaceDetailsCache, GeocodeCache, get_place_details_cache, get_geocode_cache
+import gazetteer
+import geofence
+
+# Nearby search sayfa boyutu; tam sayfa + next_page_token = doymuş alan
+NEARBY_PAGE_SIZE = 20
+# Bir enlem derecesinin yaklaşık km karşılığı
+KM_PER_DEGREE = 111.32
+
+# next_page_token'ın geçerli hale gelmesi için gereken süre (Google API gereksinimi)
+PAGE_TOKEN_DELAY = 2.0
+
+# Place details çağrısında istenen alanlar
+DETAIL_FIELDS = [
+    'name', 'formatted_address', 'formatted_phone_number',
+    'website', 'business_status'
+]
+
+def summarize_grid(report: List[Dict]) -> Dict:
+    """Grid hücre ağacının (grid_report) özeti"""
+    probed = [cell for cell in report if cell['results'] is not None]
+    return {
+        'cells': len(probed),
+        'calls': sum(cell['calls'] for cell in report),
+        'max_depth': max((cell['depth'] for cell in report), default=0),
+        'saturated_cells': sum(1 for cell in report if cell['saturated']),
+        'tree': report
+    }
+
+class PageTokenScheduler:
+    """
+    next_page_token'ları hazır olma zamanlarıyla takip eden zamanlayıcı
+    
+    Token'lar `PAGE_TOKEN_DELAY` saniye sonra geçerli olur. Arama bu sürede
+    uyumak yerine diğer fazlara devam eder ve aralarda `run_ready()` çağırarak
+    hazır olan sayfaları çeker; en sonda kalanlar `next_ready_in()` kadar
+    beklenerek (beklerken biten detaylar üretilerek) çekilir.
+    """
+    
+    def __init__(self, handle: Callable[[Dict], None], delay: float = PAGE_TOKEN_DELAY,
+                 max_pages: int = 3, retries: int = 2):
+        """
+        Args:
+            handle (Callable): Çekilen her sayfa sonucu ile çağrılır
+            delay (float): Token'ın hazır olma süresi
+            max_pages (int): Sorgu başına en fazla sayfa (ilk sayfa dahil)
+            retries (int): Token henüz geçerli değilse tekrar deneme sayısı
+        """
+        self.handle = handle
+        self.delay = delay
+        self.max_pages = max_pages
+        self.retries = retries
+        self._heap = []
+        self._seq = 0
+    
+    def __len__(self) -> int:
+        return len(self._heap)
+    
+    def add(self, token: Optional[str], fetch: Callable[[str], Dict], page_count: int = 1):
+        """Token'ı hazır olma zamanıyla sıraya ekle"""
+        if token and page_count < self.max_pages:
+            self._push(time.monotonic() + self.delay, token, fetch, page_count, 0)
+    
+    def _push(self, ready_at: float, token: str, fetch: Callable[[str], Dict], page_count: int, attempt: int):
+        self._seq += 1
+        heapq.heappush(self._heap, (ready_at, self._seq, token, fetch, page_count, attempt))
+    
+    def run_ready(self):
+        """Hazır olan tüm sayfaları çek (beklemeden)"""
+        while self._heap and self._heap[0][0] <= time.monotonic():
+            ready_at, _, token, fetch, page_count, attempt = heapq.heappop(self._heap)
+            try:
+                result = fetch(token)
+            except BudgetExceeded:
+                continue
+            except Exception as e:
+                print(f"Sonraki sayfa alınırken hata: {str(e)}")
+                # Token henüz geçerli olmayabilir, kısa süre sonra tekrar dene
+                if attempt < self.retries:
+                    self._push(time.monotonic() + 1.0, token, fetch, page_count, attempt + 1)
+                continue
+            self.handle(result)
+            self.add(result.get('next_page_token'), fetch, page_count + 1)
+    
+    def next_ready_in(self) -> Optional[float]:
+        """Sıradaki token'ın hazır olmasına kalan süre (sıra boşsa None)"""
+        if not self._heap:
+            return None
+        return max(self._heap[0][0] - time.monotonic(), 0.0)
+
 
 class GoogleMapsScraper:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, details_workers: int = 8, details_cache: Optional[PlaceDetailsCache] = None,
+                 geocode_cache: Optional[GeocodeCache] = None, grid_max_depth: int = 3, grid_max_cells: int = 32,
+                 rate_limiter: Optional[RateLimiter] = None, call_budget: Optional[CallBudget] = None,
+                 known_max_age_days: float = 30, boundary_margin_km: float = 0.0,
+                 radius_margin_km: float = 0.0):
         """
         Google Maps API kullanarak işletme bilgilerini çeken sınıf
         
         Args:
             api_key (str): Google Maps API anahtarı
+            details_workers (int): Aynı anda yürütülecek detay çağrısı sayısı
+            details_cache (PlaceDetailsCache): Place details önbelleği (varsayılan: paylaşılan disk önbelleği)
+            geocode_cache (GeocodeCache): Geocode önbelleği (varsayılan: paylaşılan disk önbelleği)
+            grid_max_depth (int): Grid aramada en fazla bölme derinliği
+            grid_max_cells (int): Grid aramada aranacak en fazla hücre sayısı (hücre başına 2 çağrı)
+            rate_limiter (RateLimiter): API çağrı limiti (varsayılan: süreç genelinde paylaşılan limiter)
+            call_budget (CallBudget): Her arama için uygulanacak çağrı bütçesi (varsayılan: ortam değişkenleri)
+            known_max_age_days (float): Önceki çalıştırmadan gelen detayların tekrar kullanılabileceği en fazla yaş
+            boundary_margin_km (float): Hedef alan sınır kutusuna eklenecek pay
+            radius_margin_km (float): Yarıçap filtresine eklenecek pay (negatif = filtre yok)
         """
         self.gmaps = googlemaps.Client(key=api_key)
+        self.details_workers = max(1, int(details_workers))
+        self.details_cache = details_cache or get_place_details_cache()
+        self.geocode_cache = geocode_cache or get_geocode_cache()
+        self.grid_max_depth = grid_max_depth
+        self.grid_max_cells = grid_max_cells
+        self.grid_report = []
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.call_budget = call_budget or get_call_budget()
+        self.known_max_age = known_max_age_days * 86400
+        self.boundary_margin_km = boundary_margin_km
+        self.radius_margin_km = radius_margin_km
+        self._stats_lock = threading.Lock()
+        self._reset_job_state()
         
     def search_businesses(self, location: str, business_type: str, radius_km: float) -> List[Dict]:
         """
@@ -27,185 +151,439 @@ class GoogleMapsScraper:
         Returns:
             List[Dict]: İşletme listesi
         """
+        return [
+            event['business']
+            for event in self.iter_businesses(location, business_type, radius_km)
+            if event['type'] == 'business'
+        ]
+    
+    def iter_businesses(self, location: str, business_type: str, radius_km: float,
+                        known: Optional[Dict[str, Dict]] = None) -> Iterator[Dict]:
+        """
+        Belirtilen lokasyon ve yarıçapta işletmeleri arar, sonuçları bulundukça üretir
+        
+        Üretilen olaylar:
+            {'type': 'phase', 'phase': 'nearby_type', 'progress': 15}
+            {'type': 'business', 'place_id': '...', 'business': {...}, 'count': 12,
+             'details_done': 30, 'details_total': 45}
+            {'type': 'error', 'message': '...'}
+            {'type': 'done', 'count': 40, 'progress': 100, 'partial': False}
+        
+        Çağrı bütçesi dolarsa keşif fazları bırakılır, kuyruktaki detaylar
+        (bütçe ve önbellek izin verdiği kadar) tamamlanır ve 'done' olayı
+        partial=True ile gelir.
+        
+        `known` verilirse (önceki çalıştırmanın place_id -> {summary, business,
+        fetched_at} kayıtları) keşif özeti değişmemiş ve detayları
+        `known_max_age_days` günden yeni olan yerler için detay çağrısı
+        yapılmaz, önceki satır kullanılır. Bu çalıştırmanın kayıtları
+        `known_snapshot()` ile alınır.
+        
+        Args:
+            location (str): Arama yapılacak lokasyon
+            business_type (str): İşletme türü
+            radius_km (float): Arama yarıçapı (km)
+            known (Dict): Önceki çalıştırmanın kayıtları (delta modu)
+            
+        Yields:
+            Dict: Faz, işletme ve bitiş olayları
+        """
+        self._reset_job_state()
+        self._known = known or {}
+        # Detay çağrıları havuzda paralel yürütülür, keşif fazları sadece place_id toplar
+        executor = ThreadPoolExecutor(max_workers=self.details_workers)
+        seen_place_ids = set()
+        pending = {}
+        progress = {'count': 0, 'done': 0}
+        
+        def submit(places: List[Dict]):
+            self._submit_places(executor, places, seen_place_ids, pending)
+        
+        def completed(timeout: Optional[float] = 0) -> Iterator[Dict]:
+            return self._collect_completed(pending, progress, timeout)
+        
         try:
+            yield self._phase_event('geocode', 5)
             # Lokasyonun koordinatlarını al
-            geocode_result = self.gmaps.geocode(location)
+            geocode_result = self._geocode(location)
             if not geocode_result:
                 print(f"Lokasyon bulunamadı: {location}")
-                return []
+                yield {'type': 'error', 'message': f"Lokasyon bulunamadı: {location}"}
+                return
             
             lat = geocode_result[0]['geometry']['location']['lat']
             lng = geocode_result[0]['geometry']['location']['lng']
+            # Hedef alan dışındaki yerler detay çağrısından önce elenir
+            self._boundary = geofence.boundary_for(location, geocode_result, self.boundary_margin_km)
+            # Grid hücreleri ve text search yarıçapın dışına taşar; uzaktaki yerler de elenir
+            if self.radius_margin_km >= 0:
+                self._radius = (lat, lng, radius_km + self.radius_margin_km)
             
-            businesses = []
-            seen_place_ids = set()
+            try:
+                # Sayfa token'ları beklerken diğer fazlar ve detay çağrıları sürer
+                pages = PageTokenScheduler(lambda result: submit(result.get('results', [])))
             
-            # 1. Nearby Search - Google Places type ile (pagination destekli)
-            place_type = self._get_place_type(business_type)
-            places_result = self.gmaps.places_nearby(
-                location=(lat, lng),
-                radius=int(radius_km * 1000),
-                type=place_type
-            )
+                # 1. Nearby Search - Google Places type ile (pagination destekli)
+                yield self._phase_event('nearby_type', 15)
+                place_type = self._get_place_type(business_type)
+                places_result = self._call(
+                    'nearby', self.gmaps.places_nearby,
+                    location=(lat, lng),
+                    radius=int(radius_km * 1000),
+                    type=place_type
+                )
             
-            # İlk sayfa sonuçları
-            for place in places_result.get('results', []):
-                place_id = place.get('place_id')
-                if place_id and place_id not in seen_place_ids:
-                    seen_place_ids.add(place_id)
-                    business_details = self._get_business_details(place_id)
-                    if business_details and self._is_in_target_location(business_details, location):
-                        businesses.append(business_details)
+                # İlk sayfa sonuçları, sonraki sayfalar zamanlayıcıya
+                submit(places_result.get('results', []))
+                pages.add(places_result.get('next_page_token'), lambda token: self._call(
+                    'nearby', self.gmaps.places_nearby,
+                    location=(lat, lng),
+                    radius=int(radius_km * 1000),
+                    type=place_type,
+                    page_token=token
+                ))
             
-            # Pagination - sonraki sayfalar
-            next_page_token = places_result.get('next_page_token')
-            page_count = 1
-            while next_page_token and page_count < 3:  # Maksimum 3 sayfa
-                time.sleep(2)  # Google API gereksinimi
-                try:
-                    next_result = self.gmaps.places_nearby(
-                        location=(lat, lng),
-                        radius=int(radius_km * 1000),
-                        type=place_type,
-                        page_token=next_page_token
-                    )
-                    for place in next_result.get('results', []):
-                        place_id = place.get('place_id')
-                        if place_id and place_id not in seen_place_ids:
-                            seen_place_ids.add(place_id)
-                            business_details = self._get_business_details(place_id)
-                            if business_details and self._is_in_target_location(business_details, location):
-                                businesses.append(business_details)
-                    next_page_token = next_result.get('next_page_token')
-                    page_count += 1
-                except:
-                    break
+                # 2. Nearby Search - keyword ile (pagination destekli)
+                yield self._phase_event('nearby_keyword', 25)
+                places_result2 = self._call(
+                    'nearby', self.gmaps.places_nearby,
+                    location=(lat, lng),
+                    radius=int(radius_km * 1000),
+                    keyword=business_type
+                )
             
-            # 2. Nearby Search - keyword ile (pagination destekli)
-            places_result2 = self.gmaps.places_nearby(
-                location=(lat, lng),
-                radius=int(radius_km * 1000),
-                keyword=business_type
-            )
+                submit(places_result2.get('results', []))
+                pages.add(places_result2.get('next_page_token'), lambda token: self._call(
+                    'nearby', self.gmaps.places_nearby,
+                    location=(lat, lng),
+                    radius=int(radius_km * 1000),
+                    keyword=business_type,
+                    page_token=token
+                ))
+                yield from completed()
             
-            for place in places_result2.get('results', []):
-                place_id = place.get('place_id')
-                if place_id and place_id not in seen_place_ids:
-                    seen_place_ids.add(place_id)
-                    business_details = self._get_business_details(place_id)
-                    if business_details and self._is_in_target_location(business_details, location):
-                        businesses.append(business_details)
+                # 3. Uyarlanabilir Grid Arama - yoğun bölgeler alt hücrelere bölünür
+                yield self._phase_event('grid', 35)
+                root_saturated = self._is_saturated(places_result) or self._is_saturated(places_result2)
+                for cell_results in self._grid_search(lat, lng, radius_km, place_type, business_type, root_saturated):
+                    submit(cell_results)
+                    pages.run_ready()
+                    yield from completed()
             
-            # Pagination - keyword search için
-            next_page_token2 = places_result2.get('next_page_token')
-            page_count2 = 1
-            while next_page_token2 and page_count2 < 3:
-                time.sleep(2)
-                try:
-                    next_result2 = self.gmaps.places_nearby(
-                        location=(lat, lng),
-                        radius=int(radius_km * 1000),
-                        keyword=business_type,
-                        page_token=next_page_token2
-                    )
-                    for place in next_result2.get('results', []):
-                        place_id = place.get('place_id')
-                        if place_id and place_id not in seen_place_ids:
-                            seen_place_ids.add(place_id)
-                            business_details = self._get_business_details(place_id)
-                            if business_details and self._is_in_target_location(business_details, location):
-                                businesses.append(business_details)
-                    next_page_token2 = next_result2.get('next_page_token')
-                    page_count2 += 1
-                except:
-                    break
+                # 4. Text Search - daha geniş arama
+                yield self._phase_event('text', 50)
+                pages.run_ready()
+                text_search_results = self._text_search(location, business_type, radius_km)
+                submit(text_search_results[:30])  # Daha fazla sonuç
+                yield from completed()
             
-            # 3. Çoklu Grid Arama - daha kapsamlı sonuçlar
-            grid_results = self._grid_search(lat, lng, radius_km, place_type, business_type)
-            for result in grid_results:
-                place_id = result.get('place_id')
-                if place_id and place_id not in seen_place_ids:
-                    seen_place_ids.add(place_id)
-                    business_details = self._get_business_details(place_id)
-                    if business_details and self._is_in_target_location(business_details, location):
-                        businesses.append(business_details)
+                # 5. Alternatif text search sorguları
+                yield self._phase_event('alternative', 60)
+                alternative_queries = [
+                    f"{business_type} {location}",
+                    f"{location} {business_type}",
+                    f"{business_type} in {location}"
+                ]
             
-            # 4. Text Search - daha geniş arama
-            text_search_results = self._text_search(location, business_type, radius_km)
-            for result in text_search_results[:30]:  # Daha fazla sonuç
-                place_id = result.get('place_id')
-                if place_id and place_id not in seen_place_ids:
-                    seen_place_ids.add(place_id)
-                    business_details = self._get_business_details(place_id)
-                    if business_details and self._is_in_target_location(business_details, location):
-                        businesses.append(business_details)
+                # Bütçe dolduysa _call BudgetExceeded fırlatır ve bütçe tükenmiş olarak işaretlenir;
+                # önceden kontrol edip sessizce durmak eksik aramayı tam gösterirdi
+                for query in alternative_queries:
+                    pages.run_ready()
+                    try:
+                        alt_results = self._call('text', self.gmaps.places, query=query)
+                        submit(alt_results.get('results', [])[:15])
+                    except BudgetExceeded:
+                        raise
+                    except Exception as e:
+                        print(f"Text search hatası ({query}): {str(e)}")
+                        continue
+                    yield from completed()
             
-            # 5. Alternatif text search sorguları
-            alternative_queries = [
-                f"{business_type} {location}",
-                f"{location} {business_type}",
-                f"{business_type} in {location}"
-            ]
+                # Kalan sayfaları hazır oldukça çek, beklerken biten detayları üret
+                yield self._phase_event('pages', 70)
+                while len(pages):
+                    yield from completed(timeout=pages.next_ready_in())
+                    pages.run_ready()
+            except BudgetExceeded as e:
+                print(f"{str(e)}, keşif durduruldu; bulunanlar tamamlanıyor.")
             
-            for query in alternative_queries:
-                try:
-                    alt_results = self.gmaps.places(query=query)
-                    for result in alt_results.get('results', [])[:15]:
-                        place_id = result.get('place_id')
-                        if place_id and place_id not in seen_place_ids:
-                            seen_place_ids.add(place_id)
-                            business_details = self._get_business_details(place_id)
-                            if business_details and self._is_in_target_location(business_details, location):
-                                businesses.append(business_details)
-                except:
-                    continue
-                
-            return businesses
+            # Kalan detay sonuçlarını bitiş sırasına göre topla
+            yield self._phase_event('details', 80)
+            while pending:
+                yield from completed(timeout=None)
+            
+            yield {'type': 'done', 'count': progress['count'], 'progress': 100, 'partial': self.partial}
             
         except Exception as e:
             print(f"Arama sırasında hata: {str(e)}")
-            return []
+            yield {'type': 'error', 'message': str(e)}
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _phase_event(self, phase: str, progress: int) -> Dict:
+        return {'type': 'phase', 'phase': phase, 'progress': progress}
     
-    def _grid_search(self, center_lat: float, center_lng: float, radius_km: float, place_type: str, business_type: str) -> List[Dict]:
+    def _collect_completed(self, pending: Dict[Future, str], progress: Dict,
+                           timeout: Optional[float] = 0) -> Iterator[Dict]:
         """
-        Grid tabanlı arama - büyük alanları küçük parçalara bölerek daha kapsamlı sonuçlar
+        Tamamlanan detay çağrılarını üret
+        
+        timeout=0 beklemeden bakar, None en az biri bitene kadar bekler.
         """
-        results = []
+        if not pending:
+            if timeout:
+                time.sleep(timeout)
+            return
+        done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            place_id = pending.pop(future)
+            progress['done'] += 1
+            business_details = future.result()
+            if business_details:
+                progress['count'] += 1
+                yield {
+                    'type': 'business',
+                    'place_id': place_id,
+                    'business': business_details,
+                    'count': progress['count'],
+                    'details_done': progress['done'],
+                    'details_total': progress['done'] + len(pending)
+                }
+    
+    def _reset_job_state(self):
+        """Arama (iş) başına tutulan memo ve sayaçları sıfırla"""
+        self._memo = {}
+        self._known = {}
+        self._summaries = {}
+        self._resolved = {}
+        self._boundary = None
+        self._radius = None
+        self.budget = self.call_budget.fresh()
+        self.stats = {
+            'api_calls': 0,
+            'memo_hits': 0,
+            'coalesced': 0,
+            'reused_details': 0,
+            'outside_area': 0,
+            'outside_radius': 0
+        }
+    
+    @property
+    def partial(self) -> bool:
+        """Son arama çağrı bütçesine takıldıysa sonuçlar eksiktir"""
+        return self.budget.exhausted
+    
+    def job_stats(self) -> Dict:
+        """Son aramanın çağrı sayaçları, atlanan detay çağrıları ve bütçe kullanımı"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats['details_saved'] = stats['outside_area'] + stats['outside_radius'] + stats['reused_details']
+        stats['budget'] = self.budget.usage()
+        return stats
+    
+    def known_snapshot(self) -> Dict[str, Dict]:
+        """
+        Son aramada detayı çözülen yerler (bir sonraki çalıştırmanın `known` parametresi)
         
-        # Büyük yarıçap için grid arama yap
-        if radius_km > 20:
-            # 4 farklı noktadan arama yap
-            grid_points = [
-                (center_lat + 0.1, center_lng + 0.1),  # Kuzeydoğu
-                (center_lat + 0.1, center_lng - 0.1),  # Kuzeybatı
-                (center_lat - 0.1, center_lng + 0.1),  # Güneydoğu
-                (center_lat - 0.1, center_lng - 0.1),  # Güneybatı
-            ]
-            
-            for lat, lng in grid_points:
-                try:
-                    # Her grid noktası için küçük yarıçapta arama
-                    grid_result = self.gmaps.places_nearby(
-                        location=(lat, lng),
-                        radius=15000,  # 15km
-                        type=place_type
-                    )
-                    results.extend(grid_result.get('results', []))
-                    
-                    # Keyword ile de ara
-                    grid_result2 = self.gmaps.places_nearby(
-                        location=(lat, lng),
-                        radius=15000,
-                        keyword=business_type
-                    )
-                    results.extend(grid_result2.get('results', []))
-                    
-                    time.sleep(0.1)  # Rate limiting
-                except:
+        Returns:
+            Dict: place_id -> {summary, business (elendiyse None), fetched_at}
+        """
+        with self._stats_lock:
+            return {
+                place_id: {'summary': self._summaries.get(place_id, ''), 'business': business, 'fetched_at': fetched_at}
+                for place_id, (business, fetched_at) in self._resolved.items()
+            }
+    
+    def _call(self, endpoint: str, func: Callable, *args, **kwargs):
+        """
+        Google Maps API çağrısı yap
+        
+        Aynı iş içinde tekrarlanan özdeş çağrılar memo'dan döner; farklı işlerde
+        aynı anda yapılan özdeş çağrılar tek bir upstream isteğinde birleştirilir.
+        Memo dışındaki her çağrı, birleştirilse de, bu işin bütçesinden düşülür;
+        bütçe dolmuşsa BudgetExceeded fırlatılır. Upstream istekler uç nokta
+        limitinden geçer.
+        """
+        key = (endpoint, getattr(func, '__name__', repr(func)), repr(args), repr(sorted(kwargs.items())))
+        with self._stats_lock:
+            if key in self._memo:
+                self.stats['memo_hits'] += 1
+                return self._memo[key]
+        
+        # Bütçe birleştirmeden önce düşülür: liderin bütçesi dolduğunda takipçi
+        # işler başkasının BudgetExceeded hatasını almaz, her iş kendi bütçesine takılır
+        self.budget.spend(endpoint)
+        result, shared = inflight.do(key, self._upstream_call, endpoint, func, *args, **kwargs)
+        with self._stats_lock:
+            self._memo[key] = result
+            if shared:
+                self.stats['coalesced'] += 1
+        return result
+    
+    def _upstream_call(self, endpoint: str, func: Callable, *args, **kwargs):
+        """Uç nokta limitinden geçerek API'yi gerçekten çağır"""
+        self.rate_limiter.acquire(endpoint)
+        with self._stats_lock:
+            self.stats['api_calls'] += 1
+        return func(*args, **kwargs)
+    
+    def _geocode(self, location: str) -> List[Dict]:
+        """Lokasyonu gazetteer ya da önbellek üzerinden geocode et"""
+        geocode_result = gazetteer.geocode_result(location)
+        if geocode_result is not None:
+            return geocode_result
+        geocode_result = self.geocode_cache.get(location)
+        if geocode_result is None:
+            geocode_result = self._call('geocode', self.gmaps.geocode, location)
+            if geocode_result:
+                self.geocode_cache.set(location, geocode_result)
+        return geocode_result
+    
+    def warm_geocode_cache(self, locations: List[str]) -> int:
+        """Verilen lokasyonları toplu olarak geocode önbelleğine yükle"""
+        return self.geocode_cache.warm(
+            locations, lambda location: self._call('geocode', self.gmaps.geocode, location)
+        )
+    
+    def _submit_places(self, executor: ThreadPoolExecutor, places: List[Dict], seen_place_ids: set,
+                       pending: Dict[Future, str]):
+        """Yeni place_id'leri detay havuzuna gönder (tekrarları, yarıçap/alan dışındakileri ve değişmemiş bilinen yerleri atla)"""
+        now = time.time()
+        # Partinin uzaklıkları tek seferde hesaplanır
+        inside_radius = geofence.radius_mask(places, *self._radius) if self._radius and places else None
+        for index, place in enumerate(places):
+            place_id = place.get('place_id')
+            if place_id and place_id not in seen_place_ids:
+                seen_place_ids.add(place_id)
+                if inside_radius is not None and not inside_radius[index]:
+                    with self._stats_lock:
+                        self.stats['outside_radius'] += 1
+                    continue
+                if not geofence.place_in_boundary(place, self._boundary):
+                    with self._stats_lock:
+                        self.stats['outside_area'] += 1
                     continue
+                summary = self._place_summary(place)
+                self._summaries[place_id] = summary
+                known = self._known.get(place_id)
+                if known and known['summary'] == summary and now - known['fetched_at'] < self.known_max_age:
+                    # Önceki çalıştırmanın satırı hâlâ geçerli, detay çağrısı yapılmaz
+                    future = Future()
+                    future.set_result(known['business'])
+                    with self._stats_lock:
+                        self._resolved[place_id] = (known['business'], known['fetched_at'])
+                        self.stats['reused_details'] += 1
+                else:
+                    future = executor.submit(self._get_business_details, place_id)
+                pending[future] = place_id
+    
+    def _place_summary(self, place: Dict) -> str:
+        """Keşif sonucundaki, detay çağrısı gerektirmeden değişikliği gösteren alanlar"""
+        # Adres alanı uç noktaya göre değiştiği için (vicinity / formatted_address) kullanılmaz
+        return f"{place.get('name', '')}|{place.get('business_status', '')}"
+    
+    def _grid_search(self, center_lat: float, center_lng: float, radius_km: float, place_type: str,
+                     business_type: str, root_saturated: bool) -> Iterator[List[Dict]]:
+        """
+        Uyarlanabilir quadtree grid arama
+        
+        Arama alanı, kenarı 2 x yarıçap olan bir kare hücre olarak başlar. Doymuş
+        (nearby sonucu tam sayfa dönen ve devamı olan) hücreler dört alt hücreye
+        bölünür ve her alt hücre kendi kapsama yarıçapıyla tekrar aranır. Seyrek
+        hücrelerde bölme durur. Hücre ağacı `self.grid_report` içinde saklanır.
+        
+        Args:
+            root_saturated (bool): Merkez nearby aramasının doymuş olup olmadığı
+            
+        Yields:
+            List[Dict]: Aranan her hücrenin sonuçları
+        """
+        root = self._make_cell(center_lat, center_lng, radius_km, 0)
+        root['saturated'] = root_saturated
+        self.grid_report = [root]
         
+        queue = deque([root] if root_saturated else [])
+        probed = 0
+        # Nearby bütçesi bir çağrıyı reddettiyse (tükenmiş olarak işaretlendi) bölme durur
+        while queue and 'nearby' not in self.budget.exhausted_endpoints:
+            cell = queue.popleft()
+            if cell['depth'] >= self.grid_max_depth:
+                continue
+            
+            for child in self._split_cell(cell):
+                if probed >= self.grid_max_cells:
+                    queue.clear()
+                    break
+                probed += 1
+                cell['split'] = True
+                self.grid_report.append(child)
+                
+                yield self._probe_cell(child, place_type, business_type)
+                if child['saturated']:
+                    queue.append(child)
+    
+    def _make_cell(self, lat: float, lng: float, half_km: float, depth: int) -> Dict:
+        """Grid hücresi oluştur (merkez, yarım kenar uzunluğu ve kapsama yarıçapı)"""
+        return {
+            'depth': depth,
+            'lat': lat,
+            'lng': lng,
+            'half_km': half_km,
+            # Kareyi tamamen kapsayan daire, API sınırı 50 km
+            'radius_m': int(min(half_km * math.sqrt(2), 50) * 1000),
+            # Yapılan nearby çağrısı; bütçe yüzünden hiç aranamayan hücrede results None kalır
+            'calls': 0,
+            'results': None,
+            'saturated': False,
+            'split': False
+        }
+    
+    def _split_cell(self, cell: Dict) -> List[Dict]:
+        """Hücreyi dört alt hücreye böl"""
+        half_km = cell['half_km'] / 2
+        dlat = half_km / KM_PER_DEGREE
+        dlng = half_km / (KM_PER_DEGREE * max(math.cos(math.radians(cell['lat'])), 0.01))
+        return [
+            self._make_cell(cell['lat'] + dlat, cell['lng'] + dlng, half_km, cell['depth'] + 1),  # Kuzeydoğu
+            self._make_cell(cell['lat'] + dlat, cell['lng'] - dlng, half_km, cell['depth'] + 1),  # Kuzeybatı
+            self._make_cell(cell['lat'] - dlat, cell['lng'] + dlng, half_km, cell['depth'] + 1),  # Güneydoğu
+            self._make_cell(cell['lat'] - dlat, cell['lng'] - dlng, half_km, cell['depth'] + 1),  # Güneybatı
+        ]
+    
+    def _probe_cell(self, cell: Dict, place_type: str, business_type: str) -> List[Dict]:
+        """Hücre merkezinde type ve keyword ile nearby arama yap, doygunluğu işaretle"""
+        results = []
+        for kwargs in ({'type': place_type}, {'keyword': business_type}):
+            try:
+                cell_result = self._call(
+                    'nearby', self.gmaps.places_nearby,
+                    location=(cell['lat'], cell['lng']),
+                    radius=cell['radius_m'],
+                    **kwargs
+                )
+            except BudgetExceeded:
+                break
+            except Exception as e:
+                cell['calls'] += 1
+                print(f"Grid hücresi aranırken hata: {str(e)}")
+                continue
+            cell['calls'] += 1
+            results.extend(cell_result.get('results', []))
+            if self._is_saturated(cell_result):
+                cell['saturated'] = True
+        if cell['calls']:
+            cell['results'] = len(results)
         return results
     
+    def _is_saturated(self, places_result: Dict) -> bool:
+        """Nearby yanıtı tam sayfa ve devamı varsa alan doymuş sayılır"""
+        return (len(places_result.get('results', [])) >= NEARBY_PAGE_SIZE
+                and bool(places_result.get('next_page_token')))
+    
+    def grid_summary(self) -> Dict:
+        """Son aramanın grid hücre ağacının özeti"""
+        return summarize_grid(self.grid_report)
+    
     def _get_place_type(self, business_type: str) -> str:
         """İşletme türüne göre Google Places type döndür"""
         type_mapping = {
@@ -260,47 +638,19 @@ class GoogleMapsScraper:
             all_results = []
             for query in queries:
                 try:
-                    text_results = self.gmaps.places(query=query)
+                    text_results = self._call('text', self.gmaps.places, query=query)
                     results = text_results.get('results', [])
                     all_results.extend(results)
-                except:
+                except BudgetExceeded:
+                    break
+                except Exception as e:
+                    print(f"Text search hatası ({query}): {str(e)}")
                     continue
                     
             return all_results
         except:
             return []
     
-    def _is_in_target_location(self, business_details: Dict, target_location: str) -> bool:
-        """İşletmenin hedef lokasyonda olup olmadığını kontrol et"""
-        try:
-            business_address = business_details.get('Adres', '').lower()
-            target_location_lower = target_location.lower()
-            
-            # Hedef lokasyondan bölümleri çıkar
-            target_parts = target_location_lower.split(',')
-            
-            # Tüm parçaları kontrol et
-            for part in target_parts:
-                part = part.strip()
-                if part and part in business_address:
-                    return True
-            
-            # Eğer virgül yoksa, direkt kontrol et
-            if ',' not in target_location_lower:
-                if target_location_lower in business_address:
-                    return True
-                    
-                # Başakşehir gibi özel durumlar için kelime bazlı kontrol
-                target_words = target_location_lower.split()
-                for word in target_words:
-                    if len(word) > 3 and word in business_address:  # Kısa kelimelerden kaçın
-                        return True
-            
-            return True  # Şüpheli durumlarda dahil et (daha fazla sonuç için)
-        except:
-            # Hata durumunda işletmeyi dahil et
-            return True
-    
     def _get_business_details(self, place_id: str) -> Optional[Dict]:
         """
         İşletmenin detaylı bilgilerini alır
@@ -312,71 +662,86 @@ class GoogleMapsScraper:
             Dict: İşletme detayları
         """
         try:
-            # Detaylı bilgileri al
-            place_details = self.gmaps.place(
-                place_id=place_id,
-                fields=[
-                    'name', 'formatted_address', 'formatted_phone_number',
-                    'website', 'business_status'
-                ]
-            )
-            
-            result = place_details.get('result', {})
-            
-            
-            # Telefon numarası yoksa işletmeyi dahil etme
-            phone_number = result.get('formatted_phone_number', 'N/A')
-            if phone_number == 'N/A' or not phone_number:
-                return None
-            
-            business_info = {
-                'İşletme Adı': result.get('name', 'N/A'),
-                'Adres': result.get('formatted_address', 'N/A'),
-                'Telefon': phone_number,
-                'Website': result.get('website', 'N/A'),
-                'Durum': result.get('business_status', 'N/A')
-            }
+            # Önce önbelleğe bak, yoksa detaylı bilgileri al
+            result = self.details_cache.get(place_id)
+            if result is None:
+                place_details = self._call(
+                    'details', self.gmaps.place,
+                    place_id=place_id,
+                    fields=DETAIL_FIELDS
+                )
+                result = place_details.get('result', {})
+                self.details_cache.set(place_id, result)
             
-            return business_info
+            business = self._build_business_info(result)
+            with self._stats_lock:
+                self._resolved[place_id] = (business, time.time())
+            return business
             
+        except BudgetExceeded:
+            return None
         except Exception as e:
             print(f"İşletme detayları alınırken hata: {str(e)}")
             return None
     
-    def save_to_excel(self, businesses: List[Dict], filename: str = "isletmeler.xlsx"):
+    def _build_business_info(self, result: Dict) -> Optional[Dict]:
+        """Place details yanıtını işletme sözlüğüne dönüştür"""
+        # Telefon numarası yoksa işletmeyi dahil etme
+        phone_number = result.get('formatted_phone_number', 'N/A')
+        if phone_number == 'N/A' or not phone_number:
+            return None
+        
+        business_info = {
+            'İşletme Adı': result.get('name', 'N/A'),
+            'Adres': result.get('formatted_address', 'N/A'),
+            'Telefon': phone_number,
+            'Website': result.get('website', 'N/A'),
+            'Durum': result.get('business_status', 'N/A')
+        }
+        
+        return business_info
+    
+    def save_to_excel(self, businesses: Iterable[Dict], filename: str = "isletmeler.xlsx") -> int:
         """
         İşletme bilgilerini Excel dosyasına kaydeder
         
         Args:
-            businesses (List[Dict]): İşletme bilgileri listesi
+            businesses (Iterable[Dict]): İşletme bilgileri
             filename (str): Kaydedilecek dosya adı
+            
+        Returns:
+            int: Kaydedilen işletme sayısı
+        """
+        return self.save(businesses, filename, 'xlsx')
+    
+    def save(self, businesses: Iterable[Dict], filename: str, output_format: str = DEFAULT_FORMAT,
+             compress: bool = False) -> int:
+        """
+        İşletme bilgilerini seçilen formatta kaydeder
+        
+        Satırlar akış halinde yazılır; liste yerine generator da verilebilir.
+        
+        Args:
+            businesses (Iterable[Dict]): İşletme bilgileri
+            filename (str): Kaydedilecek dosya adı
+            output_format (str): Çıktı formatı (xlsx, csv, jsonl, parquet)
+            compress (bool): gzip ile sıkıştır (csv/jsonl için .gz, parquet için iç sıkıştırma)
+            
+        Returns:
+            int: Kaydedilen işletme sayısı
         """
         try:
-            if not businesses:
-                print("Kaydedilecek işletme bulunamadı.")
-                return
-                
-            df = pd.DataFrame(businesses)
+            with get_exporter(output_format, filename, compress) as exporter:
+                exporter.write_rows(businesses)
             
-            # Excel dosyasına kaydet
-            with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='İşletmeler', index=False)
-                
-                # Sütun genişliklerini ayarla
-                worksheet = writer.sheets['İşletmeler']
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 50)
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
+            if not exporter.row_count:
+                os.remove(filename)
+                print("Kaydedilecek işletme bulunamadı.")
+                return 0
             
-            print(f"✅ {len(businesses)} işletme bilgisi '{filename}' dosyasına kaydedildi.")
+            print(f"✅ {exporter.row_count} işletme bilgisi '{filename}' dosyasına kaydedildi.")
+            return exporter.row_count
             
         except Exception as e:
-            print(f"Excel dosyası kaydedilirken hata: {str(e)}")
+            print(f"Dosya kaydedilirken hata: {str(e)}")
+            return 0
@@ -6,6 +6,8 @@ from tkinter import ttk, messagebox, filedialog
 import os
 from dotenv import load_dotenv
 from google_maps_scraper import GoogleMapsScraper
+from exporters import DEFAULT_FORMAT, EXPORTERS, output_filename
+from gazetteer import get_iller, get_ilceler, location_name
 import threading
 
 class GoogleMapsGUI:
@@ -35,7 +37,7 @@ class GoogleMapsGUI:
         ttk.Label(main_frame, text="🏙️ İl:").grid(row=1, column=0, sticky=tk.W, pady=5)
         self.il_var = tk.StringVar()
         self.il_combo = ttk.Combobox(main_frame, textvariable=self.il_var, width=40)
-        self.il_combo['values'] = self.get_iller()
+        self.il_combo['values'] = get_iller()
         self.il_combo.grid(row=1, column=1, sticky=(tk.W, tk.E), pady=5)
         self.il_combo.bind('<<ComboboxSelected>>', self.on_il_selected)
         
@@ -64,7 +66,7 @@ class GoogleMapsGUI:
         radius_entry.grid(row=4, column=1, sticky=(tk.W, tk.E), pady=5)
         
         # Dosya adı
-        ttk.Label(main_frame, text="📄 Excel Dosya Adı:").grid(row=5, column=0, sticky=tk.W, pady=5)
+        ttk.Label(main_frame, text="📁 Dosya Adı:").grid(row=5, column=0, sticky=tk.W, pady=5)
         self.filename_var = tk.StringVar()
         filename_frame = ttk.Frame(main_frame)
         filename_frame.grid(row=5, column=1, sticky=(tk.W, tk.E), pady=5)
@@ -76,21 +78,36 @@ class GoogleMapsGUI:
                                command=self.browse_file)
         browse_btn.pack(side=tk.RIGHT, padx=(5, 0))
         
+        # Çıktı formatı
+        ttk.Label(main_frame, text="📄 Çıktı Formatı:").grid(row=6, column=0, sticky=tk.W, pady=5)
+        format_frame = ttk.Frame(main_frame)
+        format_frame.grid(row=6, column=1, sticky=(tk.W, tk.E), pady=5)
+        
+        self.format_var = tk.StringVar(value=DEFAULT_FORMAT)
+        format_combo = ttk.Combobox(format_frame, textvariable=self.format_var, width=10,
+                                    values=list(EXPORTERS), state="readonly")
+        format_combo.pack(side=tk.LEFT)
+        format_combo.bind('<<ComboboxSelected>>', lambda e: self.update_filename())
+        
+        self.gzip_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(format_frame, text="gzip ile sıkıştır", variable=self.gzip_var,
+                        command=self.update_filename).pack(side=tk.LEFT, padx=(10, 0))
+        
         # Arama butonu
         self.search_btn = ttk.Button(main_frame, text="🔍 Arama Başlat", 
                                     command=self.start_search, style="Accent.TButton")
-        self.search_btn.grid(row=6, column=0, columnspan=2, pady=20)
+        self.search_btn.grid(row=7, column=0, columnspan=2, pady=20)
         
         # Progress bar
         self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
-        self.progress.grid(row=7, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5)
+        self.progress.grid(row=8, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5)
         
         # Sonuç alanı
-        ttk.Label(main_frame, text="📊 Sonuçlar:").grid(row=8, column=0, sticky=tk.W, pady=(10, 5))
+        ttk.Label(main_frame, text="📊 Sonuçlar:").grid(row=9, column=0, sticky=tk.W, pady=(10, 5))
         
         # Text widget with scrollbar
         text_frame = ttk.Frame(main_frame)
-        text_frame.grid(row=9, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
+        text_frame.grid(row=10, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
         
         self.result_text = tk.Text(text_frame, height=10, width=60)
         scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=self.result_text.yview)
@@ -101,54 +118,14 @@ class GoogleMapsGUI:
         
         # Grid weights
         main_frame.columnconfigure(1, weight=1)
-        main_frame.rowconfigure(9, weight=1)
+        main_frame.rowconfigure(10, weight=1)
         self.root.columnconfigure(0, weight=1)
         self.root.rowconfigure(0, weight=1)
         
-    def get_iller(self):
-        """Türkiye'nin illerini döndürür"""
-        return [
-            "Adana", "Adıyaman", "Afyonkarahisar", "Ağrı", "Amasya", "Ankara", "Antalya",
-            "Artvin", "Aydın", "Balıkesir", "Bilecik", "Bingöl", "Bitlis", "Bolu", "Burdur",
-            "Bursa", "Çanakkale", "Çankırı", "Çorum", "Denizli", "Diyarbakır", "Edirne",
-            "Elazığ", "Erzincan", "Erzurum", "Eskişehir", "Gaziantep", "Giresun", "Gümüşhane",
-            "Hakkari", "Hatay", "Isparta", "Mersin", "İstanbul", "İzmir", "Kars", "Kastamonu",
-            "Kayseri", "Kırklareli", "Kırşehir", "Kocaeli", "Konya", "Kütahya", "Malatya",
-            "Manisa", "Kahramanmaraş", "Mardin", "Muğla", "Muş", "Nevşehir", "Niğde", "Ordu",
-            "Rize", "Sakarya", "Samsun", "Siirt", "Sinop", "Sivas", "Tekirdağ", "Tokat",
-            "Trabzon", "Tunceli", "Şanlıurfa", "Uşak", "Van", "Yozgat", "Zonguldak", "Aksaray",
-            "Bayburt", "Karaman", "Kırıkkale", "Batman", "Şırnak", "Bartın", "Ardahan",
-            "Iğdır", "Yalova", "Karabük", "Kilis", "Osmaniye", "Düzce"
-        ]
-    
-    def get_ilceler(self, il):
-        """Seçilen ile göre ilçeleri döndürür (örnek olarak birkaç il)"""
-        ilceler = {
-            "İstanbul": ["Adalar", "Arnavutköy", "Ataşehir", "Avcılar", "Bağcılar", "Bahçelievler", 
-                        "Bakırköy", "Başakşehir", "Bayrampaşa", "Beşiktaş", "Beykoz", "Beylikdüzü",
-                        "Beyoğlu", "Büyükçekmece", "Çatalca", "Çekmeköy", "Esenler", "Esenyurt",
-                        "Eyüpsultan", "Fatih", "Gaziosmanpaşa", "Güngören", "Kadıköy", "Kağıthane",
-                        "Kartal", "Küçükçekmece", "Maltepe", "Pendik", "Sancaktepe", "Sarıyer",
-                        "Silivri", "Sultanbeyli", "Sultangazi", "Şile", "Şişli", "Tuzla", 
-                        "Ümraniye", "Üsküdar", "Zeytinburnu"],
-            "Ankara": ["Akyurt", "Altındağ", "Ayaş", "Bala", "Beypazarı", "Çamlıdere", "Çankaya",
-                      "Çubuk", "Elmadağ", "Etimesgut", "Evren", "Gölbaşı", "Güdül", "Haymana",
-                      "Kalecik", "Kazan", "Keçiören", "Kızılcahamam", "Mamak", "Nallıhan",
-                      "Polatlı", "Pursaklar", "Sincan", "Şereflikoçhisar", "Yenimahalle"],
-            "İzmir": ["Aliağa", "Balçova", "Bayındır", "Bayraklı", "Bergama", "Beydağ", "Bornova",
-                     "Buca", "Çeşme", "Çiğli", "Dikili", "Foça", "Gaziemir", "Güzelbahçe",
-                     "Karabağlar", "Karaburun", "Karşıyaka", "Kemalpaşa", "Kınık", "Kiraz",
-                     "Konak", "Menderes", "Menemen", "Narlıdere", "Ödemiş", "Seferihisar",
-                     "Selçuk", "Tire", "Torbalı", "Urla"],
-            "Mersin": ["Akdeniz", "Anamur", "Aydıncık", "Bozyazı", "Çamlıyayla", "Erdemli",
-                      "Gülnar", "Mezitli", "Mut", "Silifke", "Tarsus", "Toroslar", "Yenişehir"]
-        }
-        return ilceler.get(il, [])
-    
     def on_il_selected(self, event):
         """İl seçildiğinde ilçeleri güncelle"""
         il = self.il_var.get()
-        ilceler = self.get_ilceler(il)
+        ilceler = get_ilceler(il)
         self.ilce_combo['values'] = ilceler
         self.ilce_var.set("")
         
@@ -165,16 +142,17 @@ class GoogleMapsGUI:
         
         if il and business:
             if ilce:
-                filename = f"{il}_{ilce}_{business}_{radius}km.xlsx"
+                filename = f"{il}_{ilce}_{business}_{radius}km"
             else:
-                filename = f"{il}_{business}_{radius}km.xlsx"
-            self.filename_var.set(filename)
+                filename = f"{il}_{business}_{radius}km"
+            self.filename_var.set(output_filename(filename, self.format_var.get(), self.gzip_var.get()))
     
     def browse_file(self):
         """Dosya kaydetme konumu seç"""
+        extension = output_filename('', self.format_var.get(), self.gzip_var.get())
         filename = filedialog.asksaveasfilename(
-            defaultextension=".xlsx",
-            filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")]
+            defaultextension=extension,
+            filetypes=[(f"{self.format_var.get()} files", f"*{extension}"), ("All files", "*.*")]
         )
         if filename:
             self.filename_var.set(filename)
@@ -211,14 +189,14 @@ class GoogleMapsGUI:
             self.update_filename()
             filename = self.filename_var.get()
         
-        if not filename.endswith('.xlsx'):
-            filename += '.xlsx'
+        output_format = self.format_var.get()
+        compress = self.gzip_var.get()
+        extension = output_filename('', output_format, compress)
+        if not filename.endswith(extension):
+            filename = output_filename(filename, output_format, compress)
         
         # Lokasyon string'i oluştur
-        if ilce:
-            location = f"{ilce}, {il}, Turkey"
-        else:
-            location = f"{il}, Turkey"
+        location = location_name(il, ilce)
         
         # Arama işlemini thread'de çalıştır
         self.search_btn.config(state='disabled', text='🔍 Aranıyor...')
@@ -226,11 +204,12 @@ class GoogleMapsGUI:
         self.result_text.delete(1.0, tk.END)
         
         thread = threading.Thread(target=self.perform_search, 
-                                args=(location, business_type, radius_km, filename))
+                                args=(location, business_type, radius_km, filename, output_format, compress))
         thread.daemon = True
         thread.start()
     
-    def perform_search(self, location, business_type, radius_km, filename):
+    def perform_search(self, location, business_type, radius_km, filename, output_format=DEFAULT_FORMAT,
+                       compress=False):
         """Arama işlemini gerçekleştir"""
         try:
             scraper = GoogleMapsScraper(self.api_key)
@@ -241,13 +220,25 @@ class GoogleMapsGUI:
             self.update_result_text(f"📏 Yarıçap: {radius_km} km\n")
             self.update_result_text("-" * 50 + "\n")
             
-            businesses = scraper.search_businesses(location, business_type, radius_km)
+            # İşletmeleri bulundukça listele
+            businesses = []
+            for event in scraper.iter_businesses(location, business_type, radius_km):
+                if event['type'] == 'business':
+                    businesses.append(event['business'])
+                    self.update_result_text(f"  {event['count']}. {event['business']['İşletme Adı']}\n")
+                elif event['type'] == 'phase':
+                    self.update_result_text(f"⏳ [{event['progress']}%] {event['phase']}\n")
+            
+            cache_stats = scraper.details_cache.stats()
+            self.update_result_text(f"🗄️ Detay önbelleği: {cache_stats['hits']} isabet / {cache_stats['misses']} kayıp\n")
+            if scraper.partial:
+                self.update_result_text("⚠️ API çağrı bütçesi doldu, sonuçlar kısmi!\n")
             
             if businesses:
                 self.update_result_text(f"✅ {len(businesses)} işletme bulundu!\n\n")
                 
-                # Excel'e kaydet
-                scraper.save_to_excel(businesses, filename)
+                # Dosyaya kaydet
+                scraper.save(businesses, filename, output_format, compress)
                 full_path = os.path.abspath(filename)
                 self.update_result_text(f"📁 Dosya kaydedildi: {full_path}\n\n")
                 
@@ -268,7 +259,7 @@ class GoogleMapsGUI:
                 self.update_result_text(f"📞 Telefonu olan: {with_phone}/{len(businesses)}\n")
                 self.update_result_text(f"🌐 Website'si olan: {with_website}/{len(businesses)}\n")
                 
-                messagebox.showinfo("Başarılı", f"{len(businesses)} işletme bulundu ve Excel dosyasına kaydedildi!")
+                messagebox.showinfo("Başarılı", f"{len(businesses)} işletme bulundu ve dosyaya kaydedildi!")
                 
             else:
                 self.update_result_text("❌ Hiç işletme bulunamadı!\n")
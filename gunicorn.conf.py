@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# gunicorn bu dosyayı çalışma dizininden otomatik olarak yükler
+
+
+def post_worker_init(worker):
+    """Uygulama yüklendikten sonra her worker sürecinde iş kuyruğu worker'larını başlat"""
+    import app
+    app.start_job_workers()
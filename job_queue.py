@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Kirası deneme hakkı bitene kadar dolan işlerin hata mesajı
+LEASE_EXPIRED_ERROR = 'Kira süresi doldu, deneme hakkı bitti'
+
+
+class JobQueue:
+    """
+    SQLite tabanlı kalıcı iş kuyruğu
+
+    İşler `queued` olarak eklenir, bir worker tarafından kira (lease) ile
+    `running` durumuna alınır. Kirası yenilenmeyen (worker'ı ölen) işler
+    kira süresi dolunca tekrar alınabilir; `max_attempts` denemeden sonra
+    `failed` olarak bırakılır. Aynı dosyayı birden fazla gunicorn worker'ı
+    paylaşır, iş alma `BEGIN IMMEDIATE` ile atomik yapılır. Bırakılan işleri
+    `expire()` döndürür; iş deposundaki kayıtlarını çağıran günceller.
+    """
+
+    def __init__(self, db_path: str, lease_seconds: float = 120, max_attempts: int = 3):
+        """
+        Args:
+            db_path (str): SQLite dosya yolu
+            lease_seconds (float): Kiranın geçerli olduğu süre
+            max_attempts (int): Bir işin en fazla kaç kez alınabileceği
+        """
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS job_queue (
+                job_id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                error TEXT,
+                enqueued_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                lease_until REAL
+            )
+        ''')
+        self._conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_job_queue_status
+            ON job_queue (status, enqueued_at)
+        ''')
+
+    def enqueue(self, job_id: str, payload: Dict) -> int:
+        """
+        İşi kuyruğa ekle
+
+        Returns:
+            int: İşin önünde bekleyen iş sayısı
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute('''
+                INSERT INTO job_queue (job_id, payload, enqueued_at) VALUES (?, ?, ?)
+            ''', (job_id, json.dumps(payload, ensure_ascii=False), now))
+            return self._conn.execute('''
+                SELECT COUNT(*) FROM job_queue WHERE status = 'queued' AND enqueued_at < ?
+            ''', (now,)).fetchone()[0]
+
+    def claim(self, worker: str) -> Optional[Tuple[str, Dict]]:
+        """
+        Sıradaki işi (ya da kirası dolmuş işi) kira ile al
+
+        Returns:
+            Tuple[str, Dict]: (job_id, payload) ya da iş yoksa None
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                # Deneme hakkı bitmiş işler tekrar alınmaz, expire() ile bırakılır
+                row = self._conn.execute('''
+                    SELECT job_id, payload FROM job_queue
+                    WHERE status = 'queued' OR (status = 'running' AND lease_until < ? AND attempts < ?)
+                    ORDER BY enqueued_at LIMIT 1
+                ''', (now, self.max_attempts)).fetchone()
+                if row is not None:
+                    self._conn.execute('''
+                        UPDATE job_queue SET status = 'running', worker = ?, attempts = attempts + 1,
+                            started_at = COALESCE(started_at, ?), lease_until = ?
+                        WHERE job_id = ?
+                    ''', (worker, now, now + self.lease_seconds, row[0]))
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def expire(self) -> List[str]:
+        """
+        Deneme hakkı bitmiş, kirası dolmuş işleri başarısız olarak bırak
+
+        Returns:
+            List[str]: Bu çağrıda bırakılan işler (aynı işi yalnızca bir süreç bırakır)
+        """
+        now = time.time()
+        with self._lock:
+            expired = [row[0] for row in self._conn.execute('''
+                SELECT job_id FROM job_queue
+                WHERE status = 'running' AND lease_until < ? AND attempts >= ?
+            ''', (now, self.max_attempts))]
+            if not expired:
+                return []
+            released = []
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                for job_id in expired:
+                    cursor = self._conn.execute('''
+                        UPDATE job_queue SET status = 'failed', finished_at = ?, error = ?, lease_until = NULL
+                        WHERE job_id = ? AND status = 'running' AND lease_until < ?
+                    ''', (now, LEASE_EXPIRED_ERROR, job_id, now))
+                    if cursor.rowcount:
+                        released.append(job_id)
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return released
+
+    def renew(self, job_id: str, worker: str) -> bool:
+        """Kirayı uzat; iş başka bir worker'a geçtiyse False"""
+        with self._lock:
+            cursor = self._conn.execute('''
+                UPDATE job_queue SET lease_until = ?
+                WHERE job_id = ? AND worker = ? AND status = 'running'
+            ''', (time.time() + self.lease_seconds, job_id, worker))
+            return cursor.rowcount > 0
+
+    def complete(self, job_id: str, worker: str):
+        """İşi tamamlandı olarak işaretle"""
+        self._finish(job_id, worker, 'done', None)
+
+    def fail(self, job_id: str, worker: str, error: str):
+        """İşi başarısız olarak işaretle (tekrar denenmez)"""
+        self._finish(job_id, worker, 'failed', error)
+
+    def _finish(self, job_id: str, worker: str, status: str, error: Optional[str]):
+        with self._lock:
+            self._conn.execute('''
+                UPDATE job_queue SET status = ?, error = ?, finished_at = ?, lease_until = NULL
+                WHERE job_id = ? AND worker = ?
+            ''', (status, error, time.time(), job_id, worker))
+
+    def purge(self, older_than_seconds: float = 86400) -> int:
+        """Bitmiş eski işleri sil"""
+        with self._lock:
+            cursor = self._conn.execute('''
+                DELETE FROM job_queue WHERE status IN ('done', 'failed') AND finished_at < ?
+            ''', (time.time() - older_than_seconds,))
+            return cursor.rowcount
+
+    def metrics(self) -> Dict:
+        """Kuyruk derinliği ve bekleme süresi istatistikleri"""
+        now = time.time()
+        with self._lock:
+            counts = dict(self._conn.execute('''
+                SELECT status, COUNT(*) FROM job_queue GROUP BY status
+            ''').fetchall())
+            oldest = self._conn.execute('''
+                SELECT MIN(enqueued_at) FROM job_queue WHERE status = 'queued'
+            ''').fetchone()[0]
+            # Son 100 işin kuyrukta bekleme süresi
+            waits = [row[0] for row in self._conn.execute('''
+                SELECT started_at - enqueued_at FROM job_queue
+                WHERE started_at IS NOT NULL ORDER BY started_at DESC LIMIT 100
+            ''')]
+        return {
+            'depth': counts.get('queued', 0),
+            'running': counts.get('running', 0),
+            'done': counts.get('done', 0),
+            'failed': counts.get('failed', 0),
+            'oldest_wait': round(now - oldest, 2) if oldest else 0.0,
+            'avg_wait': round(sum(waits) / len(waits), 2) if waits else 0.0,
+            'max_wait': round(max(waits), 2) if waits else 0.0
+        }
+
+
+class WorkerPool:
+    """
+    Kuyruktan iş alan sabit boyutlu worker thread havuzu
+
+    Her worker boşta kaldığında kuyruğa `poll_interval` aralıkla bakar.
+    Ayrı bir thread, bu süreçte yürüyen işlerin kiralarını düzenli olarak
+    yeniler; süreç ölürse kiralar dolar ve işleri başka bir süreç alır.
+    Deneme hakkı biten işler `on_abandoned` ile bildirilir.
+    """
+
+    def __init__(self, queue: JobQueue, handler: Callable[[str, Dict], Any], concurrency: int = 2,
+                 poll_interval: float = 1.0, maintenance: Optional[Callable[[], Any]] = None,
+                 on_abandoned: Optional[Callable[[List[str]], Any]] = None):
+        """
+        Args:
+            queue (JobQueue): İş kuyruğu
+            handler (Callable): (job_id, payload) ile çağrılır
+            concurrency (int): Aynı anda yürütülecek iş sayısı
+            poll_interval (float): Boş kuyrukta bekleme aralığı
+            maintenance (Callable): Kuyruk temizliğiyle birlikte saatte bir çağrılır
+            on_abandoned (Callable): Kirası dolup deneme hakkı biten işlerin id listesiyle çağrılır
+        """
+        self.queue = queue
+        self.handler = handler
+        self.concurrency = max(1, int(concurrency))
+        self.poll_interval = poll_interval
+        self.maintenance = maintenance
+        self.on_abandoned = on_abandoned
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._active = set()
+        self._active_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._threads = []
+        self._last_purge = 0.0
+
+    def start(self):
+        """Worker ve kira yenileme thread'lerini başlat"""
+        if self._threads:
+            return
+        for index in range(self.concurrency):
+            self._threads.append(threading.Thread(target=self._run, name=f"job-worker-{index}", daemon=True))
+        self._threads.append(threading.Thread(target=self._renew_leases, name="job-lease", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def notify(self):
+        """Yeni iş eklendi, boşta bekleyen worker'ları uyandır"""
+        self._wakeup.set()
+
+    def active_count(self) -> int:
+        with self._active_lock:
+            return len(self._active)
+
+    def _run(self):
+        while True:
+            self._release_expired()
+            try:
+                claimed = self.queue.claim(self.worker_id)
+            except Exception as e:
+                print(f"İş kuyruğu okunurken hata: {str(e)}")
+                claimed = None
+
+            if claimed is None:
+                self._maybe_purge()
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            job_id, payload = claimed
+            with self._active_lock:
+                self._active.add(job_id)
+            try:
+                self.handler(job_id, payload)
+                self.queue.complete(job_id, self.worker_id)
+            except Exception as e:
+                print(f"İş yürütülürken hata ({job_id}): {str(e)}")
+                self.queue.fail(job_id, self.worker_id, str(e))
+            finally:
+                with self._active_lock:
+                    self._active.discard(job_id)
+
+    def _release_expired(self):
+        """Deneme hakkı biten işleri bırak ve bildir (yoksa durum sorguları 'running' bekler)"""
+        try:
+            expired = self.queue.expire()
+            if expired and self.on_abandoned is not None:
+                self.on_abandoned(expired)
+        except Exception as e:
+            print(f"Süresi dolan işler bırakılırken hata: {str(e)}")
+
+    def _renew_leases(self):
+        while True:
+            time.sleep(self.queue.lease_seconds / 3)
+            with self._active_lock:
+                active = list(self._active)
+            for job_id in active:
+                try:
+                    self.queue.renew(job_id, self.worker_id)
+                except Exception as e:
+                    print(f"Kira yenilenirken hata ({job_id}): {str(e)}")
+
+    def _maybe_purge(self):
+        """Saatte bir bitmiş eski işleri temizle"""
+        now = time.time()
+        if now - self._last_purge < 3600:
+            return
+        self._last_purge = now
+        try:
+            self.queue.purge()
+            if self.maintenance is not None:
+                self.maintenance()
+        except Exception as e:
+            print(f"İş kuyruğu temizlenirken hata: {str(e)}")
+
+
+_job_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """
+    Süreç genelinde paylaşılan iş kuyruğunu döndür
+
+    JOB_QUEUE_PATH (varsayılan jobs.db), JOB_LEASE_SECONDS (120) ve
+    JOB_MAX_ATTEMPTS (3) ortam değişkenlerinden okunur.
+    """
+    global _job_queue
+    with _queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue(
+                os.getenv('JOB_QUEUE_PATH', 'jobs.db'),
+                lease_seconds=float(os.getenv('JOB_LEASE_SECONDS', 120)),
+                max_attempts=int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+            )
+        return _job_queue
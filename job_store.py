@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from exporters import DEFAULT_FORMAT
+
+# Tabloda tutulan iş alanları (JSON olarak saklananlar ayrıca işaretli)
+JOB_FIELDS = (
+    'status', 'progress', 'phase', 'location', 'business_type', 'radius_km', 'output_format',
+    'compress', 'result_count', 'filename', 'error_message', 'partial', 'grid_report', 'stats',
+    'from_cache', 'cache_age', 'delta'
+)
+JSON_FIELDS = ('grid_report', 'stats')
+# Tablo ilk oluşturulduktan sonra eklenen sütunlar (eski dosyalara ALTER ile eklenir)
+ADDED_COLUMNS = (
+    ('from_cache', 'INTEGER NOT NULL DEFAULT 0'),
+    ('cache_age', 'REAL'),
+    ('delta', 'INTEGER NOT NULL DEFAULT 0')
+)
+
+
+class SearchJob:
+    def __init__(self, job_id, location, business_type, radius_km, output_format=DEFAULT_FORMAT, compress=False,
+                 delta=False):
+        self.job_id = job_id
+        self.location = location
+        self.business_type = business_type
+        self.radius_km = radius_km
+        self.output_format = output_format
+        self.compress = compress
+        self.delta = delta  # Satırları önceki çalıştırmaya göre işaretle
+        self.status = 'pending'  # pending (kuyrukta), running, completed, error
+        self.progress = 0
+        self.phase = None
+        self.result_count = 0
+        self.filename = None
+        self.error_message = None
+        self.grid_report = None
+        self.stats = None
+        self.partial = False  # Çağrı bütçesi dolduysa sonuçlar eksik
+        self.from_cache = False  # Sonuçlar arama sonucu önbelleğinden geldi
+        self.cache_age = None  # Önbellekteki sonuçların yaşı (saniye)
+        self.start_time = time.time()
+
+
+class JobStore:
+    """
+    Arama işlerinin durumunu tutan SQLite deposu
+
+    Tüm gunicorn worker'ları aynı dosyayı paylaşır; böylece bir işi hangi
+    süreç yürütürse yürütsün durum sorguları her worker'dan cevaplanır.
+    Okumalar birincil anahtar üzerinden tek satırdır.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path (str): SQLite dosya yolu
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                progress INTEGER NOT NULL DEFAULT 0,
+                phase TEXT,
+                location TEXT NOT NULL,
+                business_type TEXT NOT NULL,
+                radius_km REAL NOT NULL,
+                output_format TEXT NOT NULL,
+                compress INTEGER NOT NULL DEFAULT 0,
+                result_count INTEGER NOT NULL DEFAULT 0,
+                filename TEXT,
+                error_message TEXT,
+                partial INTEGER NOT NULL DEFAULT 0,
+                grid_report TEXT,
+                stats TEXT,
+                from_cache INTEGER NOT NULL DEFAULT 0,
+                cache_age REAL,
+                delta INTEGER NOT NULL DEFAULT 0,
+                start_time REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        ''')
+        existing = {row[1] for row in self._conn.execute('PRAGMA table_info(jobs)')}
+        for column, declaration in ADDED_COLUMNS:
+            if column not in existing:
+                try:
+                    self._conn.execute(f'ALTER TABLE jobs ADD COLUMN {column} {declaration}')
+                except sqlite3.OperationalError:
+                    pass  # Aynı anda başlayan başka bir süreç ekledi
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_updated_at ON jobs (updated_at)')
+        self._conn.commit()
+
+    def save(self, job: SearchJob):
+        """İşin tüm alanlarını yaz (yoksa ekle)"""
+        values = []
+        for field in JOB_FIELDS:
+            value = getattr(job, field)
+            if field in JSON_FIELDS and value is not None:
+                value = json.dumps(value, ensure_ascii=False)
+            values.append(value)
+        with self._lock:
+            self._conn.execute(f'''
+                INSERT OR REPLACE INTO jobs (job_id, {', '.join(JOB_FIELDS)}, start_time, updated_at)
+                VALUES ({', '.join('?' * (len(JOB_FIELDS) + 3))})
+            ''', (job.job_id, *values, job.start_time, time.time()))
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[SearchJob]:
+        """İşi döndür, yoksa None"""
+        with self._lock:
+            row = self._conn.execute(f'''
+                SELECT {', '.join(JOB_FIELDS)}, start_time FROM jobs WHERE job_id = ?
+            ''', (job_id,)).fetchone()
+        if row is None:
+            return None
+
+        data = dict(zip(JOB_FIELDS, row))
+        job = SearchJob(job_id, data['location'], data['business_type'], data['radius_km'],
+                        data['output_format'], bool(data['compress']))
+        for field in JOB_FIELDS:
+            value = data[field]
+            if field in JSON_FIELDS and value is not None:
+                value = json.loads(value)
+            setattr(job, field, value)
+        job.compress = bool(job.compress)
+        job.partial = bool(job.partial)
+        job.from_cache = bool(job.from_cache)
+        job.delta = bool(job.delta)
+        job.start_time = row[-1]
+        return job
+
+    def purge(self, older_than_seconds: float = 7 * 86400) -> int:
+        """Uzun süredir güncellenmeyen işleri sil"""
+        with self._lock:
+            cursor = self._conn.execute(
+                'DELETE FROM jobs WHERE updated_at < ?', (time.time() - older_than_seconds,)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+
+_job_store = None
+_store_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    """Süreç genelinde paylaşılan iş deposunu döndür (JOB_QUEUE_PATH ile aynı dosya)"""
+    global _job_store
+    with _store_lock:
+        if _job_store is None:
+            _job_store = JobStore(os.getenv('JOB_QUEUE_PATH', 'jobs.db'))
+        return _job_store
@@ -4,6 +4,7 @@
 import os
 from dotenv import load_dotenv
 from google_maps_scraper import GoogleMapsScraper
+from exporters import DEFAULT_FORMAT, EXPORTERS, output_filename
 import sys
 
 def main():
@@ -54,15 +55,28 @@ def main():
             print("❌ Geçerli bir sayı girin!")
             return
             
-        filename = input("📄 Excel dosya adı (örn: 'guzellik_merkezleri.xlsx') [Enter: otomatik]: ").strip()
+        output_format = input(f"📄 Çıktı formatı ({', '.join(EXPORTERS)}) [Enter: {DEFAULT_FORMAT}]: ").strip().lower()
+        if not output_format:
+            output_format = DEFAULT_FORMAT
+        if output_format not in EXPORTERS:
+            print(f"❌ Geçersiz format! Seçenekler: {', '.join(EXPORTERS)}")
+            return
+        
+        compress = input("🗜️  gzip ile sıkıştırılsın mı? (e/H): ").strip().lower() in ('e', 'evet', 'y', 'yes')
+        
+        filename = input("📄 Dosya adı (uzantısız, örn: 'guzellik_merkezleri') [Enter: otomatik]: ").strip()
         if not filename:
             # Otomatik dosya adı oluştur
             safe_location = location.replace(" ", "_").replace(",", "")
             safe_business = business_type.replace(" ", "_")
-            filename = f"{safe_location}_{safe_business}_{radius_km}km.xlsx"
+            filename = f"{safe_location}_{safe_business}_{radius_km}km"
         
-        if not filename.endswith('.xlsx'):
-            filename += '.xlsx'
+        # Kullanıcı uzantı yazdıysa at, formatın uzantısını ekle
+        extension = EXPORTERS[output_format].extension
+        for suffix in ('.gz', extension):
+            if filename.endswith(suffix):
+                filename = filename[:-len(suffix)]
+        filename = output_filename(filename, output_format, compress)
         
         print("\n🔍 Arama başlatılıyor...")
         print(f"📍 Lokasyon: {location}")
@@ -70,15 +84,26 @@ def main():
         print(f"📏 Yarıçap: {radius_km} km")
         print("-" * 50)
         
-        # Arama yap
-        businesses = scraper.search_businesses(location, business_type, radius_km)
+        # Arama yap - işletmeler bulundukça listele
+        businesses = []
+        for event in scraper.iter_businesses(location, business_type, radius_km):
+            if event['type'] == 'business':
+                businesses.append(event['business'])
+                print(f"  {event['count']:>3}. {event['business']['İşletme Adı']}")
+            elif event['type'] == 'phase':
+                print(f"⏳ [{event['progress']:>3}%] {event['phase']}")
+        
+        cache_stats = scraper.details_cache.stats()
+        print(f"🗄️  Detay önbelleği: {cache_stats['hits']} isabet / {cache_stats['misses']} kayıp")
+        if scraper.partial:
+            print("⚠️  API çağrı bütçesi doldu, sonuçlar kısmi!")
         
         if businesses:
             print(f"✅ {len(businesses)} işletme bulundu!")
             
-            # Excel'e kaydet
+            # Dosyaya kaydet
             full_path = os.path.join(os.getcwd(), filename)
-            scraper.save_to_excel(businesses, filename)
+            scraper.save(businesses, filename, output_format, compress)
             
             print(f"📁 Dosya konumu: {full_path}")
             
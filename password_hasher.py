@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HasherBusy(Exception):
+    """Şifre doğrulama kapasitesi dolu"""
+
+    def __init__(self):
+        super().__init__("Şifre doğrulama kuyruğu dolu, daha sonra tekrar deneyin")
+
+
+class PasswordHasher:
+    """
+    Şifre hash'leme ve doğrulamayı sınırlı bir süreç havuzunda yürütür
+
+    PBKDF2/scrypt istek thread'lerinde çalıştığında bir giriş patlaması
+    tüm worker thread'lerini ve CPU'yu meşgul eder, diğer istekler bekler.
+    Havuz en fazla `workers` çekirdek kullanır, aynı anda en fazla
+    `max_pending` iş kabul eder; fazlası HasherBusy ile hemen reddedilir.
+    `workers=0` hash'i çağıran thread'de çalıştırır (GUI ve betikler için).
+    """
+
+    def __init__(self, method: str = 'pbkdf2:sha256:600000', workers: int = 2,
+                 max_pending: Optional[int] = None, timeout: float = 10):
+        """
+        Args:
+            method (str): werkzeug hash yöntemi (yeni hash'ler ve yükseltme için)
+            workers (int): Süreç havuzu boyutu (0 = havuz yok)
+            max_pending (int): Aynı anda kabul edilen iş (varsayılan: workers * 4)
+            timeout (float): Tek işin en fazla süresi
+        """
+        self.method = method
+        self.workers = max(0, int(workers))
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending or max(1, self.workers) * 4)
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._prefix = None
+        self._dummy_hash = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        # fork sonrası (gunicorn) ebeveynin havuzu kullanılamaz
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                # Çok thread'li worker'dan fork edilen çocuk, başka thread'in tuttuğu kilitleri miras alabilir
+                method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context(method))
+                self._pid = os.getpid()
+            return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor):
+        """Bozulan havuzu bırak (bir çocuk süreç öldüğünde sonraki tüm işler BrokenProcessPool alır)"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def _run(self, func, *args):
+        # Havuz çocukları başlarken ana betiği (ör. `python app.py`) yeniden içe aktarır;
+        # oradan gelen hash çağrıları iç içe havuz kurmadan yerinde çalışır
+        if not self.workers or multiprocessing.current_process().name != 'MainProcess':
+            return func(*args)
+        # Havuz bozulduysa bir kez yeniden kurulup tekrar denenir
+        for attempt in range(2):
+            if not self._slots.acquire(blocking=False):
+                raise HasherBusy()
+            executor = self._pool()
+            try:
+                future = executor.submit(func, *args)
+            except BrokenProcessPool:
+                self._slots.release()
+                self._discard(executor)
+                if attempt:
+                    raise
+                continue
+            except Exception:
+                self._slots.release()
+                raise
+            # Zaman aşımında hash süreçte sürer; yer iş gerçekten bitince boşalır
+            future.add_done_callback(lambda _: self._slots.release())
+            try:
+                return future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                raise HasherBusy()
+            except BrokenProcessPool:
+                self._discard(executor)
+                if attempt:
+                    raise
+
+    def hash(self, password: str) -> str:
+        """Yapılandırılmış yöntemle yeni hash üret"""
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash: Optional[str], password: str) -> bool:
+        """
+        Şifreyi hash ile karşılaştır
+
+        `password_hash` None ise (kullanıcı yok) sahte bir hash ile aynı
+        maliyette doğrulama yapılır; yanıt süresinden kullanıcı adının
+        varlığı anlaşılmaz.
+        """
+        if password_hash is None:
+            if self._dummy_hash is None:
+                self._dummy_hash = self.hash(os.urandom(16).hex())
+            self._run(check_password_hash, self._dummy_hash, password)
+            return False
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Hash yapılandırılmış yöntem ve parametrelerle üretilmemiş mi"""
+        if self._prefix is None:
+            # 'pbkdf2' gibi kısa yöntem adları werkzeug'un varsayılan parametreleriyle genişler
+            self._prefix = generate_password_hash('', self.method).split('$', 1)[0]
+        return password_hash.split('$', 1)[0] != self._prefix
+
+
+_password_hasher = None
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher() -> PasswordHasher:
+    """
+    Süreç genelinde paylaşılan hasher'ı döndür
+
+    PASSWORD_HASH_METHOD (varsayılan pbkdf2:sha256:600000),
+    PASSWORD_HASH_WORKERS (2), PASSWORD_HASH_MAX_PENDING (workers * 4) ve
+    PASSWORD_HASH_TIMEOUT (10 sn) ortam değişkenlerinden okunur.
+    """
+    global _password_hasher
+    with _hasher_lock:
+        if _password_hasher is None:
+            _password_hasher = PasswordHasher(
+                method=os.getenv('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000'),
+                workers=int(os.getenv('PASSWORD_HASH_WORKERS', 2)),
+                max_pending=int(os.getenv('PASSWORD_HASH_MAX_PENDING', 0)) or None,
+                timeout=float(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+            )
+        return _password_hasher
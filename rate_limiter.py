@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+# Ayrı bütçesi olan API uç noktaları
+ENDPOINTS = ('geocode', 'nearby', 'text', 'details')
+
+
+class TokenBucket:
+    """
+    Rezervasyon tabanlı token bucket
+
+    `reserve()` token'ı hemen düşer ve çağıranın ne kadar beklemesi
+    gerektiğini döndürür; böylece aynı kova hem thread'lerden (time.sleep)
+    hem de coroutine'lerden (asyncio.sleep) kullanılabilir ve bekleyenler
+    sıraya girer.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate (float): Saniyede eklenen token (QPS)
+            capacity (float): Anlık patlama kapasitesi (varsayılan: rate)
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1) -> float:
+        """Token ayır ve beklenmesi gereken süreyi (saniye) döndür"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class RateLimiter:
+    """Uç nokta başına token bucket ve bekleme metrikleri"""
+
+    def __init__(self, qps: Dict[str, float], default_qps: float = 10):
+        """
+        Args:
+            qps (Dict[str, float]): Uç nokta -> QPS
+            default_qps (float): Tanımsız uç noktalar için QPS
+        """
+        self.default_qps = default_qps
+        self._buckets = {endpoint: TokenBucket(rate) for endpoint, rate in qps.items()}
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, endpoint: str) -> TokenBucket:
+        with self._lock:
+            if endpoint not in self._buckets:
+                self._buckets[endpoint] = TokenBucket(self.default_qps)
+            return self._buckets[endpoint]
+
+    def _record(self, endpoint: str, waited: float):
+        with self._lock:
+            metric = self._metrics.setdefault(endpoint, {
+                'calls': 0, 'waited_calls': 0, 'total_wait': 0.0, 'max_wait': 0.0
+            })
+            metric['calls'] += 1
+            if waited > 0:
+                metric['waited_calls'] += 1
+                metric['total_wait'] += waited
+                metric['max_wait'] = max(metric['max_wait'], waited)
+
+    def acquire(self, endpoint: str) -> float:
+        """Çağrı hakkı gelene kadar bekle, beklenen süreyi döndür"""
+        waited = self._bucket(endpoint).reserve()
+        if waited > 0:
+            time.sleep(waited)
+        self._record(endpoint, waited)
+        return waited
+
+    async def acquire_async(self, endpoint: str) -> float:
+        """acquire() ile aynı, event loop'u bloklamadan bekler"""
+        waited = self._bucket(endpoint).reserve()
+        if waited > 0:
+            await asyncio.sleep(waited)
+        self._record(endpoint, waited)
+        return waited
+
+    def metrics(self) -> Dict:
+        """Uç nokta başına çağrı ve bekleme istatistikleri"""
+        with self._lock:
+            result = {}
+            for endpoint, metric in self._metrics.items():
+                result[endpoint] = dict(metric)
+                result[endpoint]['qps'] = self._buckets[endpoint].rate
+                result[endpoint]['avg_wait'] = (
+                    round(metric['total_wait'] / metric['calls'], 4) if metric['calls'] else 0.0
+                )
+            return result
+
+
+class BudgetExceeded(Exception):
+    """İşin API çağrı bütçesi doldu"""
+
+    def __init__(self, endpoint: str):
+        super().__init__(f"API çağrı bütçesi doldu ({endpoint})")
+        self.endpoint = endpoint
+
+
+class CallBudget:
+    """
+    İş (arama) başına API çağrı bütçesi
+
+    Uç nokta bazında ve toplamda en fazla kaç upstream çağrı yapılabileceğini
+    sayar. Limit 0 sınırsız demektir. Bütçe dolduğunda `spend()` çağrıyı
+    yapmadan BudgetExceeded fırlatır ve bütçe `exhausted` olarak işaretlenir.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, total: int = 0):
+        """
+        Args:
+            limits (Dict[str, int]): Uç nokta -> en fazla çağrı
+            total (int): Tüm uç noktalar için toplam en fazla çağrı
+        """
+        self.limits = {endpoint: int(limit) for endpoint, limit in (limits or {}).items() if limit}
+        self.total = int(total)
+        self.exhausted_endpoints = set()
+        self._used = {}
+        self._lock = threading.Lock()
+
+    def fresh(self) -> 'CallBudget':
+        """Aynı limitlerle sıfırlanmış yeni bütçe"""
+        return CallBudget(self.limits, self.total)
+
+    @property
+    def exhausted(self) -> bool:
+        """Bütçe yüzünden en az bir çağrı reddedildi mi"""
+        return bool(self.exhausted_endpoints)
+
+    def _allows(self, endpoint: str) -> bool:
+        limit = self.limits.get(endpoint)
+        if limit and self._used.get(endpoint, 0) >= limit:
+            return False
+        return not self.total or sum(self._used.values()) < self.total
+
+    def spend(self, endpoint: str):
+        """Bir çağrı hakkı düş, bütçe dolmuşsa BudgetExceeded fırlat"""
+        with self._lock:
+            if not self._allows(endpoint):
+                self.exhausted_endpoints.add(endpoint)
+                raise BudgetExceeded(endpoint)
+            self._used[endpoint] = self._used.get(endpoint, 0) + 1
+
+    def usage(self) -> Dict:
+        """Harcanan çağrılar ve limitler"""
+        with self._lock:
+            return {
+                'used': dict(self._used),
+                'limits': dict(self.limits),
+                'total_used': sum(self._used.values()),
+                'total_limit': self.total,
+                'exhausted': sorted(self.exhausted_endpoints)
+            }
+
+
+class LoginLimiter:
+    """
+    Anahtar başına (IP, kullanıcı adı) kayan pencerede başarısız giriş sınırı
+
+    Pencere içinde `max_attempts` başarısız deneme yapan anahtar, en eski
+    deneme pencereden düşene kadar engellenir. Sayaçlar süreç içindedir;
+    her gunicorn worker'ı kendi sayacını tutar.
+    """
+
+    def __init__(self, max_attempts: int = 5, window_seconds: float = 300, max_keys: int = 100000):
+        """
+        Args:
+            max_attempts (int): Pencere içinde izin verilen başarısız deneme
+            window_seconds (float): Pencere uzunluğu
+            max_keys (int): Bellekte tutulacak en fazla anahtar
+        """
+        self.max_attempts = max(1, int(max_attempts))
+        self.window_seconds = float(window_seconds)
+        self.max_keys = max_keys
+        self._failures = {}
+        self._lock = threading.Lock()
+
+    def _expire(self, key: str, now: float) -> Optional[deque]:
+        attempts = self._failures.get(key)
+        if attempts is None:
+            return None
+        while attempts and attempts[0] <= now - self.window_seconds:
+            attempts.popleft()
+        if not attempts:
+            del self._failures[key]
+            return None
+        return attempts
+
+    def retry_after(self, *keys: str) -> float:
+        """Anahtarlardan biri engelliyse beklenmesi gereken süre, değilse 0"""
+        now = time.monotonic()
+        wait = 0.0
+        with self._lock:
+            for key in keys:
+                attempts = self._expire(key, now)
+                if attempts is not None and len(attempts) >= self.max_attempts:
+                    wait = max(wait, attempts[0] + self.window_seconds - now)
+        return wait
+
+    def record_failure(self, *keys: str):
+        """Başarısız denemeyi tüm anahtarlara yaz"""
+        now = time.monotonic()
+        with self._lock:
+            if len(self._failures) >= self.max_keys:
+                for key in list(self._failures):
+                    self._expire(key, now)
+            for key in keys:
+                attempts = self._failures.setdefault(key, deque(maxlen=self.max_attempts))
+                attempts.append(now)
+
+    def reset(self, *keys: str):
+        """Başarılı girişten sonra sayaçları sıfırla"""
+        with self._lock:
+            for key in keys:
+                self._failures.pop(key, None)
+
+
+def get_call_budget() -> CallBudget:
+    """
+    Ortam değişkenlerinden iş bütçesi oluştur
+
+    JOB_MAX_CALLS toplam limiti, GEOCODE_MAX_CALLS, NEARBY_MAX_CALLS,
+    TEXT_MAX_CALLS, DETAILS_MAX_CALLS uç nokta limitlerini belirler
+    (0 ya da tanımsız = sınırsız).
+    """
+    return CallBudget({
+        endpoint: int(os.getenv(f'{endpoint.upper()}_MAX_CALLS', 0))
+        for endpoint in ENDPOINTS
+    }, total=int(os.getenv('JOB_MAX_CALLS', 0)))
+
+
+_rate_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Süreç genelinde paylaşılan limiter'ı döndür
+
+    QPS değerleri ortam değişkenlerinden okunur: PLACES_QPS (varsayılan)
+    ve uç nokta bazında GEOCODE_QPS, NEARBY_QPS, TEXT_QPS, DETAILS_QPS.
+    """
+    global _rate_limiter
+    with _limiter_lock:
+        if _rate_limiter is None:
+            default_qps = float(os.getenv('PLACES_QPS', 10))
+            _rate_limiter = RateLimiter({
+                endpoint: float(os.getenv(f'{endpoint.upper()}_QPS', default_qps))
+                for endpoint in ENDPOINTS
+            }, default_qps=default_qps)
+        return _rate_limiter
+
+
+_login_limiter = None
+
+
+def get_login_limiter() -> LoginLimiter:
+    """
+    Süreç genelinde paylaşılan giriş limiter'ını döndür
+
+    LOGIN_MAX_ATTEMPTS (varsayılan 5) ve LOGIN_WINDOW_SECONDS (300) ortam
+    değişkenlerinden okunur.
+    """
+    global _login_limiter
+    with _limiter_lock:
+        if _login_limiter is None:
+            _login_limiter = LoginLimiter(
+                max_attempts=int(os.getenv('LOGIN_MAX_ATTEMPTS', 5)),
+                window_seconds=float(os.getenv('LOGIN_WINDOW_SECONDS', 300))
+            )
+        return _login_limiter
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+from typing import Any, Callable, Hashable, Tuple
+
+
+class _Call:
+    """Devam eden bir çağrının sonucu"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Aynı anahtarla aynı anda yapılan çağrıları tek çağrıda birleştirir
+
+    İlk gelen çağrı (lider) fonksiyonu çalıştırır; o bitene kadar aynı
+    anahtarla gelen diğer thread'ler bekler ve liderin sonucunu (ya da
+    hatasını) paylaşır. Çağrı bittiğinde anahtar unutulur, yani bu bir
+    önbellek değildir.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key: Hashable, func: Callable, *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Returns:
+            Tuple[Any, bool]: (sonuç, başka bir çağrıyla paylaşıldı mı)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result, False
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+
+# Süreç genelinde paylaşılan grup (eşzamanlı işler arasında birleştirme için)
+inflight = SingleFlight()
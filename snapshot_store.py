@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List
+
+from cache import SearchResultCache
+
+# Delta modunda satırların değişim durumunu tutan sütun ve değerleri
+DELTA_COLUMN = 'Değişim'
+DELTA_NEW = 'Yeni'
+DELTA_CHANGED = 'Değişti'
+DELTA_UNCHANGED = 'Aynı'
+DELTA_REMOVED = 'Kaldırıldı'
+
+
+class SnapshotStore:
+    """
+    Aramaların son çalıştırmasında bulunan place_id'lerin deposu
+
+    Her (kullanıcı, lokasyon, işletme türü, yarıçap) için place_id başına
+    keşif özeti, üretilen satır (elenenler için NULL) ve detayların çekildiği
+    zaman tutulur. Bir sonraki çalıştırma bu kayıtlarla değişmemiş yerlerin
+    detay çağrılarını atlar ve satırları yeni/değişti/kaldırıldı olarak işaretler.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path (str): SQLite dosya yolu
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS search_snapshots (
+                search_key TEXT NOT NULL,
+                place_id TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                business TEXT,
+                fetched_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (search_key, place_id)
+            ) WITHOUT ROWID
+        ''')
+        self._conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_search_snapshots_updated_at
+            ON search_snapshots (updated_at)
+        ''')
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(user_id, location: str, business_type: str, radius_km: float) -> str:
+        return f"{user_id}|{SearchResultCache.make_key(location, business_type, radius_km)}"
+
+    def load(self, search_key: str) -> Dict[str, Dict]:
+        """Aramanın son çalıştırmasını place_id -> {summary, business, fetched_at} olarak döndür"""
+        with self._lock:
+            rows = self._conn.execute('''
+                SELECT place_id, summary, business, fetched_at FROM search_snapshots WHERE search_key = ?
+            ''', (search_key,)).fetchall()
+        return {
+            place_id: {
+                'summary': summary,
+                'business': json.loads(business) if business is not None else None,
+                'fetched_at': fetched_at
+            }
+            for place_id, summary, business, fetched_at in rows
+        }
+
+    def save(self, search_key: str, entries: Dict[str, Dict], replace: bool = True):
+        """
+        Çalıştırmanın sonuçlarını yaz
+
+        Args:
+            search_key (str): make_key() ile üretilen anahtar
+            entries (Dict): place_id -> {summary, business, fetched_at}
+            replace (bool): Bu çalıştırmada görülmeyen eski kayıtları sil
+                (eksik/kısmi çalıştırmalarda False)
+        """
+        now = time.time()
+        with self._lock:
+            try:
+                if replace:
+                    self._conn.execute('DELETE FROM search_snapshots WHERE search_key = ?', (search_key,))
+                self._conn.executemany('''
+                    INSERT OR REPLACE INTO search_snapshots
+                        (search_key, place_id, summary, business, fetched_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', [
+                    (search_key, place_id, entry['summary'],
+                     json.dumps(entry['business'], ensure_ascii=False) if entry['business'] is not None else None,
+                     entry['fetched_at'], now)
+                    for place_id, entry in entries.items()
+                ])
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+
+    def purge(self, older_than_seconds: float = 90 * 86400) -> int:
+        """Uzun süredir çalıştırılmayan aramaların kayıtlarını sil"""
+        with self._lock:
+            cursor = self._conn.execute(
+                'DELETE FROM search_snapshots WHERE updated_at < ?', (time.time() - older_than_seconds,)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+
+class DeltaMarker:
+    """
+    Satırları önceki çalıştırmaya göre işaretler
+
+    Her satırın başına DELTA_COLUMN eklenir: önceki çalıştırmada olmayanlar
+    'Yeni', alanları farklı olanlar 'Değişti', aynı olanlar 'Aynı'.
+    `removed()` önceki çalıştırmada olup bu çalıştırmada gelmeyen satırları
+    'Kaldırıldı' olarak döndürür.
+    """
+
+    def __init__(self, previous: Dict[str, Dict]):
+        """
+        Args:
+            previous (Dict): SnapshotStore.load() çıktısı
+        """
+        self.previous = previous
+        self.seen = set()
+        self.counts = {DELTA_NEW: 0, DELTA_CHANGED: 0, DELTA_UNCHANGED: 0, DELTA_REMOVED: 0}
+
+    def mark(self, place_id: str, business: Dict) -> Dict:
+        """Satırı işaretlenmiş kopyası ile döndür"""
+        self.seen.add(place_id)
+        entry = self.previous.get(place_id)
+        if entry is None or entry['business'] is None:
+            change = DELTA_NEW
+        elif entry['business'] != business:
+            change = DELTA_CHANGED
+        else:
+            change = DELTA_UNCHANGED
+        self.counts[change] += 1
+        return {DELTA_COLUMN: change, **business}
+
+    def removed(self) -> List[Dict]:
+        """Önceki çalıştırmada olup bu çalıştırmada gelmeyen satırlar"""
+        rows = []
+        for place_id, entry in self.previous.items():
+            if entry['business'] is not None and place_id not in self.seen:
+                rows.append({DELTA_COLUMN: DELTA_REMOVED, **entry['business']})
+        self.counts[DELTA_REMOVED] = len(rows)
+        return rows
+
+
+_snapshot_store = None
+_store_lock = threading.Lock()
+
+
+def get_snapshot_store() -> SnapshotStore:
+    """Süreç genelinde paylaşılan depoyu döndür (SNAPSHOT_PATH, varsayılan snapshots.db)"""
+    global _snapshot_store
+    with _store_lock:
+        if _snapshot_store is None:
+            _snapshot_store = SnapshotStore(os.getenv('SNAPSHOT_PATH', 'snapshots.db'))
+        return _snapshot_store
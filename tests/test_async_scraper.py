@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from async_scraper import AsyncGoogleMapsScraper
+from cache import GeocodeCache, PlaceDetailsCache
+from rate_limiter import CallBudget, RateLimiter
+
+CENTER = (41.0, 29.0)
+
+
+def place(place_id, lat=CENTER[0], lng=CENTER[1]):
+    return {'place_id': place_id, 'name': place_id, 'geometry': {'location': {'lat': lat, 'lng': lng}}}
+
+
+class FakeTransport:
+    """
+    Sahte Places Web Service
+
+    Merkezdeki type araması tam sayfa ve devam token'ı döndürür (doymuş),
+    böylece sayfalama ve grid arama çalışır. Grid hücreleri hücreye özgü
+    birer yer, text search yarıçap dışında bir yer döndürür; 'p3'ün
+    telefonu yoktur.
+    """
+
+    def __init__(self):
+        self.requests = []
+
+    async def get_json(self, url, params):
+        path = url.split('/api/', 1)[1]
+        self.requests.append((path, params))
+        if path == 'geocode/json':
+            return {'status': 'OK', 'results': [{
+                'types': ['locality', 'political'],
+                'geometry': {
+                    'location': {'lat': CENTER[0], 'lng': CENTER[1]},
+                    'viewport': {'southwest': {'lat': 40.5, 'lng': 28.5}, 'northeast': {'lat': 42.5, 'lng': 29.5}}
+                }
+            }]}
+        if path == 'place/nearbysearch/json':
+            if params.get('pagetoken') == 'tok1':
+                return {'status': 'OK', 'results': [place(f'p{i}') for i in range(20, 25)]}
+            if params['location'] != f"{CENTER[0]},{CENTER[1]}":
+                return {'status': 'OK', 'results': [place(f"g{params['location']}", *map(float, params['location'].split(',')))]}
+            if params.get('type'):
+                return {'status': 'OK', 'results': [place(f'p{i}') for i in range(20)], 'next_page_token': 'tok1'}
+            return {'status': 'OK', 'results': [place(f'p{i}') for i in range(5)]}
+        if path == 'place/textsearch/json':
+            return {'status': 'OK', 'results': [place('p0'), place('far', 42.0, 29.0)]}
+        if path == 'place/details/json':
+            phone = '' if params['place_id'] == 'p3' else '0212 000 00 00'
+            return {'status': 'OK', 'result': {'name': params['place_id'], 'formatted_phone_number': phone}}
+        return {'status': 'INVALID_REQUEST'}
+
+
+class AsyncScraperTest(unittest.TestCase):
+    def setUp(self):
+        self.transport = FakeTransport()
+        self.scraper = AsyncGoogleMapsScraper(
+            'test-key', transport=self.transport, page_token_delay=0,
+            details_cache=PlaceDetailsCache(':memory:', 0), geocode_cache=GeocodeCache(':memory:', 0),
+            grid_max_depth=1, rate_limiter=RateLimiter({}, default_qps=10000), call_budget=CallBudget()
+        )
+
+    def search(self):
+        return asyncio.run(self.scraper.search_businesses('Test Mahallesi', 'eczane', 2))
+
+    def details_requested(self):
+        return [params['place_id'] for path, params in self.transport.requests if path == 'place/details/json']
+
+    def test_discovery_pagination_and_details(self):
+        result = self.search()
+        businesses = result.businesses
+        self.assertFalse(result.partial)
+
+        # Merkez (25, sayfalama dahil) + 4 grid hücresi, telefonu olmayan p3 hariç
+        self.assertEqual(len(businesses), 28)
+        self.assertIn('p24', {business['İşletme Adı'] for business in businesses})
+        self.assertIn(('place/nearbysearch/json', {'pagetoken': 'tok1', 'key': 'test-key'}), self.transport.requests)
+
+        requested = self.details_requested()
+        self.assertEqual(len(requested), len(set(requested)))
+        self.assertIn('p3', requested)
+        # Yarıçap dışındaki yer için detay çağrısı yapılmaz
+        self.assertNotIn('far', requested)
+
+    def test_grid_report(self):
+        summary = self.search().grid
+
+        self.assertEqual(summary['cells'], 4)
+        self.assertEqual(summary['calls'], 8)
+        self.assertEqual(summary['max_depth'], 1)
+        root = summary['tree'][0]
+        self.assertTrue(root['saturated'])
+        self.assertTrue(root['split'])
+        self.assertEqual([cell['results'] for cell in summary['tree'][1:]], [2, 2, 2, 2])
+
+    def test_concurrent_searches_keep_their_own_state(self):
+        # Bütçe ve grid raporu aramaya aittir, paylaşılan nesnede ezilmez
+        self.scraper.call_budget = CallBudget({'details': 5})
+
+        async def search_twice():
+            return await asyncio.gather(
+                self.scraper.search_businesses('Test Mahallesi', 'eczane', 2),
+                self.scraper.search_businesses('Test Mahallesi', 'eczane', 2)
+            )
+
+        results = asyncio.run(search_twice())
+
+        for result in results:
+            self.assertTrue(result.partial)
+            self.assertEqual(result.usage['exhausted'], ['details'])
+            self.assertEqual(result.usage['used']['details'], 5)
+            self.assertEqual(result.usage['used']['nearby'], 11)
+            self.assertEqual(result.grid['cells'], 4)
+        self.assertIsNot(results[0].grid['tree'], results[1].grid['tree'])
+
+
+if __name__ == '__main__':
+    unittest.main()
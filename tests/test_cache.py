@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from cache import SearchResultCache
+
+SEARCH = ('Kadıköy, İstanbul', 'eczane', 2)
+
+
+class SearchResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = SearchResultCache(':memory:', ttl_seconds=3600, max_entries=1)
+        self.cache.ROW_BATCH_SIZE = 2
+
+    def write(self, search, names, commit=True):
+        writer = self.cache.writer(*search)
+        for name in names:
+            writer.add({'İşletme Adı': name})
+        if commit:
+            writer.commit({'cells': 1})
+        writer.discard()
+
+    def names(self, search):
+        return [row['İşletme Adı'] for row in self.cache.iter_rows(*search)]
+
+    def test_rows_are_published_on_commit(self):
+        self.write(SEARCH, ['a', 'b', 'c', 'd', 'e'])
+
+        value, age = self.cache.get(*SEARCH)
+        self.assertEqual(value, {'row_count': 5, 'grid_report': {'cells': 1}})
+        self.assertEqual(self.names(SEARCH), ['a', 'b', 'c', 'd', 'e'])
+
+    def test_uncommitted_rows_are_discarded(self):
+        self.write(SEARCH, ['a', 'b'])
+        self.write(SEARCH, ['x', 'y', 'z'], commit=False)
+
+        self.assertEqual(self.names(SEARCH), ['a', 'b'])
+        count = self.cache._conn.execute(f'SELECT COUNT(*) FROM {self.cache.rows_table}').fetchone()[0]
+        self.assertEqual(count, 2)
+
+    def test_evicted_entry_drops_its_rows(self):
+        other = ('Beşiktaş, İstanbul', 'eczane', 2)
+        self.write(SEARCH, ['a', 'b', 'c'])
+        self.write(other, ['d'])
+
+        self.assertIsNone(self.cache.get(*SEARCH))
+        self.assertEqual(self.names(SEARCH), [])
+        self.assertEqual(self.names(other), ['d'])
+
+
+if __name__ == '__main__':
+    unittest.main()
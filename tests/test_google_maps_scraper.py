@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from cache import GeocodeCache, PlaceDetailsCache
+from google_maps_scraper import GoogleMapsScraper
+from rate_limiter import CallBudget, RateLimiter
+
+CENTER = (41.0, 29.0)
+
+
+def place(place_id, lat=CENTER[0], lng=CENTER[1]):
+    return {'place_id': place_id, 'name': place_id, 'geometry': {'location': {'lat': lat, 'lng': lng}}}
+
+
+class FakeClient:
+    """
+    Sahte googlemaps.Client
+
+    Her text sorgusu farklı bir yer döndürür; merkezdeki nearby aramaları
+    seyrektir. `saturated=True` verilirse merkezdeki type araması doymuş
+    döner ve grid arama çalışır.
+    """
+
+    def __init__(self, saturated=False):
+        self.saturated = saturated
+        self.calls = []
+
+    def geocode(self, location):
+        self.calls.append(('geocode', location))
+        return [{'types': ['locality'], 'geometry': {'location': {'lat': CENTER[0], 'lng': CENTER[1]}}}]
+
+    def places_nearby(self, location=None, radius=None, type=None, keyword=None, page_token=None):
+        self.calls.append(('nearby', location, type, keyword))
+        if location != CENTER:
+            return {'results': [place(f"g{location}", *location)]}
+        if type and self.saturated:
+            return {'results': [place(f'p{i}') for i in range(20)], 'next_page_token': 'tok'}
+        return {'results': [place('p0')]}
+
+    def places(self, query):
+        self.calls.append(('text', query))
+        return {'results': [place(f'q:{query}')]}
+
+    def place(self, place_id, fields):
+        self.calls.append(('details', place_id))
+        return {'result': {'name': place_id, 'formatted_phone_number': '0212 000 00 00'}}
+
+
+class GoogleMapsScraperTest(unittest.TestCase):
+    def make_scraper(self, client, budget, **kwargs):
+        scraper = GoogleMapsScraper(
+            'AIza-test-key', details_cache=PlaceDetailsCache(':memory:', 0),
+            geocode_cache=GeocodeCache(':memory:', 0), rate_limiter=RateLimiter({}, default_qps=10000),
+            call_budget=budget, **kwargs
+        )
+        scraper.gmaps = client
+        return scraper
+
+    def run_search(self, scraper):
+        return list(scraper.iter_businesses('Test Mahallesi', 'eczane', 2))
+
+    def test_text_budget_exactly_used_by_text_search_is_partial(self):
+        # _text_search 3 sorgunun hepsini kullanır, alternatif sorgular bütçeye takılır
+        client = FakeClient()
+        scraper = self.make_scraper(client, CallBudget({'text': 3}))
+        events = self.run_search(scraper)
+
+        self.assertEqual(sum(1 for call in client.calls if call[0] == 'text'), 3)
+        self.assertEqual(events[-1]['type'], 'done')
+        self.assertTrue(events[-1]['partial'])
+        self.assertEqual(scraper.budget.usage()['exhausted'], ['text'])
+
+    def test_text_budget_covering_all_queries_is_complete(self):
+        # 6 sorgunun 2'si _text_search ile aynı, memo'dan döner ve bütçeden düşmez
+        client = FakeClient()
+        scraper = self.make_scraper(client, CallBudget({'text': 4}))
+        events = self.run_search(scraper)
+
+        self.assertEqual(sum(1 for call in client.calls if call[0] == 'text'), 4)
+        self.assertEqual(scraper.stats['memo_hits'], 2)
+        self.assertFalse(events[-1]['partial'])
+        self.assertEqual(scraper.budget.usage()['exhausted'], [])
+
+    def test_nearby_budget_stops_grid_and_marks_partial(self):
+        # Merkezdeki 2 nearby + 4 hücre çağrısı (2 hücre); üçüncü hücre bütçeye takılır
+        client = FakeClient(saturated=True)
+        scraper = self.make_scraper(client, CallBudget({'nearby': 6}), grid_max_depth=1)
+        events = self.run_search(scraper)
+
+        self.assertEqual(sum(1 for call in client.calls if call[0] == 'nearby'), 6)
+        self.assertTrue(events[-1]['partial'])
+        self.assertEqual(scraper.budget.usage()['exhausted'], ['nearby'])
+
+        # Rapor yalnızca yapılan çağrıları sayar, bütçeye takılan hücreler aranmamış görünür
+        summary = scraper.grid_summary()
+        self.assertEqual(summary['calls'], 4)
+        self.assertEqual(summary['cells'], 2)
+        self.assertEqual([cell['results'] for cell in summary['tree'][1:]], [2, 2, None, None])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from job_queue import JobQueue, WorkerPool
+
+
+class JobQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.queue = JobQueue(os.path.join(self.tmp.name, 'jobs.db'), lease_seconds=0.05, max_attempts=1)
+
+    def tearDown(self):
+        self.queue._conn.close()
+        self.tmp.cleanup()
+
+    def test_expired_job_is_released_once_and_not_claimed_again(self):
+        self.queue.enqueue('job-1', {})
+        self.assertEqual(self.queue.claim('dead-worker'), ('job-1', {}))
+        time.sleep(0.1)
+
+        self.assertIsNone(self.queue.claim('worker'))
+        self.assertEqual(self.queue.expire(), ['job-1'])
+        self.assertEqual(self.queue.expire(), [])
+        self.assertEqual(self.queue.metrics()['failed'], 1)
+
+    def test_worker_pool_reports_abandoned_jobs(self):
+        abandoned = []
+        pool = WorkerPool(self.queue, lambda job_id, payload: None, on_abandoned=abandoned.extend)
+        self.queue.enqueue('job-1', {})
+        self.queue.claim('dead-worker')
+        time.sleep(0.1)
+
+        pool._release_expired()
+        self.assertEqual(abandoned, ['job-1'])
+
+
+if __name__ == '__main__':
+    unittest.main()